@@ -0,0 +1,65 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#ifndef H_PIXEL
+#define H_PIXEL
+
+#include "surface.h"
+#include "utils.h"
+
+/**
+ * Inline functions for mixing pixel data.
+ */
+static inline uint32_t renderPixelAlphaSimple(const RGBA dest, const RGBA src) {
+  return (ALPHA(src) == 0xFF) ? src : dest;
+}
+
+static inline uint32_t renderPixelSolid(const RGBA src) {
+  return (src | 0xFF000000);
+}
+
+static inline uint32_t renderPixelAlpha50(const RGBA dest, const RGBA src) {
+  if (ALPHA(src) == 0xFF) {
+    return (((dest & 0x00FEFEFE) >> 1) + ((src & 0x00FEFEFE) >> 1)) | (0xFF << 24);
+  }
+
+  return dest;
+}
+
+static inline uint32_t renderPixelAlpha(const RGBA dest, const RGBA src) {
+  if (ALPHA(src) == 0) {
+    return dest;
+  } else if (ALPHA(src) == 0xFF) {
+    return src;
+  }
+
+  const uint8_t alpha = ALPHA(src);
+  const uint32_t RB = (((src & 0x00FF00FF) * alpha) + ((dest & 0x00FF00FF) * (0xFF - alpha))) & 0xFF00FF00;
+  const uint32_t G =  (((src & 0x0000FF00) * alpha) + ((dest & 0x0000FF00) * (0xFF - alpha))) & 0x00FF0000;
+
+  return (0xFF << 24) | (RB | G) >> 8;
+}
+
+#endif
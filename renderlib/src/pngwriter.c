@@ -0,0 +1,423 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#include "renderlib.h"
+#include "surface.h"
+#include "utils.h"
+#include "pngwriter.h"
+
+// Size of the placeholder PLTE and tRNS chunks written before any image data, including their length, type and CRC.
+#define PNGWRITER_PALETTE_CHUNKS_SIZE ((12 + 256 * 3) + (12 + 256))
+
+static const uint8_t PNG_SIGNATURE[8] = {0x89, 'P', 'N', 'G', '\r', '\n', 0x1A, '\n'};
+
+
+static inline void pngWriterPutUint32(uint8_t* dest, const uint32_t value) {
+  dest[0] = (uint8_t)(value >> 24);
+  dest[1] = (uint8_t)(value >> 16);
+  dest[2] = (uint8_t)(value >> 8);
+  dest[3] = (uint8_t)value;
+}
+
+// Write a PNG chunk with its length, type and CRC.
+static bool pngWriterWriteChunk(PNGWriter* writer, const char* type, const uint8_t* data, const uint32_t length) {
+  uint8_t header[8];
+  pngWriterPutUint32(header, length);
+  memcpy(header + 4, type, 4);
+
+  uint32_t crc = crc32(0, header + 4, 4);
+  if (length) {
+    crc = crc32(crc, data, length);
+  }
+  uint8_t footer[4];
+  pngWriterPutUint32(footer, crc);
+
+  if (fwrite(header, 1, 8, writer->fp) != 8) {
+    return false;
+  }
+  if (length && fwrite(data, 1, length, writer->fp) != length) {
+    return false;
+  }
+  return fwrite(footer, 1, 4, writer->fp) == 4;
+}
+
+// Write the PLTE and tRNS chunks. Unused palette entries are left black and opaque.
+static bool pngWriterWritePalette(PNGWriter* writer) {
+  uint8_t colors[256 * 3];
+  uint8_t alpha[256];
+  memset(colors, 0, sizeof(colors));
+  memset(alpha, 0xFF, sizeof(alpha));
+
+  // Surfaces store colors in BGRA order.
+  for (unsigned int i = 0; i < writer->paletteSize; i++) {
+    const RGBA color = writer->palette[i];
+    colors[i * 3 + 0] = BLUE(color);
+    colors[i * 3 + 1] = GREEN(color);
+    colors[i * 3 + 2] = RED(color);
+    alpha[i] = ALPHA(color);
+  }
+
+  return pngWriterWriteChunk(writer, "PLTE", colors, sizeof(colors)) && pngWriterWriteChunk(writer, "tRNS", alpha, sizeof(alpha));
+}
+
+// Deflate the current row and write any full IDAT chunks.
+static bool pngWriterDeflate(PNGWriter* writer, const uint8_t* data, const unsigned int length, const int flush) {
+  z_stream* zstream = &writer->zstream;
+  zstream->next_in = (Bytef*)data;
+  zstream->avail_in = length;
+
+  int result;
+  do {
+    result = deflate(zstream, flush);
+    if (result == Z_STREAM_ERROR) {
+      return false;
+    }
+
+    // Write the output buffer once it is full, or when the stream has finished.
+    if (zstream->avail_out == 0 || result == Z_STREAM_END) {
+      const uint32_t size = PNGWRITER_IDAT_SIZE - zstream->avail_out;
+      if (size && !pngWriterWriteChunk(writer, "IDAT", writer->idat, size)) {
+        return false;
+      }
+      zstream->next_out = writer->idat;
+      zstream->avail_out = PNGWRITER_IDAT_SIZE;
+    }
+  } while (zstream->avail_in > 0 || (flush == Z_FINISH && result != Z_STREAM_END));
+
+  return true;
+}
+
+// Return the palette index of a color, adding it to the palette if needed. Returns -1 if the palette is full.
+static inline int pngWriterGetIndex(PNGWriter* writer, const RGBA color) {
+  unsigned int slot = (color * 2654435761u) >> 22;
+
+  while (writer->hashIndices[slot]) {
+    if (writer->hashColors[slot] == color) {
+      return writer->hashIndices[slot] - 1;
+    }
+    slot = (slot + 1) & (PNGWRITER_HASH_SIZE - 1);
+  }
+
+  if (writer->paletteSize == 256) {
+    return -1;
+  }
+
+  const unsigned int index = writer->paletteSize++;
+  writer->palette[index] = color;
+  writer->hashColors[slot] = color;
+  writer->hashIndices[slot] = index + 1;
+
+  return index;
+}
+
+static bool pngWriterStartRGBA(PNGWriter* writer, const unsigned int compressLevel) {
+  writer->pngPtr = png_create_write_struct(PNG_LIBPNG_VER_STRING, NULL, NULL, NULL);
+  if (!writer->pngPtr) {
+    return false;
+  }
+  writer->infoPtr = png_create_info_struct(writer->pngPtr);
+  if (!writer->infoPtr) {
+    return false;
+  }
+
+  if (setjmp(png_jmpbuf(writer->pngPtr))) {
+    return false;
+  }
+
+  png_init_io(writer->pngPtr, writer->fp);
+  png_set_filter(writer->pngPtr, 0, PNG_ALL_FILTERS);
+  png_set_compression_level(writer->pngPtr, compressLevel);
+  png_set_IHDR(writer->pngPtr, writer->infoPtr, writer->width, writer->height, 8, PNG_COLOR_TYPE_RGB_ALPHA,
+               PNG_INTERLACE_NONE, PNG_COMPRESSION_TYPE_DEFAULT, PNG_FILTER_TYPE_DEFAULT);
+  png_write_info(writer->pngPtr, writer->infoPtr);
+
+  return true;
+}
+
+static bool pngWriterStartIndexed(PNGWriter* writer, const unsigned int compressLevel) {
+  writer->idat = malloc(PNGWRITER_IDAT_SIZE);
+  if (!writer->idat) {
+    return false;
+  }
+
+  if (deflateInit(&writer->zstream, compressLevel) != Z_OK) {
+    return false;
+  }
+  writer->zstreamOpen = true;
+  writer->zstream.next_out = writer->idat;
+  writer->zstream.avail_out = PNGWRITER_IDAT_SIZE;
+
+  uint8_t header[13];
+  pngWriterPutUint32(header, writer->width);
+  pngWriterPutUint32(header + 4, writer->height);
+  header[8] = 8;
+  header[9] = PNG_COLOR_TYPE_PALETTE;
+  header[10] = 0;
+  header[11] = 0;
+  header[12] = 0;
+
+  if (fwrite(PNG_SIGNATURE, 1, sizeof(PNG_SIGNATURE), writer->fp) != sizeof(PNG_SIGNATURE)) {
+    return false;
+  }
+  if (!pngWriterWriteChunk(writer, "IHDR", header, sizeof(header))) {
+    return false;
+  }
+
+  // The palette is only known once all rows have been written. Reserve room for the largest palette now, and
+  // overwrite it when the writer is closed.
+  writer->paletteOffset = ftell(writer->fp);
+  return pngWriterWritePalette(writer);
+}
+
+static void pngWriterFree(PNGWriter* writer) {
+  if (writer->pngPtr) {
+    png_destroy_write_struct(&writer->pngPtr, &writer->infoPtr);
+  }
+  if (writer->zstreamOpen) {
+    deflateEnd(&writer->zstream);
+  }
+  if (writer->fp) {
+    fclose(writer->fp);
+  }
+
+  free(writer->idat);
+  free(writer->rowData);
+  free(writer->fileName);
+  free(writer);
+}
+
+/**
+ * Creates a PNG writer, which writes an image to a file as rows are added to it.
+ *
+ * In indexed mode the image is written with a palette of up to 256 colors, which is built from the pixels that are
+ * written. If an image uses more colors, writing rows fails and no file is kept.
+ *
+ * @param  fileName      The name of the file to write.
+ * @param  width         The width of the image.
+ * @param  height        The height of the image.
+ * @param  compressLevel The zlib compression level to use, from 1 to 9.
+ * @param  indexed       Write a palette-indexed image instead of an RGBA image.
+ *
+ * @return               A new PNGWriter or NULL if it could not be created.
+ */
+EXPORT PNGWriter* pngWriterCreate(const char* fileName, const unsigned int width, const unsigned int height, const unsigned int compressLevel, const bool indexed) {
+  if (!fileName || !width || !height || compressLevel < 1 || compressLevel > 9) {
+    printf("pngWriterCreate: invalid parameters.\n");
+    return NULL;
+  }
+
+  PNGWriter* writer = calloc(1, sizeof(PNGWriter));
+  if (!writer) {
+    printf("pngWriterCreate: could not allocate memory.\n");
+    return NULL;
+  }
+
+  writer->width = width;
+  writer->height = height;
+  writer->indexed = indexed;
+
+  // A row is preceded by its filter type in indexed mode.
+  writer->rowData = malloc(indexed ? width + 1 : width * 4);
+  writer->fileName = malloc(strlen(fileName) + 1);
+  if (!writer->rowData || !writer->fileName) {
+    printf("pngWriterCreate: could not allocate memory.\n");
+    pngWriterFree(writer);
+    return NULL;
+  }
+  strcpy(writer->fileName, fileName);
+
+  fopen_s(&writer->fp, fileName, "wb");
+  if (!writer->fp) {
+    printf("pngWriterCreate: could not open %s for writing.\n", fileName);
+    pngWriterFree(writer);
+    return NULL;
+  }
+
+  const bool started = indexed ? pngWriterStartIndexed(writer, compressLevel) : pngWriterStartRGBA(writer, compressLevel);
+  if (!started) {
+    printf("pngWriterCreate: could not start writing %s.\n", fileName);
+    pngWriterFree(writer);
+    remove(fileName);
+    return NULL;
+  }
+
+  return writer;
+}
+
+/**
+ * Writes rows of a Surface to a PNG writer, below the rows that were written before.
+ *
+ * @param  writer  The PNGWriter to write to.
+ * @param  surface The Surface to write rows from. Must be as wide as the image.
+ * @param  y       The first row of the Surface to write.
+ * @param  count   The number of rows to write.
+ *
+ * @return         true if the rows were written.
+ */
+EXPORT bool pngWriterWriteRows(PNGWriter* writer, const Surface* surface, const unsigned int y, const unsigned int count) {
+  if (!writer || !surface || writer->failed) {
+    return false;
+  }
+  if ((unsigned int)surface->width != writer->width || y + count > (unsigned int)surface->height || writer->row + count > writer->height) {
+    printf("pngWriterWriteRows: invalid parameters.\n");
+    return false;
+  }
+
+  if (!writer->indexed && setjmp(png_jmpbuf(writer->pngPtr))) {
+    printf("pngWriterWriteRows: could not write rows.\n");
+    writer->failed = true;
+    return false;
+  }
+
+  uint8_t* data = writer->rowData;
+  for (unsigned int row = y; row < y + count; row++) {
+    const RGBA* src = surface->rows[row];
+
+    if (writer->indexed) {
+      data[0] = PNG_FILTER_VALUE_NONE;
+
+      // Consecutive pixels are often the same color.
+      RGBA lastColor = 0;
+      int lastIndex = -1;
+      for (unsigned int x = 0; x < writer->width; x++) {
+        if (lastIndex < 0 || src[x] != lastColor) {
+          lastColor = src[x];
+          lastIndex = pngWriterGetIndex(writer, lastColor);
+          if (lastIndex < 0) {
+            printf("pngWriterWriteRows: the image has more than 256 colors.\n");
+            writer->failed = true;
+            return false;
+          }
+        }
+        data[x + 1] = (uint8_t)lastIndex;
+      }
+
+      if (!pngWriterDeflate(writer, data, writer->width + 1, Z_NO_FLUSH)) {
+        printf("pngWriterWriteRows: could not write rows.\n");
+        writer->failed = true;
+        return false;
+      }
+
+    } else {
+      uint32_t* dest = (uint32_t*)data;
+      for (unsigned int x = 0; x < writer->width; x++) {
+        dest[x] = BGRA(RED(src[x]), GREEN(src[x]), BLUE(src[x]), ALPHA(src[x]));
+      }
+      png_write_row(writer->pngPtr, data);
+    }
+
+    writer->row++;
+  }
+
+  return true;
+}
+
+/**
+ * Finishes writing a PNG file and destroys the writer.
+ *
+ * If not all rows were written, or writing failed, the incomplete file is removed.
+ *
+ * @param  writer The PNGWriter to close.
+ *
+ * @return        true if a complete PNG file was written.
+ */
+EXPORT bool pngWriterClose(PNGWriter* writer) {
+  if (!writer) {
+    return false;
+  }
+
+  bool success = !writer->failed && writer->row == writer->height;
+
+  if (success && writer->indexed) {
+    success = pngWriterDeflate(writer, NULL, 0, Z_FINISH) && pngWriterWriteChunk(writer, "IEND", NULL, 0);
+
+    // Overwrite the placeholder palette with the colors that were used.
+    if (success) {
+      success = fseek(writer->fp, writer->paletteOffset, SEEK_SET) == 0 && pngWriterWritePalette(writer);
+    }
+
+  } else if (success) {
+    if (setjmp(png_jmpbuf(writer->pngPtr))) {
+      success = false;
+    } else {
+      png_write_end(writer->pngPtr, NULL);
+    }
+  }
+
+  if (writer->fp && fclose(writer->fp) != 0) {
+    success = false;
+  }
+  writer->fp = NULL;
+
+  if (!success) {
+    printf("pngWriterClose: could not complete %s.\n", writer->fileName);
+    remove(writer->fileName);
+  }
+
+  pngWriterFree(writer);
+
+  return success;
+}
+
+/**
+ * Stops writing a PNG file, removes the incomplete file and destroys the writer.
+ *
+ * @param writer The PNGWriter to abort.
+ */
+EXPORT void pngWriterAbort(PNGWriter* writer) {
+  if (!writer) {
+    return;
+  }
+
+  if (writer->fp) {
+    fclose(writer->fp);
+    writer->fp = NULL;
+  }
+  remove(writer->fileName);
+
+  pngWriterFree(writer);
+}
+
+/**
+ * Returns the number of rows that have been written to a PNG writer.
+ *
+ * @param  writer The PNGWriter to get the row count of.
+ *
+ * @return        The number of rows written so far.
+ */
+EXPORT uint32_t pngWriterGetRow(const PNGWriter* writer) {
+  return writer->row;
+}
+
+/**
+ * Returns the number of colors in an indexed PNG writer's palette.
+ *
+ * @param  writer The PNGWriter to get the palette size of.
+ *
+ * @return        The number of palette colors used so far, or 0 in RGBA mode.
+ */
+EXPORT uint32_t pngWriterGetPaletteSize(const PNGWriter* writer) {
+  return writer->paletteSize;
+}
@@ -0,0 +1,77 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#ifndef H_PNGWRITER
+#define H_PNGWRITER
+
+#include <png.h>
+#include <zlib.h>
+
+#include "surface.h"
+
+// Size of the color lookup table used in indexed mode. Must be a power of two larger than the maximum palette size.
+#define PNGWRITER_HASH_SIZE 1024
+
+// Size of the buffer that compressed image data is collected in before it is written as an IDAT chunk.
+#define PNGWRITER_IDAT_SIZE 65536
+
+// Writes a PNG file from rows of pixels, without needing the entire image in memory.
+typedef struct {
+  FILE* fp;
+  char* fileName;
+
+  unsigned int width;
+  unsigned int height;
+  unsigned int row;
+  bool indexed;
+  bool failed;
+
+  // Converted row data for the PNG encoder.
+  uint8_t* rowData;
+
+  // RGBA mode is encoded by libpng.
+  png_structp pngPtr;
+  png_infop infoPtr;
+
+  // Indexed mode is deflated directly, because libpng needs the full palette before any image data is written.
+  z_stream zstream;
+  bool zstreamOpen;
+  uint8_t* idat;
+  long paletteOffset;
+
+  RGBA palette[256];
+  unsigned int paletteSize;
+  RGBA hashColors[PNGWRITER_HASH_SIZE];
+  uint16_t hashIndices[PNGWRITER_HASH_SIZE];
+} PNGWriter;
+
+EXPORT PNGWriter*   pngWriterCreate         (const char* fileName, const unsigned int width, const unsigned int height, const unsigned int compressLevel, const bool indexed);
+EXPORT bool         pngWriterWriteRows      (PNGWriter* writer, const Surface* surface, const unsigned int y, const unsigned int count);
+EXPORT bool         pngWriterClose          (PNGWriter* writer);
+EXPORT void         pngWriterAbort          (PNGWriter* writer);
+EXPORT uint32_t     pngWriterGetRow         (const PNGWriter* writer);
+EXPORT uint32_t     pngWriterGetPaletteSize (const PNGWriter* writer);
+
+#endif
@@ -27,6 +27,8 @@
 #include "surface.h"
 #include "presenter.h"
 
+#ifdef _WIN32
+
 /**
  * Creates a new Presenter.
  *
@@ -224,14 +226,10 @@ EXPORT Surface* presenterGetSurface(Presenter* presenter) {
  */
 EXPORT void presenterPresent(Presenter* presenter) {
 
-  // Use a specific surface scaler function for performance.
-  if (presenter->scale == 1) {
-    surfaceCopyToBitmap(presenter->surface, presenter->data);
-  } else if (presenter->scale == 2) {
-    surfaceCopyToBitmapDouble(presenter->surface, presenter->data, presenter->width, presenter->height);
-  } else {
-    surfaceCopyToBitmapScaled(presenter->surface, presenter->data, presenter->width, presenter->height, presenter->scale);
-  }
+  // The DIB section is stored bottom-up.
+  surfaceCopyScaled(presenter->surface, presenter->data, presenter->width, presenter->height, presenter->scale, true);
 
   BitBlt(presenter->htargetdc, 0, 0, presenter->width, presenter->height, presenter->hbitmapdc, 0, 0, SRCCOPY);
 }
+
+#endif
@@ -26,6 +26,9 @@
 #ifndef H_PRESENTER
 #define H_PRESENTER
 
+// Presenters display onto GDI windows, so they are only available on Windows. Use an offscreen Surface elsewhere.
+#ifdef _WIN32
+
 #include <windows.h>
 
 typedef struct {
@@ -53,3 +56,5 @@ EXPORT Surface*     presenterGetSurface (Presenter* presenter);
 EXPORT void         presenterPresent    (Presenter* presenter);
 
 #endif
+
+#endif
@@ -28,40 +28,14 @@
 #include "font.h"
 #include "utils.h"
 #include "render.h"
+#include "render_simd.h"
+#include "pixel.h"
 
+// Number of pixels sampled at a time by renderBlitBlendScale before blending them.
+#define SCALE_SPAN_LENGTH 256
 
-/**
- * Inline functions for mixing pixel data.
- */
-static inline uint32_t renderPixelAlphaSimple(const RGBA dest, const RGBA src) {
-  return (ALPHA(src) == 0xFF) ? src : dest;
-}
-
-static inline uint32_t renderPixelSolid(const RGBA src) {
-  return (src | 0xFF000000);
-}
-
-static inline uint32_t renderPixelAlpha50(const RGBA dest, const RGBA src) {
-  if (ALPHA(src) == 0xFF) {
-    return (((dest & 0x00FEFEFE) >> 1) + ((src & 0x00FEFEFE) >> 1)) | (0xFF << 24);
-  }
-
-  return dest;
-}
-
-static inline uint32_t renderPixelAlpha(const RGBA dest, const RGBA src) {
-  if (ALPHA(src) == 0) {
-    return dest;
-  } else if (ALPHA(src) == 0xFF) {
-    return src;
-  }
-
-  const uint8_t alpha = ALPHA(src);
-  const uint32_t RB = (((src & 0x00FF00FF) * alpha) + ((dest & 0x00FF00FF) * (0xFF - alpha))) & 0xFF00FF00;
-  const uint32_t G =  (((src & 0x0000FF00) * alpha) + ((dest & 0x0000FF00) * (0xFF - alpha))) & 0x00FF0000;
+RenderStats renderStats = {0, 0, 0, 0};
 
-  return (0xFF << 24) | (RB | G) >> 8;
-}
 
 /**
  * Renders an outline from a surface's alpha mask.
@@ -76,6 +50,8 @@ EXPORT void renderOutline(const Surface* destSurface, const Surface* srcSurface,
   int x, y;
   int cx, cy;
 
+  RENDER_STATS_PRIMITIVE();
+
   for (y = 0; y < srcSurface->height; y++) {
     for (x = 0; x < srcSurface->width; x++) {
       if (ALPHA(srcSurface->rows[y][x]) != 0) {
@@ -127,6 +103,8 @@ EXPORT void renderLine(const Surface* destSurface, int x1, int y1, const int x2,
   const int dx = abs(x2 - x1);
   const int dy = abs(y2 - y1);
 
+  RENDER_STATS_PRIMITIVE();
+
   int x = x1;
   int y = y1;
   int xInc1 = 0, xInc2 = 0;
@@ -206,6 +184,8 @@ EXPORT void renderText(const Surface* destSurface, const Font* srcFont, const in
     return;
   }
 
+  RENDER_STATS_PRIMITIVE();
+
   int rx, cx, cy;
   int dx, dy;
   RGBA* dest;
@@ -261,6 +241,8 @@ EXPORT void renderBox(const Surface* destSurface, int x, int y, int width, int h
     return;
   }
 
+  RENDER_STATS_PRIMITIVE();
+
   // Normalize coordinates.
   if (width < 0) {
     width = abs(width);
@@ -344,6 +326,8 @@ EXPORT void renderBlit(const Surface* destSurface, const Surface* srcSurface, in
     }
   }
 
+  RENDER_STATS_BLIT((uint64_t)rW * rH);
+
   // Copy each row of pixels.
   RGBA* dest = destSurface->rows[y] + x;
   RGBA* src = srcSurface->rows[yO] + xO;
@@ -410,10 +394,21 @@ EXPORT void renderBoxFill(const Surface* destSurface, int x, int y, int width, i
     }
   }
 
+  RENDER_STATS_FILL((uint64_t)width * height);
+
   int cx, cy;
   RGBA* dest;
   RGBA* destRow = destSurface->rows[y] + x;
 
+  const FillRowFunc fillRow = renderSIMDFillRow(blendOp);
+  if (fillRow) {
+    for (cy = 0; cy < height; cy++) {
+      fillRow(destRow, color, width);
+      destRow += destSurface->width;
+    }
+    return;
+  }
+
   for (cy = 0; cy < height; cy++) {
     dest = destRow;
 
@@ -497,9 +492,20 @@ EXPORT void renderBlitBlend(const Surface* destSurface, const Surface *srcSurfac
     }
   }
 
+  RENDER_STATS_BLIT((uint64_t)rW * rH);
+
   RGBA* dest;
   RGBA* src;
   int cx, cy;
+
+  const BlendRowFunc blendRow = renderSIMDBlendRow(blendOp);
+  if (blendRow) {
+    for (cy = 0; cy < rH; cy++) {
+      blendRow(destSurface->rows[y + cy] + x, srcSurface->rows[yO + cy] + xO, rW);
+    }
+    return;
+  }
+
   for (cy = 0; cy < rH; cy++) {
     dest = destSurface->rows[y + cy] + x;
     src = srcSurface->rows[yO + cy] + xO;
@@ -566,9 +572,38 @@ EXPORT void renderBlitBlendScale(const Surface* destSurface, const Surface* srcS
   int cu, cv;
   RGBA* dest;
 
+  // Vectorized blending samples the visible part of each source row into a span first. For ALPHA_SIMPLE that extra pass
+  // only pays off with AVX2, with SSE2 the scalar loop is faster.
+  BlendRowFunc blendRow = renderSIMDBlendRow(blendOp);
+  if (blendOp == BLENDOP_ALPHA_SIMPLE && renderGetSIMD() != SIMD_AVX2) {
+    blendRow = NULL;
+  }
+  const int spanStart = (x < 0) ? -x : 0;
+  const int spanEnd = (x + width > destSurface->width) ? destSurface->width - x : width;
+  RGBA span[SCALE_SPAN_LENGTH];
+
+  const int rowStart = (y < 0) ? 0 : y;
+  const int rowEnd = (y + height > destSurface->height) ? destSurface->height : y + height;
+  if (spanEnd > spanStart && rowEnd > rowStart) {
+    RENDER_STATS_BLIT((uint64_t)(spanEnd - spanStart) * (rowEnd - rowStart));
+  }
+
   cv = 0;
   for (cy = y; cy < y + height; cy++) {
-    if (cy >= 0 && cy < destSurface->height) {
+    if (cy >= 0 && cy < destSurface->height && blendRow) {
+      const RGBA* srcRow = srcSurface->rows[cv >> 16];
+      cu = spanStart * stepx;
+
+      for (int sx = spanStart; sx < spanEnd; sx += SCALE_SPAN_LENGTH) {
+        const int count = (spanEnd - sx < SCALE_SPAN_LENGTH) ? spanEnd - sx : SCALE_SPAN_LENGTH;
+        for (int i = 0; i < count; i++) {
+          span[i] = srcRow[cu >> 16];
+          cu += stepx;
+        }
+        blendRow(destSurface->rows[cy] + x + sx, span, count);
+      }
+
+    } else if (cy >= 0 && cy < destSurface->height) {
       cu = 0;
 
       switch (blendOp) {
@@ -624,3 +659,25 @@ EXPORT void renderBlitBlendScale(const Surface* destSurface, const Surface* srcS
     cv += stepy;
   }
 }
+
+/**
+ * Copies the drawing statistics gathered since the last reset.
+ *
+ * @param stats The RenderStats to copy the statistics into.
+ */
+EXPORT void renderGetStats(RenderStats* stats) {
+  if (!stats) {
+    return;
+  }
+  *stats = renderStats;
+}
+
+/**
+ * Resets the drawing statistics.
+ */
+EXPORT void renderResetStats() {
+  renderStats.blits = 0;
+  renderStats.fills = 0;
+  renderStats.primitives = 0;
+  renderStats.pixels = 0;
+}
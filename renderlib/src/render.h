@@ -27,6 +27,7 @@
 #define H_RENDER
 
 #include "surface.h"
+#include "font.h"
 
 typedef enum {
   BLENDOP_SOLID        = 0,
@@ -35,6 +36,23 @@ typedef enum {
   BLENDOP_ALPHA_SIMPLE = 3
 } BlendOp;
 
+// Counts the drawing work done since the last reset, to help find out where frame time goes.
+typedef struct {
+  uint32_t blits;
+  uint32_t fills;
+  uint32_t primitives;
+  uint64_t pixels;
+} RenderStats;
+
+extern RenderStats renderStats;
+
+// Records a single blit or fill of a number of pixels.
+#define RENDER_STATS_BLIT(count) { renderStats.blits++; renderStats.pixels += (count); }
+#define RENDER_STATS_FILL(count) { renderStats.fills++; renderStats.pixels += (count); }
+
+// Records a line, box, outline or text primitive. Their pixels are not counted.
+#define RENDER_STATS_PRIMITIVE() { renderStats.primitives++; }
+
 EXPORT void renderOutline        (const Surface* destSurface, const Surface* srcSurface, const int rx, const int ry, const RGBA color);
 EXPORT void renderLine           (const Surface* destSurface, int x1, int y1, const int x2, const int y2, const RGBA color);
 EXPORT void renderText           (const Surface* destSurface, const Font* srcFont, const int x, const int y, const char* text, RGBA color);
@@ -44,4 +62,7 @@ EXPORT void renderBoxFill        (const Surface* destSurface, int x, int y, int
 EXPORT void renderBlitBlend      (const Surface* destSurface, const Surface *srcSurface, int x, int y, const BlendOp blendOp);
 EXPORT void renderBlitBlendScale (const Surface* destSurface, const Surface* srcSurface, const int x, const int y, const int width, const int height, const BlendOp blendOp);
 
+EXPORT void renderGetStats       (RenderStats* stats);
+EXPORT void renderResetStats     ();
+
 #endif
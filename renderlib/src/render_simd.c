@@ -0,0 +1,566 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#include "renderlib.h"
+#include "surface.h"
+#include "utils.h"
+#include "render.h"
+#include "render_simd.h"
+#include "pixel.h"
+
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+  #define SIMD_X86
+
+  #include <emmintrin.h>
+  #include <immintrin.h>
+
+  #ifdef _MSC_VER
+    #include <intrin.h>
+    #define TARGET_SSE2
+    #define TARGET_AVX2
+  #else
+    #define TARGET_SSE2 __attribute__((target("sse2")))
+    #define TARGET_AVX2 __attribute__((target("avx2")))
+  #endif
+#endif
+
+static bool simdDetected = false;
+static SIMDLevel simdSupported = SIMD_NONE;
+static SIMDLevel simdLevel = SIMD_NONE;
+
+
+/**
+ * Returns the highest SIMD level that both the CPU and OS support.
+ */
+static SIMDLevel simdDetect() {
+#if defined(SIMD_X86) && defined(_MSC_VER)
+  int info[4];
+
+  __cpuid(info, 0);
+  const int maxLeaf = info[0];
+
+  __cpuid(info, 1);
+  if (!(info[3] & (1 << 26))) {
+    return SIMD_NONE;
+  }
+
+  // AVX state must be enabled by the OS as well.
+  const bool osxsave = (info[2] & (1 << 27)) != 0;
+  const bool avx = (info[2] & (1 << 28)) != 0;
+  if (maxLeaf >= 7 && osxsave && avx && (_xgetbv(0) & 0x6) == 0x6) {
+    __cpuidex(info, 7, 0);
+    if (info[1] & (1 << 5)) {
+      return SIMD_AVX2;
+    }
+  }
+
+  return SIMD_SSE2;
+
+#elif defined(SIMD_X86)
+  __builtin_cpu_init();
+  if (__builtin_cpu_supports("avx2")) {
+    return SIMD_AVX2;
+  } else if (__builtin_cpu_supports("sse2")) {
+    return SIMD_SSE2;
+  }
+
+  return SIMD_NONE;
+
+#else
+  return SIMD_NONE;
+
+#endif
+}
+
+static void simdInit() {
+  if (simdDetected) {
+    return;
+  }
+
+  simdSupported = simdDetect();
+  simdLevel = simdSupported;
+  simdDetected = true;
+}
+
+
+#ifdef SIMD_X86
+
+/**
+ * SSE2 kernels, 4 pixels at a time. Remaining pixels use the scalar functions so that results are identical.
+ */
+TARGET_SSE2 static inline __m128i simdSelectSSE2(const __m128i mask, const __m128i a, const __m128i b) {
+  return _mm_or_si128(_mm_and_si128(mask, a), _mm_andnot_si128(mask, b));
+}
+
+// Mixes s over d with per-pixel alpha taken from s, as (s * a + d * (255 - a)) >> 8 per 16 bit channel.
+TARGET_SSE2 static inline __m128i simdMixSSE2(const __m128i s, const __m128i d) {
+  const __m128i zero = _mm_setzero_si128();
+  const __m128i max = _mm_set1_epi16(0xFF);
+
+  const __m128i sLo = _mm_unpacklo_epi8(s, zero);
+  const __m128i sHi = _mm_unpackhi_epi8(s, zero);
+  const __m128i dLo = _mm_unpacklo_epi8(d, zero);
+  const __m128i dHi = _mm_unpackhi_epi8(d, zero);
+
+  const __m128i aLo = _mm_shufflehi_epi16(_mm_shufflelo_epi16(sLo, _MM_SHUFFLE(3, 3, 3, 3)), _MM_SHUFFLE(3, 3, 3, 3));
+  const __m128i aHi = _mm_shufflehi_epi16(_mm_shufflelo_epi16(sHi, _MM_SHUFFLE(3, 3, 3, 3)), _MM_SHUFFLE(3, 3, 3, 3));
+
+  const __m128i rLo = _mm_srli_epi16(_mm_add_epi16(_mm_mullo_epi16(sLo, aLo), _mm_mullo_epi16(dLo, _mm_sub_epi16(max, aLo))), 8);
+  const __m128i rHi = _mm_srli_epi16(_mm_add_epi16(_mm_mullo_epi16(sHi, aHi), _mm_mullo_epi16(dHi, _mm_sub_epi16(max, aHi))), 8);
+
+  return _mm_packus_epi16(rLo, rHi);
+}
+
+TARGET_SSE2 static void blendRowAlphaSimpleSSE2(RGBA* dest, const RGBA* src, const int count) {
+  const __m128i opaque = _mm_set1_epi32((int)0xFF000000);
+
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i s = _mm_loadu_si128((const __m128i*)(src + i));
+    const __m128i mask = _mm_cmpeq_epi32(_mm_and_si128(s, opaque), opaque);
+    const int bits = _mm_movemask_epi8(mask);
+    if (bits == 0) {
+      continue;
+    } else if (bits == 0xFFFF) {
+      _mm_storeu_si128((__m128i*)(dest + i), s);
+      continue;
+    }
+
+    const __m128i d = _mm_loadu_si128((const __m128i*)(dest + i));
+    _mm_storeu_si128((__m128i*)(dest + i), simdSelectSSE2(mask, s, d));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlphaSimple(dest[i], src[i]);
+  }
+}
+
+TARGET_SSE2 static void blendRowAlpha50SSE2(RGBA* dest, const RGBA* src, const int count) {
+  const __m128i opaque = _mm_set1_epi32((int)0xFF000000);
+  const __m128i halfMask = _mm_set1_epi32(0x00FEFEFE);
+
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i s = _mm_loadu_si128((const __m128i*)(src + i));
+    const __m128i mask = _mm_cmpeq_epi32(_mm_and_si128(s, opaque), opaque);
+    if (_mm_movemask_epi8(mask) == 0) {
+      continue;
+    }
+
+    const __m128i d = _mm_loadu_si128((const __m128i*)(dest + i));
+    const __m128i mixed = _mm_or_si128(_mm_add_epi32(_mm_srli_epi32(_mm_and_si128(d, halfMask), 1), _mm_srli_epi32(_mm_and_si128(s, halfMask), 1)), opaque);
+    _mm_storeu_si128((__m128i*)(dest + i), simdSelectSSE2(mask, mixed, d));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha50(dest[i], src[i]);
+  }
+}
+
+TARGET_SSE2 static void blendRowAlphaSSE2(RGBA* dest, const RGBA* src, const int count) {
+  const __m128i opaque = _mm_set1_epi32((int)0xFF000000);
+  const __m128i zero = _mm_setzero_si128();
+
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i s = _mm_loadu_si128((const __m128i*)(src + i));
+    const __m128i alpha = _mm_and_si128(s, opaque);
+    const __m128i transparentMask = _mm_cmpeq_epi32(alpha, zero);
+    const __m128i opaqueMask = _mm_cmpeq_epi32(alpha, opaque);
+    if (_mm_movemask_epi8(transparentMask) == 0xFFFF) {
+      continue;
+    } else if (_mm_movemask_epi8(opaqueMask) == 0xFFFF) {
+      _mm_storeu_si128((__m128i*)(dest + i), s);
+      continue;
+    }
+
+    const __m128i d = _mm_loadu_si128((const __m128i*)(dest + i));
+    const __m128i mixed = _mm_or_si128(simdMixSSE2(s, d), opaque);
+    _mm_storeu_si128((__m128i*)(dest + i), simdSelectSSE2(opaqueMask, s, simdSelectSSE2(transparentMask, d, mixed)));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha(dest[i], src[i]);
+  }
+}
+
+TARGET_SSE2 static void fillRowAlpha50SSE2(RGBA* dest, const RGBA color, const int count) {
+  if (ALPHA(color) != 0xFF) {
+    return;
+  }
+
+  const __m128i opaque = _mm_set1_epi32((int)0xFF000000);
+  const __m128i halfMask = _mm_set1_epi32(0x00FEFEFE);
+  const __m128i half = _mm_set1_epi32((int)((color & 0x00FEFEFE) >> 1));
+
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i d = _mm_loadu_si128((const __m128i*)(dest + i));
+    _mm_storeu_si128((__m128i*)(dest + i), _mm_or_si128(_mm_add_epi32(_mm_srli_epi32(_mm_and_si128(d, halfMask), 1), half), opaque));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha50(dest[i], color);
+  }
+}
+
+TARGET_SSE2 static void fillRowAlphaSSE2(RGBA* dest, const RGBA color, const int count) {
+  const uint8_t alpha = ALPHA(color);
+  if (alpha == 0) {
+    return;
+  }
+
+  const __m128i s = _mm_set1_epi32((int)color);
+
+  int i = 0;
+  if (alpha == 0xFF) {
+    for (; i + 4 <= count; i += 4) {
+      _mm_storeu_si128((__m128i*)(dest + i), s);
+    }
+  } else {
+    const __m128i opaque = _mm_set1_epi32((int)0xFF000000);
+    for (; i + 4 <= count; i += 4) {
+      const __m128i d = _mm_loadu_si128((const __m128i*)(dest + i));
+      _mm_storeu_si128((__m128i*)(dest + i), _mm_or_si128(simdMixSSE2(s, d), opaque));
+    }
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha(dest[i], color);
+  }
+}
+
+TARGET_SSE2 static void widenRow2SSE2(RGBA* dest, const RGBA* src, const int count) {
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i s = _mm_loadu_si128((const __m128i*)(src + i));
+    _mm_storeu_si128((__m128i*)(dest + i * 2), _mm_unpacklo_epi32(s, s));
+    _mm_storeu_si128((__m128i*)(dest + i * 2 + 4), _mm_unpackhi_epi32(s, s));
+  }
+
+  for (; i < count; i++) {
+    dest[i * 2] = src[i];
+    dest[i * 2 + 1] = src[i];
+  }
+}
+
+TARGET_SSE2 static void widenRow3SSE2(RGBA* dest, const RGBA* src, const int count) {
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i s = _mm_loadu_si128((const __m128i*)(src + i));
+    _mm_storeu_si128((__m128i*)(dest + i * 3), _mm_shuffle_epi32(s, _MM_SHUFFLE(1, 0, 0, 0)));
+    _mm_storeu_si128((__m128i*)(dest + i * 3 + 4), _mm_shuffle_epi32(s, _MM_SHUFFLE(2, 2, 1, 1)));
+    _mm_storeu_si128((__m128i*)(dest + i * 3 + 8), _mm_shuffle_epi32(s, _MM_SHUFFLE(3, 3, 3, 2)));
+  }
+
+  for (; i < count; i++) {
+    dest[i * 3] = src[i];
+    dest[i * 3 + 1] = src[i];
+    dest[i * 3 + 2] = src[i];
+  }
+}
+
+TARGET_SSE2 static void widenRow4SSE2(RGBA* dest, const RGBA* src, const int count) {
+  int i = 0;
+  for (; i + 4 <= count; i += 4) {
+    const __m128i s = _mm_loadu_si128((const __m128i*)(src + i));
+    _mm_storeu_si128((__m128i*)(dest + i * 4), _mm_shuffle_epi32(s, _MM_SHUFFLE(0, 0, 0, 0)));
+    _mm_storeu_si128((__m128i*)(dest + i * 4 + 4), _mm_shuffle_epi32(s, _MM_SHUFFLE(1, 1, 1, 1)));
+    _mm_storeu_si128((__m128i*)(dest + i * 4 + 8), _mm_shuffle_epi32(s, _MM_SHUFFLE(2, 2, 2, 2)));
+    _mm_storeu_si128((__m128i*)(dest + i * 4 + 12), _mm_shuffle_epi32(s, _MM_SHUFFLE(3, 3, 3, 3)));
+  }
+
+  for (; i < count; i++) {
+    dest[i * 4] = src[i];
+    dest[i * 4 + 1] = src[i];
+    dest[i * 4 + 2] = src[i];
+    dest[i * 4 + 3] = src[i];
+  }
+}
+
+
+/**
+ * AVX2 kernels, 8 pixels at a time. These mirror the SSE2 kernels; AVX2 unpack and pack instructions work within
+ * 128 bit lanes, which keeps pixels in order.
+ */
+TARGET_AVX2 static inline __m256i simdSelectAVX2(const __m256i mask, const __m256i a, const __m256i b) {
+  return _mm256_or_si256(_mm256_and_si256(mask, a), _mm256_andnot_si256(mask, b));
+}
+
+TARGET_AVX2 static inline __m256i simdMixAVX2(const __m256i s, const __m256i d) {
+  const __m256i zero = _mm256_setzero_si256();
+  const __m256i max = _mm256_set1_epi16(0xFF);
+
+  const __m256i sLo = _mm256_unpacklo_epi8(s, zero);
+  const __m256i sHi = _mm256_unpackhi_epi8(s, zero);
+  const __m256i dLo = _mm256_unpacklo_epi8(d, zero);
+  const __m256i dHi = _mm256_unpackhi_epi8(d, zero);
+
+  const __m256i aLo = _mm256_shufflehi_epi16(_mm256_shufflelo_epi16(sLo, _MM_SHUFFLE(3, 3, 3, 3)), _MM_SHUFFLE(3, 3, 3, 3));
+  const __m256i aHi = _mm256_shufflehi_epi16(_mm256_shufflelo_epi16(sHi, _MM_SHUFFLE(3, 3, 3, 3)), _MM_SHUFFLE(3, 3, 3, 3));
+
+  const __m256i rLo = _mm256_srli_epi16(_mm256_add_epi16(_mm256_mullo_epi16(sLo, aLo), _mm256_mullo_epi16(dLo, _mm256_sub_epi16(max, aLo))), 8);
+  const __m256i rHi = _mm256_srli_epi16(_mm256_add_epi16(_mm256_mullo_epi16(sHi, aHi), _mm256_mullo_epi16(dHi, _mm256_sub_epi16(max, aHi))), 8);
+
+  return _mm256_packus_epi16(rLo, rHi);
+}
+
+TARGET_AVX2 static void blendRowAlphaSimpleAVX2(RGBA* dest, const RGBA* src, const int count) {
+  const __m256i opaque = _mm256_set1_epi32((int)0xFF000000);
+
+  int i = 0;
+  for (; i + 8 <= count; i += 8) {
+    const __m256i s = _mm256_loadu_si256((const __m256i*)(src + i));
+    const __m256i mask = _mm256_cmpeq_epi32(_mm256_and_si256(s, opaque), opaque);
+    const unsigned int bits = (unsigned int)_mm256_movemask_epi8(mask);
+    if (bits == 0) {
+      continue;
+    } else if (bits == 0xFFFFFFFF) {
+      _mm256_storeu_si256((__m256i*)(dest + i), s);
+      continue;
+    }
+
+    const __m256i d = _mm256_loadu_si256((const __m256i*)(dest + i));
+    _mm256_storeu_si256((__m256i*)(dest + i), simdSelectAVX2(mask, s, d));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlphaSimple(dest[i], src[i]);
+  }
+}
+
+TARGET_AVX2 static void blendRowAlpha50AVX2(RGBA* dest, const RGBA* src, const int count) {
+  const __m256i opaque = _mm256_set1_epi32((int)0xFF000000);
+  const __m256i halfMask = _mm256_set1_epi32(0x00FEFEFE);
+
+  int i = 0;
+  for (; i + 8 <= count; i += 8) {
+    const __m256i s = _mm256_loadu_si256((const __m256i*)(src + i));
+    const __m256i mask = _mm256_cmpeq_epi32(_mm256_and_si256(s, opaque), opaque);
+    if (_mm256_movemask_epi8(mask) == 0) {
+      continue;
+    }
+
+    const __m256i d = _mm256_loadu_si256((const __m256i*)(dest + i));
+    const __m256i mixed = _mm256_or_si256(_mm256_add_epi32(_mm256_srli_epi32(_mm256_and_si256(d, halfMask), 1), _mm256_srli_epi32(_mm256_and_si256(s, halfMask), 1)), opaque);
+    _mm256_storeu_si256((__m256i*)(dest + i), simdSelectAVX2(mask, mixed, d));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha50(dest[i], src[i]);
+  }
+}
+
+TARGET_AVX2 static void blendRowAlphaAVX2(RGBA* dest, const RGBA* src, const int count) {
+  const __m256i opaque = _mm256_set1_epi32((int)0xFF000000);
+  const __m256i zero = _mm256_setzero_si256();
+
+  int i = 0;
+  for (; i + 8 <= count; i += 8) {
+    const __m256i s = _mm256_loadu_si256((const __m256i*)(src + i));
+    const __m256i alpha = _mm256_and_si256(s, opaque);
+    const __m256i transparentMask = _mm256_cmpeq_epi32(alpha, zero);
+    const __m256i opaqueMask = _mm256_cmpeq_epi32(alpha, opaque);
+    if ((unsigned int)_mm256_movemask_epi8(transparentMask) == 0xFFFFFFFF) {
+      continue;
+    } else if ((unsigned int)_mm256_movemask_epi8(opaqueMask) == 0xFFFFFFFF) {
+      _mm256_storeu_si256((__m256i*)(dest + i), s);
+      continue;
+    }
+
+    const __m256i d = _mm256_loadu_si256((const __m256i*)(dest + i));
+    const __m256i mixed = _mm256_or_si256(simdMixAVX2(s, d), opaque);
+    _mm256_storeu_si256((__m256i*)(dest + i), simdSelectAVX2(opaqueMask, s, simdSelectAVX2(transparentMask, d, mixed)));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha(dest[i], src[i]);
+  }
+}
+
+TARGET_AVX2 static void fillRowAlpha50AVX2(RGBA* dest, const RGBA color, const int count) {
+  if (ALPHA(color) != 0xFF) {
+    return;
+  }
+
+  const __m256i opaque = _mm256_set1_epi32((int)0xFF000000);
+  const __m256i halfMask = _mm256_set1_epi32(0x00FEFEFE);
+  const __m256i half = _mm256_set1_epi32((int)((color & 0x00FEFEFE) >> 1));
+
+  int i = 0;
+  for (; i + 8 <= count; i += 8) {
+    const __m256i d = _mm256_loadu_si256((const __m256i*)(dest + i));
+    _mm256_storeu_si256((__m256i*)(dest + i), _mm256_or_si256(_mm256_add_epi32(_mm256_srli_epi32(_mm256_and_si256(d, halfMask), 1), half), opaque));
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha50(dest[i], color);
+  }
+}
+
+TARGET_AVX2 static void fillRowAlphaAVX2(RGBA* dest, const RGBA color, const int count) {
+  const uint8_t alpha = ALPHA(color);
+  if (alpha == 0) {
+    return;
+  }
+
+  const __m256i s = _mm256_set1_epi32((int)color);
+
+  int i = 0;
+  if (alpha == 0xFF) {
+    for (; i + 8 <= count; i += 8) {
+      _mm256_storeu_si256((__m256i*)(dest + i), s);
+    }
+  } else {
+    const __m256i opaque = _mm256_set1_epi32((int)0xFF000000);
+    for (; i + 8 <= count; i += 8) {
+      const __m256i d = _mm256_loadu_si256((const __m256i*)(dest + i));
+      _mm256_storeu_si256((__m256i*)(dest + i), _mm256_or_si256(simdMixAVX2(s, d), opaque));
+    }
+  }
+
+  for (; i < count; i++) {
+    dest[i] = renderPixelAlpha(dest[i], color);
+  }
+}
+
+#endif
+
+
+/**
+ * Returns a vectorized row blending function for a blend operation, or NULL if the scalar path should be used.
+ *
+ * @param blendOp The blend operation to look up.
+ */
+BlendRowFunc renderSIMDBlendRow(const BlendOp blendOp) {
+  simdInit();
+
+#ifdef SIMD_X86
+  if (simdLevel == SIMD_AVX2) {
+    switch (blendOp) {
+      case BLENDOP_ALPHA:        return blendRowAlphaAVX2;
+      case BLENDOP_ALPHA50:      return blendRowAlpha50AVX2;
+      case BLENDOP_ALPHA_SIMPLE: return blendRowAlphaSimpleAVX2;
+      default:                   return NULL;
+    }
+  } else if (simdLevel == SIMD_SSE2) {
+    switch (blendOp) {
+      case BLENDOP_ALPHA:        return blendRowAlphaSSE2;
+      case BLENDOP_ALPHA50:      return blendRowAlpha50SSE2;
+      case BLENDOP_ALPHA_SIMPLE: return blendRowAlphaSimpleSSE2;
+      default:                   return NULL;
+    }
+  }
+#endif
+
+  return NULL;
+}
+
+/**
+ * Returns a vectorized row fill function for a blend operation, or NULL if the scalar path should be used.
+ *
+ * @param blendOp The blend operation to look up.
+ */
+FillRowFunc renderSIMDFillRow(const BlendOp blendOp) {
+  simdInit();
+
+#ifdef SIMD_X86
+  if (simdLevel == SIMD_AVX2) {
+    switch (blendOp) {
+      case BLENDOP_ALPHA:   return fillRowAlphaAVX2;
+      case BLENDOP_ALPHA50: return fillRowAlpha50AVX2;
+      default:              return NULL;
+    }
+  } else if (simdLevel == SIMD_SSE2) {
+    switch (blendOp) {
+      case BLENDOP_ALPHA:   return fillRowAlphaSSE2;
+      case BLENDOP_ALPHA50: return fillRowAlpha50SSE2;
+      default:              return NULL;
+    }
+  }
+#endif
+
+  return NULL;
+}
+
+/**
+ * Returns a vectorized row widening function for an integer scale, or NULL if the scalar path should be used. Widening
+ * is bound by memory bandwidth, so SSE2 kernels are used at the AVX2 level as well.
+ *
+ * @param scale The number of times each pixel is repeated.
+ */
+WidenRowFunc renderSIMDWidenRow(const unsigned int scale) {
+  simdInit();
+
+#ifdef SIMD_X86
+  if (simdLevel >= SIMD_SSE2) {
+    switch (scale) {
+      case 2:  return widenRow2SSE2;
+      case 3:  return widenRow3SSE2;
+      case 4:  return widenRow4SSE2;
+      default: return NULL;
+    }
+  }
+#endif
+
+  return NULL;
+}
+
+/**
+ * Returns the SIMD level that rendering operations currently use.
+ */
+EXPORT SIMDLevel renderGetSIMD() {
+  simdInit();
+  return simdLevel;
+}
+
+/**
+ * Returns the highest SIMD level supported on this machine.
+ */
+EXPORT SIMDLevel renderGetSIMDSupported() {
+  simdInit();
+  return simdSupported;
+}
+
+/**
+ * Sets the SIMD level that rendering operations use. SIMD_NONE forces the scalar implementation.
+ *
+ * @param level The SIMD level to use. This is limited to the highest supported level.
+ *
+ * @return The SIMD level that is now in use.
+ */
+EXPORT SIMDLevel renderSetSIMD(const SIMDLevel level) {
+  simdInit();
+
+  if (level < SIMD_NONE) {
+    simdLevel = SIMD_NONE;
+  } else if (level > simdSupported) {
+    simdLevel = simdSupported;
+  } else {
+    simdLevel = level;
+  }
+
+  return simdLevel;
+}
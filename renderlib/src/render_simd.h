@@ -0,0 +1,55 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#ifndef H_RENDER_SIMD
+#define H_RENDER_SIMD
+
+#include "surface.h"
+#include "render.h"
+
+typedef enum {
+  SIMD_NONE = 0,
+  SIMD_SSE2 = 1,
+  SIMD_AVX2 = 2
+} SIMDLevel;
+
+// Blends a row of source pixels onto a row of destination pixels.
+typedef void (*BlendRowFunc)(RGBA* dest, const RGBA* src, const int count);
+
+// Blends a single color onto a row of destination pixels.
+typedef void (*FillRowFunc)(RGBA* dest, const RGBA color, const int count);
+
+// Repeats each pixel of a row a fixed number of times.
+typedef void (*WidenRowFunc)(RGBA* dest, const RGBA* src, const int count);
+
+BlendRowFunc renderSIMDBlendRow(const BlendOp blendOp);
+FillRowFunc  renderSIMDFillRow (const BlendOp blendOp);
+WidenRowFunc renderSIMDWidenRow(const unsigned int scale);
+
+EXPORT SIMDLevel renderGetSIMD          ();
+EXPORT SIMDLevel renderGetSIMDSupported ();
+EXPORT SIMDLevel renderSetSIMD          (const SIMDLevel level);
+
+#endif
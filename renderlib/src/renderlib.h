@@ -33,7 +33,17 @@
 #include <string.h>
 #include <math.h>
 
-#define EXPORT __declspec(dllexport)
+#ifdef _WIN32
+  #define EXPORT __declspec(dllexport)
+#else
+  #define EXPORT __attribute__((visibility("default")))
+
+  // Only the Windows C runtime provides fopen_s.
+  static inline int fopen_s(FILE** fp, const char* fileName, const char* mode) {
+    *fp = fopen(fileName, mode);
+    return (*fp == NULL);
+  }
+#endif
 
 typedef enum {
   ENDIANNESS_LITTLE = 0,
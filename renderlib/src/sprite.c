@@ -0,0 +1,254 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#include "renderlib.h"
+#include "surface.h"
+#include "utils.h"
+#include "render.h"
+#include "render_simd.h"
+#include "sprite.h"
+#include "pixel.h"
+
+// Visibility classes of a sprite pixel.
+#define SPRITE_TRANSPARENT 0
+#define SPRITE_TRANSLUCENT 1
+#define SPRITE_OPAQUE      2
+
+
+static inline int spritePixelClass(const RGBA pixel) {
+  if (ALPHA(pixel) == 0) {
+    return SPRITE_TRANSPARENT;
+  } else if (ALPHA(pixel) == 0xFF) {
+    return SPRITE_OPAQUE;
+  }
+
+  return SPRITE_TRANSLUCENT;
+}
+
+// Premultiply a pixel's color channels by its alpha.
+static inline RGBA spritePremultiply(const RGBA pixel) {
+  const uint32_t alpha = ALPHA(pixel);
+  const uint32_t RB = ((pixel & 0x00FF00FF) * alpha >> 8) & 0x00FF00FF;
+  const uint32_t G = ((pixel & 0x0000FF00) * alpha >> 8) & 0x0000FF00;
+
+  return (alpha << 24) | RB | G;
+}
+
+// Blend a premultiplied pixel onto a destination pixel.
+static inline RGBA spritePixelPremultiplied(const RGBA dest, const RGBA src) {
+  const uint32_t inverse = 0xFF - ALPHA(src);
+  const uint32_t RB = ((dest & 0x00FF00FF) * inverse >> 8) & 0x00FF00FF;
+  const uint32_t G = ((dest & 0x0000FF00) * inverse >> 8) & 0x0000FF00;
+
+  return 0xFF000000 | ((src & 0x00FFFFFF) + (RB | G));
+}
+
+/**
+ * Creates a run-length encoded sprite from a surface.
+ *
+ * @param  surface The Surface to encode.
+ *
+ * @return         A new Sprite or NULL if it could not be created.
+ */
+EXPORT Sprite* spriteCreate(const Surface* surface) {
+  if (!surface) {
+    return NULL;
+  }
+
+  Sprite* sprite = calloc(1, sizeof(Sprite));
+  if (!sprite) {
+    return NULL;
+  }
+
+  sprite->width = surface->width;
+  sprite->height = surface->height;
+
+  // Count runs and visible pixels first, so that everything can be allocated at once.
+  for (int y = 0; y < surface->height; y++) {
+    int previous = SPRITE_TRANSPARENT;
+    for (int x = 0; x < surface->width; x++) {
+      const int pixelClass = spritePixelClass(surface->rows[y][x]);
+      if (pixelClass != SPRITE_TRANSPARENT) {
+        sprite->pixelCount++;
+        if (pixelClass != previous) {
+          sprite->runCount++;
+        }
+      }
+      previous = pixelClass;
+    }
+  }
+
+  sprite->rows = calloc(sprite->height + 1, sizeof(unsigned int));
+  sprite->runs = calloc(sprite->runCount ? sprite->runCount : 1, sizeof(SpriteRun));
+  sprite->pixels = calloc(sprite->pixelCount ? sprite->pixelCount : 1, sizeof(RGBA));
+  if (!sprite->rows || !sprite->runs || !sprite->pixels) {
+    spriteDestroy(sprite);
+    return NULL;
+  }
+
+  SpriteRun* run = NULL;
+  unsigned int runIndex = 0;
+  unsigned int pixelIndex = 0;
+  for (int y = 0; y < surface->height; y++) {
+    sprite->rows[y] = runIndex;
+
+    int previous = SPRITE_TRANSPARENT;
+    for (int x = 0; x < surface->width; x++) {
+      const RGBA pixel = surface->rows[y][x];
+      const int pixelClass = spritePixelClass(pixel);
+      if (pixelClass == SPRITE_TRANSPARENT) {
+        previous = pixelClass;
+        continue;
+      }
+
+      if (pixelClass != previous) {
+        run = &sprite->runs[runIndex++];
+        run->x = x;
+        run->length = 0;
+        run->opaque = (pixelClass == SPRITE_OPAQUE);
+        run->offset = pixelIndex;
+      }
+
+      sprite->pixels[pixelIndex++] = (pixelClass == SPRITE_OPAQUE) ? pixel : spritePremultiply(pixel);
+      run->length++;
+      previous = pixelClass;
+    }
+  }
+  sprite->rows[sprite->height] = runIndex;
+
+  return sprite;
+}
+
+/**
+ * Destroys a sprite.
+ *
+ * @param sprite The Sprite to destroy.
+ */
+EXPORT void spriteDestroy(Sprite* sprite) {
+  if (!sprite) {
+    return;
+  }
+
+  free(sprite->rows);
+  free(sprite->runs);
+  free(sprite->pixels);
+  free(sprite);
+}
+
+// Return a sprite's properties
+EXPORT uint32_t spriteGetWidth(const Sprite* sprite) {
+  return sprite->width;
+}
+
+EXPORT uint32_t spriteGetHeight(const Sprite* sprite) {
+  return sprite->height;
+}
+
+EXPORT uint32_t spriteGetRunCount(const Sprite* sprite) {
+  return sprite->runCount;
+}
+
+EXPORT uint32_t spriteGetPixelCount(const Sprite* sprite) {
+  return sprite->pixelCount;
+}
+
+/**
+ * Blits a sprite onto a Surface. Transparent pixels are skipped entirely.
+ *
+ * BLENDOP_ALPHA_SIMPLE copies opaque runs and skips translucent runs.
+ * BLENDOP_ALPHA50 mixes opaque runs at 50% and skips translucent runs.
+ * BLENDOP_ALPHA copies opaque runs and blends translucent runs with their premultiplied color. Because the color is
+ * premultiplied ahead of time, this can differ by one step per channel from blitting the original Surface.
+ * BLENDOP_SOLID is not supported, because a sprite does not store its transparent pixels.
+ *
+ * @param destSurface The Surface to blit onto.
+ * @param sprite      The Sprite to blit.
+ * @param x           The X coordinate to blit to.
+ * @param y           The Y coordinate to blit to.
+ * @param blendOp     The blend operation to blit with.
+ */
+EXPORT void renderBlitSprite(const Surface* destSurface, const Sprite* sprite, const int x, const int y, const BlendOp blendOp) {
+  if (!destSurface || !sprite || blendOp == BLENDOP_SOLID) {
+    return;
+  }
+
+  const int y1 = (y < 0) ? -y : 0;
+  const int y2 = (y + sprite->height > destSurface->height) ? destSurface->height - y : sprite->height;
+  const BlendRowFunc blendRow = (blendOp == BLENDOP_ALPHA50) ? renderSIMDBlendRow(BLENDOP_ALPHA50) : NULL;
+
+  if (y1 >= y2) {
+    return;
+  }
+
+  // Only the pixels of runs that are drawn count towards the statistics.
+  renderStats.blits++;
+
+  for (int row = y1; row < y2; row++) {
+    RGBA* destRow = destSurface->rows[y + row];
+
+    for (unsigned int index = sprite->rows[row]; index < sprite->rows[row + 1]; index++) {
+      const SpriteRun* run = &sprite->runs[index];
+      if (!run->opaque && blendOp != BLENDOP_ALPHA) {
+        continue;
+      }
+
+      // Clip the run horizontally.
+      int start = x + run->x;
+      int skip = 0;
+      int length = run->length;
+      if (start < 0) {
+        skip = -start;
+        length -= skip;
+        start = 0;
+      }
+      if (start + length > destSurface->width) {
+        length = destSurface->width - start;
+      }
+      if (length <= 0) {
+        continue;
+      }
+
+      RGBA* dest = destRow + start;
+      const RGBA* src = sprite->pixels + run->offset + skip;
+      renderStats.pixels += length;
+
+      if (!run->opaque) {
+        for (int i = 0; i < length; i++) {
+          dest[i] = spritePixelPremultiplied(dest[i], src[i]);
+        }
+      } else if (blendOp == BLENDOP_ALPHA50) {
+        if (blendRow) {
+          blendRow(dest, src, length);
+        } else {
+          for (int i = 0; i < length; i++) {
+            dest[i] = renderPixelAlpha50(dest[i], src[i]);
+          }
+        }
+      } else {
+        memcpy(dest, src, length * sizeof(RGBA));
+      }
+    }
+  }
+}
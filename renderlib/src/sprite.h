@@ -0,0 +1,63 @@
+/*
+  Copyright (c) 2016, Dennis Meuwissen
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions are met:
+
+  1. Redistributions of source code must retain the above copyright notice, this
+     list of conditions and the following disclaimer.
+  2. Redistributions in binary form must reproduce the above copyright notice,
+     this list of conditions and the following disclaimer in the documentation
+     and/or other materials provided with the distribution.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+  ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+  WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+  DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+  ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+  (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+  ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+  (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+*/
+
+#ifndef H_SPRITE
+#define H_SPRITE
+
+#include "surface.h"
+#include "render.h"
+
+// A horizontal run of visible pixels in a sprite row.
+typedef struct {
+  int x;
+  int length;
+  bool opaque;
+  unsigned int offset;
+} SpriteRun;
+
+// A run-length encoded sprite. Fully transparent pixels are not stored, translucent pixels are premultiplied.
+typedef struct {
+  int width;
+  int height;
+
+  SpriteRun* runs;
+  unsigned int runCount;
+
+  // Index of the first run of each row, plus one entry for the end of the last row.
+  unsigned int* rows;
+
+  RGBA* pixels;
+  unsigned int pixelCount;
+} Sprite;
+
+EXPORT Sprite*      spriteCreate         (const Surface* surface);
+EXPORT void         spriteDestroy        (Sprite* sprite);
+EXPORT uint32_t     spriteGetWidth       (const Sprite* sprite);
+EXPORT uint32_t     spriteGetHeight      (const Sprite* sprite);
+EXPORT uint32_t     spriteGetRunCount    (const Sprite* sprite);
+EXPORT uint32_t     spriteGetPixelCount  (const Sprite* sprite);
+EXPORT void         renderBlitSprite     (const Surface* destSurface, const Sprite* sprite, const int x, const int y, const BlendOp blendOp);
+
+#endif
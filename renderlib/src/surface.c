@@ -27,8 +27,15 @@
 #include "surface.h"
 #include "png.h"
 #include "utils.h"
+#include "render.h"
+#include "render_simd.h"
 
 bool surfaceAllocate(Surface* surface) {
+  // Borrowed pixel data is owned by the caller, and cannot be reallocated
+  if (surface->borrowed) {
+    return false;
+  }
+
   surface->length = surface->width * surface->height * sizeof(RGBA);
 
   RGBA* dataPtr;
@@ -69,80 +76,43 @@ bool surfaceResize(Surface* surface, const unsigned int width, const unsigned in
   return surfaceAllocate(surface);
 }
 
-// Copy a surface to a regular DIB, doubling each pixel
-void surfaceCopyToBitmapDouble(const Surface* srcSurface, uint32_t* ptrBitmapBits, const unsigned int destWidth, const unsigned int destHeight) {
-  if (!srcSurface || !ptrBitmapBits) {
+// Copy a surface to a 32 bit pixel buffer, scaling it up by an integer factor
+// Each source row is widened once, then the widened row is duplicated with memcpy. With flipY set, rows are written
+// bottom-up, as in a Windows DIB.
+void surfaceCopyScaled(const Surface* srcSurface, uint32_t* dest, const unsigned int destWidth, const unsigned int destHeight, const unsigned int scale, const bool flipY) {
+  if (!srcSurface || !dest || scale < 1) {
     return;
   }
 
-  unsigned int cx, cy;
-  RGBA* src;
-  uint32_t* dest = ptrBitmapBits;
+  const unsigned int width = ((unsigned int)srcSurface->width < destWidth / scale) ? (unsigned int)srcSurface->width : destWidth / scale;
+  const unsigned int height = ((unsigned int)srcSurface->height < destHeight / scale) ? (unsigned int)srcSurface->height : destHeight / scale;
+  const size_t rowLength = width * scale * sizeof(uint32_t);
+  const WidenRowFunc widenRow = renderSIMDWidenRow(scale);
 
-  cy = destHeight >> 1;
-  while (cy--) {
-    src = srcSurface->rows[cy];
-    cx = destWidth >> 1;
-    while (cx--) {
-      *dest++ = *src;
-      *dest++ = *src;
-      src++;
-    }
+  for (unsigned int y = 0; y < height; y++) {
+    const unsigned int destY = flipY ? destHeight - (y + 1) * scale : y * scale;
+    uint32_t* destRow = dest + destY * destWidth;
+    const RGBA* src = srcSurface->rows[y];
 
-    src = srcSurface->rows[cy];
-    cx = destWidth >> 1;
-    while (cx--) {
-      *dest++ = *src;
-      *dest++ = *src;
-      src++;
+    if (scale == 1) {
+      memcpy(destRow, src, rowLength);
+      continue;
     }
-  }
-}
-
-// Copy a surface to a regular DIB
-void surfaceCopyToBitmap(const Surface *srcSurface, uint32_t* ptrBitmapBits) {
-  if (!srcSurface || !ptrBitmapBits) {
-    return;
-  }
-
-  const int len = srcSurface->width << 2;
-  uint32_t* src = srcSurface->rows[srcSurface->height - 1];
-  uint32_t* dest = ptrBitmapBits;
-
-  for (int y = 0; y < srcSurface->height; y++) {
-    memcpy(dest, src, len);
-    src -= srcSurface->width;
-    dest += srcSurface->width;
-  }
-}
-
-// Copy a surface to an SDL surface, scaling each pixel
-void surfaceCopyToBitmapScaled(const Surface* srcSurface, uint32_t* ptrBitmapBits, const unsigned int destWidth, const unsigned int destHeight, const unsigned int scale) {
-  if (!srcSurface || !ptrBitmapBits) {
-    return;
-  }
-
-  unsigned int cx, cy;
-  double cu, cv;
-  uint32_t* dest;
 
-  const double factor = 1.0 / scale;
-  uint32_t* destRow = ptrBitmapBits + (destHeight * destWidth) - destWidth;
-
-  cv = 0;
-  cy = destHeight - 1;
-  while (cy--) {
-    cu = 0;
-    dest = destRow;
-
-    cx = destWidth - 1;
-    while (cx--) {
-      *dest++ = srcSurface->rows[(uint32_t)cv][(uint32_t)cu];
-      cu += factor;
+    if (widenRow) {
+      widenRow(destRow, src, width);
+    } else {
+      uint32_t* destPixel = destRow;
+      for (unsigned int x = 0; x < width; x++) {
+        for (unsigned int i = 0; i < scale; i++) {
+          *destPixel++ = src[x];
+        }
+      }
     }
 
-    cv += factor;
-    destRow -= destWidth;
+    for (unsigned int i = 1; i < scale; i++) {
+      memcpy(destRow + i * destWidth, destRow, rowLength);
+    }
   }
 }
 
@@ -319,6 +289,39 @@ EXPORT Surface* surfaceReadFromPNG(const char* fileName) {
   } else if (png->bitDepth == 8 && png->colorType == PNG_COLOR_TYPE_RGB_ALPHA) {
     pngRead(png, (uint8_t*)surface->data, NULL);
 
+  // Palette, expand to RGBA with alpha from the transparency chunk
+  } else if (png->bitDepth == 8 && png->colorType == PNG_COLOR_TYPE_PALETTE) {
+    uint8_t* imageData = calloc(1, png->width * png->height);
+    if (!imageData) {
+      pngClose(png);
+      return NULL;
+    }
+    uint8_t palette[256 * 3] = {0};
+    pngRead(png, imageData, palette);
+
+    uint8_t alpha[256];
+    memset(alpha, 0xFF, sizeof(alpha));
+    png_bytep trans;
+    int numTrans = 0;
+    png_color_16p transValues;
+    if (png_get_tRNS(png->pngPtr, png->infoPtr, &trans, &numTrans, &transValues) && numTrans > 0) {
+      memcpy(alpha, trans, numTrans);
+    }
+
+    RGBA colors[256];
+    for (int i = 0; i < 256; i++) {
+      colors[i] = BGRA(palette[i * 3 + 0], palette[i * 3 + 1], palette[i * 3 + 2], alpha[i]);
+    }
+
+    int x, y;
+    for (y = 0; y < surface->height; y++) {
+      for (x = 0; x < surface->width; x++) {
+        surface->rows[y][x] = colors[imageData[x + y * surface->width]];
+      }
+    }
+
+    free(imageData);
+
   // Unsupported format
   } else {
     pngClose(png);
@@ -349,6 +352,37 @@ EXPORT Surface* surfaceCreate(const unsigned int width, const unsigned int heigh
   return surface;
 }
 
+// Create a surface around existing pixel data, without copying it
+// The data must remain valid for as long as the surface exists, and is not freed along with it
+EXPORT Surface* surfaceCreateFromBuffer(RGBA* data, const unsigned int width, const unsigned int height) {
+  if (!data) {
+    return NULL;
+  }
+
+  Surface* surface = calloc(1, sizeof(Surface));
+  if (!surface) {
+    return NULL;
+  }
+
+  surface->width = width;
+  surface->height = height;
+  surface->length = width * height * sizeof(RGBA);
+  surface->data = data;
+  surface->borrowed = true;
+
+  surface->rows = calloc(1, height * sizeof(RGBA*));
+  if (!surface->rows) {
+    free(surface);
+    return NULL;
+  }
+
+  for (unsigned int row = 0; row < height; row++) {
+    surface->rows[row] = surface->data + row * width;
+  }
+
+  return surface;
+}
+
 // Destroy a surface
 EXPORT void surfaceDestroy(Surface* surface) {
   if (!surface) {
@@ -356,7 +390,9 @@ EXPORT void surfaceDestroy(Surface* surface) {
   }
 
   free(surface->rows);
-  free(surface->data);
+  if (!surface->borrowed) {
+    free(surface->data);
+  }
   free(surface);
 }
 
@@ -383,6 +419,8 @@ EXPORT void surfaceFill(const Surface* destSurface, const RGBA color) {
     return;
   }
 
+  RENDER_STATS_FILL((uint64_t)destSurface->width * destSurface->height);
+
   for (int pixel = 0; pixel < destSurface->width * destSurface->height; pixel++) {
     *(destSurface->data + pixel) = color;
   }
@@ -393,6 +431,8 @@ EXPORT void surfaceClear(const Surface* surface) {
   if (!surface) {
     return;
   }
+
+  RENDER_STATS_FILL((uint64_t)surface->width * surface->height);
   memset(surface->data, 0, surface->length);
 }
 
@@ -407,6 +447,24 @@ EXPORT Surface* surfaceClone(const Surface* surface) {
   return newSurface;
 }
 
+// Scale a surface up by an integer factor onto another surface
+EXPORT void surfaceScale(const Surface* srcSurface, const Surface* destSurface, const unsigned int scale) {
+  if (!destSurface) {
+    return;
+  }
+
+  surfaceCopyScaled(srcSurface, destSurface->data, destSurface->width, destSurface->height, scale, false);
+}
+
+// Return a pointer to a surface's pixel data, stored as consecutive rows
+EXPORT RGBA* surfaceGetData(const Surface* surface) {
+  if (!surface) {
+    return NULL;
+  }
+
+  return surface->data;
+}
+
 EXPORT Rectangle surfaceUsedRect(const Surface* surface) {
   Rectangle rect = {surface->width, surface->height, 0, 0};
 
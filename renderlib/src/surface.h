@@ -34,13 +34,12 @@ typedef struct {
   unsigned int length;
   RGBA* data;
   RGBA** rows;
+  bool borrowed;
 } Surface;
 
 bool surfaceAllocate           (Surface* surface);
 bool surfaceResize             (Surface* surface, const unsigned int width, const unsigned int height);
-void surfaceCopyToBitmapDouble (const Surface* srcSurface, uint32_t* ptrBitmapBits, const unsigned int destWidth, const unsigned int destHeight);
-void surfaceCopyToBitmap       (const Surface *srcSurface, uint32_t* ptrBitmapBits);
-void surfaceCopyToBitmapScaled (const Surface* srcSurface, uint32_t* ptrBitmapBits, const unsigned int destWidth, const unsigned int destHeight, unsigned int scale);
+void surfaceCopyScaled         (const Surface* srcSurface, uint32_t* dest, const unsigned int destWidth, const unsigned int destHeight, const unsigned int scale, const bool flipY);
 
 EXPORT Surface* surfaceFlipY              (const Surface* srcSurface);
 EXPORT uint32_t surfaceGetWidth           (const Surface* surface);
@@ -48,10 +47,13 @@ EXPORT uint32_t surfaceGetHeight          (const Surface* surface);
 EXPORT bool     surfaceWriteToPNG         (const Surface* surface, const char* fileName, const unsigned int compressLevel);
 EXPORT Surface* surfaceReadFromPNG        (const char* fileName);
 EXPORT Surface* surfaceCreate             (const unsigned int width, const unsigned int height);
+EXPORT Surface* surfaceCreateFromBuffer   (RGBA* data, const unsigned int width, const unsigned int height);
 EXPORT void     surfaceDestroy            (Surface* surface);
 EXPORT void     surfaceExtract            (const Surface* srcSurface, const Surface* destSurface, const int x, const int y);
 EXPORT void     surfaceFill               (const Surface* destSurface, const RGBA color);
 EXPORT void     surfaceClear              (const Surface* surface);
 EXPORT Surface* surfaceClone              (const Surface* surface);
+EXPORT RGBA*    surfaceGetData            (const Surface* surface);
+EXPORT void     surfaceScale              (const Surface* srcSurface, const Surface* destSurface, const unsigned int scale);
 
 #endif
@@ -0,0 +1,432 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Command line tools for Turrican II CDTV game data, without the editor UI or wx.
+# Run from the program's root directory, for example: python src/cli.py stats <game directory>
+
+import argparse
+import json
+import os.path
+import shutil
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+from turrican2.collisiongrid import CollisionGrid
+from turrican2.game import Game
+from turrican2.level import Level
+from turrican2.tilemap import Tilemap
+from turrican2.tileset import CollisionType, TileSet
+from turrican2.tracing import Tracer
+
+import config
+
+
+COLLISION_NAMES: Dict[int, str] = {
+    CollisionType.SOLID: 'solid',
+    CollisionType.DESTRUCTABLE: 'destructable',
+    CollisionType.SECRET: 'secret',
+    CollisionType.HURT: 'hurt',
+}
+
+# Commands return machine-readable data, human-readable lines and an exit code.
+CommandResult = Tuple[Dict, List[str], int]
+
+
+def load_game(args) -> Game:
+    if not Game.is_game_directory(args.directory):
+        raise Exception('"{}" is not a valid Turrican II CDTV directory.'.format(args.directory))
+
+    game = Game(args.directory)
+    game.load(args.level_data)
+    return game
+
+
+def level_key(world_index: int, level_index: int) -> str:
+    return '{}-{}'.format(world_index + 1, level_index + 1)
+
+
+def command_load(args) -> CommandResult:
+    start = time.perf_counter()
+    game = load_game(args)
+    elapsed = time.perf_counter() - start
+
+    levels = [level_key(world_index, level_index) for world_index, level_index, _ in game.iter_levels()]
+    data = {
+        'directory': args.directory,
+        'worlds': len(game.worlds),
+        'levels': levels,
+        'seconds': round(elapsed, 4),
+    }
+    lines = ['Loaded {} worlds and {} levels in {:.3f} seconds.'.format(len(game.worlds), len(levels), elapsed)]
+
+    return data, lines, 0
+
+
+def validate_level(level: Level) -> List[Dict]:
+    issues = []
+
+    def add(severity: str, message: str):
+        issues.append({'severity': severity, 'message': message})
+
+    bytes_left = level.get_entity_bytes_left()
+    if bytes_left < 0:
+        add('error', 'Entity blockmap is {} bytes over its maximum size of {}.'.format(-bytes_left, level.maximum_blockmap_size))
+
+    pixel_width = level.tilemap.width * Tilemap.TILE_SIZE
+    pixel_height = level.tilemap.height * Tilemap.TILE_SIZE
+    if not (0 <= level.player_x < pixel_width and 0 <= level.player_y < pixel_height):
+        add('error', 'Player start {}, {} is outside of the tilemap.'.format(level.player_x, level.player_y))
+    if not (0 <= level.camera_tile_x < level.tilemap.width and 0 <= level.camera_tile_y < level.tilemap.height):
+        add('warning', 'Camera start {}, {} is outside of the tilemap.'.format(level.camera_tile_x, level.camera_tile_y))
+
+    templates = level.get_entity_templates()
+    unknown = Counter()
+    for entity in level.entities:
+        if (entity.type, entity.subtype) not in templates:
+            unknown[(entity.type, entity.subtype)] += 1
+
+        x = entity.x * Level.ORIGIN_SIZE
+        y = entity.y * Level.ORIGIN_SIZE
+        if not (0 <= x < pixel_width and 0 <= y < pixel_height):
+            add('warning', 'Entity {}, {} at {}, {} is outside of the tilemap.'.format(entity.type, entity.subtype, x, y))
+
+    for (entity_type, entity_subtype), count in sorted(unknown.items()):
+        add('warning', 'Unknown entity template {}, {} is used {} time(s).'.format(entity_type, entity_subtype, count))
+
+    return issues
+
+
+def command_validate(args) -> CommandResult:
+    game = load_game(args)
+
+    levels = []
+    lines = []
+    errors = 0
+    for world_index, level_index, level in game.iter_levels():
+        issues = validate_level(level)
+        levels.append({'level': level_key(world_index, level_index), 'name': level.name, 'issues': issues})
+
+        for issue in issues:
+            lines.append('{}: {}: {}'.format(level_key(world_index, level_index), issue['severity'], issue['message']))
+            if issue['severity'] == 'error':
+                errors += 1
+
+    lines.append('{} level(s) checked, {} error(s), {} warning(s).'.format(len(levels), errors, len(lines) - errors))
+
+    return {'levels': levels, 'errors': errors}, lines, 1 if errors else 0
+
+
+def export_level(world_index: int, level_index: int, level: Level) -> Dict:
+    tilemap = level.tilemap
+    templates = level.get_entity_templates()
+
+    entities = []
+    for entity in level.entities:
+        template = templates.get((entity.type, entity.subtype), None)
+        entities.append({
+            'type': entity.type,
+            'subtype': entity.subtype,
+            'x': entity.x,
+            'y': entity.y,
+            'name': template.name if template else None,
+        })
+
+    return {
+        'level': level_key(world_index, level_index),
+        'name': level.name,
+        'width': tilemap.width,
+        'height': tilemap.height,
+        'tiles': [list(tilemap.tiles[y * tilemap.width:(y + 1) * tilemap.width]) for y in range(tilemap.height)],
+        'entities': entities,
+        'player': {'x': level.player_x, 'y': level.player_y},
+        'camera': {'tile_x': level.camera_tile_x, 'tile_y': level.camera_tile_y},
+        'blockmap_bytes_left': level.get_entity_bytes_left(),
+    }
+
+
+def command_export(args) -> CommandResult:
+    game = load_game(args)
+
+    levels = [export_level(world_index, level_index, level) for world_index, level_index, level in game.iter_levels()]
+    export = {'directory': args.directory, 'levels': levels}
+
+    if not args.output:
+        return export, [json.dumps(export)], 0
+
+    with open(args.output, 'w') as fp:
+        json.dump(export, fp)
+
+    data = {'output': args.output, 'levels': len(levels)}
+    return data, ['Exported {} levels to "{}".'.format(len(levels), args.output)], 0
+
+
+def command_repack(args) -> CommandResult:
+    if args.output:
+        if os.path.exists(args.output):
+            raise Exception('Output directory "{}" already exists.'.format(args.output))
+        shutil.copytree(args.directory, args.output)
+        args.directory = args.output
+    elif not args.in_place:
+        raise Exception('Use --output to write a re-packed copy, or --in-place to overwrite the game files.')
+
+    game = load_game(args)
+
+    # Saving only writes modified levels, so mark all of them.
+    levels = 0
+    for _, _, level in game.iter_levels():
+        level.modified = True
+        levels += 1
+
+    levels_not_saved = game.save()
+    data = {
+        'directory': args.directory,
+        'levels_saved': levels - levels_not_saved,
+        'levels_not_saved': levels_not_saved,
+    }
+    lines = ['Re-packed {} of {} levels into "{}".'.format(levels - levels_not_saved, levels, args.directory)]
+
+    return data, lines, 1 if levels_not_saved else 0
+
+
+def command_render(args) -> CommandResult:
+    # Imported here so that other commands do not pay for loading the exporter and its process pool.
+    from turrican2.export import LevelExport, MapExporter, MapExportOptions
+
+    if not Game.is_game_directory(args.directory):
+        raise Exception('"{}" is not a valid Turrican II CDTV directory.'.format(args.directory))
+
+    options = MapExportOptions(args.output, not args.no_entities, args.collision, args.blockmap, args.strip_height,
+                               config.COMPILE_SPRITES, not args.rgba, args.graphics, args.compress_level)
+    exporter = MapExporter(args.directory, options, args.level_data)
+
+    # Report levels as they complete, unless the output is JSON.
+    def level_done(result: LevelExport):
+        if not args.json:
+            print('{}: {}x{} pixels, {} in {:.3f} seconds.'.format(
+                level_key(result.world_index, result.level_index), result.width, result.height,
+                'indexed' if result.indexed else 'RGBA', result.seconds
+            ))
+
+    start = time.perf_counter()
+    results = exporter.export(args.workers, level_done)
+    elapsed = time.perf_counter() - start
+
+    levels = [{
+        'level': level_key(result.world_index, result.level_index),
+        'name': result.name,
+        'width': result.width,
+        'height': result.height,
+        'filename': result.filename,
+        'indexed': result.indexed,
+        'seconds': round(result.seconds, 4),
+    } for result in results]
+
+    data = {'output': args.output, 'levels': levels, 'seconds': round(elapsed, 4)}
+    lines = ['Rendered {} levels to "{}" in {:.3f} seconds.'.format(len(results), args.output, elapsed)]
+
+    return data, lines, 0
+
+
+def command_generate(args) -> CommandResult:
+    # Imported here so that other commands do not pay for loading the generator.
+    from tools.synthetic import SyntheticOptions, generate
+
+    if os.path.exists(args.directory) and os.listdir(args.directory):
+        raise Exception('Output directory "{}" is not empty.'.format(args.directory))
+
+    options = SyntheticOptions(args.worlds, args.levels, args.width, args.height, args.tile_count, args.entities,
+                               args.entity_density, args.seed)
+    if args.scale != 1.0:
+        options.scale(args.scale)
+
+    start = time.perf_counter()
+    game = generate(args.directory, options)
+    elapsed = time.perf_counter() - start
+
+    levels = sum(1 for _ in game.iter_levels())
+    data = {
+        'directory': args.directory,
+        'worlds': options.worlds,
+        'levels': levels,
+        'width': options.width,
+        'height': options.height,
+        'tile_count': options.tile_count,
+        'entities': options.get_entity_count(),
+        'seconds': round(elapsed, 4),
+    }
+    lines = ['Generated {} levels of {}x{} tiles with {} entities each in {:.3f} seconds.'.format(
+        levels, options.width, options.height, options.get_entity_count(), elapsed
+    )]
+    exit_code = 0
+
+    if args.verify:
+        from tools.synthetic import verify_round_trip
+        problems = verify_round_trip(args.directory, os.path.join(args.directory, 'level-data.json'))
+        data['round_trip_problems'] = problems
+        lines.extend(problems)
+        lines.append('Round trip {}.'.format('failed' if problems else 'succeeded'))
+        exit_code = 1 if problems else 0
+
+    return data, lines, exit_code
+
+
+def level_stats(level: Level, tileset: TileSet) -> Dict:
+    tile_counts = Counter(level.tilemap.tiles)
+    most_common_tile, most_common_count = tile_counts.most_common(1)[0] if tile_counts else (None, 0)
+
+    collision_cells = {}
+    collision_grid = CollisionGrid(level.tilemap, tileset)
+    for collision_type, bitset in collision_grid.get_bitsets().items():
+        collision_cells[COLLISION_NAMES[collision_type]] = bitset.count()
+    collision_grid.detach()
+
+    return {
+        'width': level.tilemap.width,
+        'height': level.tilemap.height,
+        'unique_tiles': len(tile_counts),
+        'most_common_tile': most_common_tile,
+        'most_common_tile_count': most_common_count,
+        'entities': len(level.entities),
+        'blockmap_size': level.calculate_blockmap_size(),
+        'blockmap_maximum_size': level.maximum_blockmap_size,
+        'collision_cells': collision_cells,
+    }
+
+
+def command_stats(args) -> CommandResult:
+    game = load_game(args)
+
+    levels = []
+    lines = []
+    for world_index, level_index, level in game.iter_levels():
+        stats = level_stats(level, game.worlds[world_index].tileset)
+        stats['level'] = level_key(world_index, level_index)
+        stats['name'] = level.name
+        levels.append(stats)
+
+        lines.append('{}: {}x{} tiles, {} unique, {} entities, blockmap {}/{} bytes, collision {}'.format(
+            stats['level'], stats['width'], stats['height'], stats['unique_tiles'], stats['entities'],
+            stats['blockmap_size'], stats['blockmap_maximum_size'],
+            ', '.join('{} {}'.format(name, count) for name, count in stats['collision_cells'].items())
+        ))
+
+    return {'levels': levels}, lines, 0
+
+
+def create_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help='write machine-readable JSON output')
+    common.add_argument('--level-data', default='level-data.json', help='level data file to load levels with')
+    common.add_argument('--trace', action='store_true', help='report the time, memory growth and top allocators of each load phase')
+
+    parser = argparse.ArgumentParser(description='Turrican II CDTV game data tools.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('load', parents=[common], help='load a game directory and report timing')
+    command.add_argument('directory', help='Turrican II CDTV game directory')
+    command.set_defaults(handler=command_load)
+
+    command = commands.add_parser('validate', parents=[common], help='check levels for problems that prevent saving or playing them')
+    command.add_argument('directory', help='Turrican II CDTV game directory')
+    command.set_defaults(handler=command_validate)
+
+    command = commands.add_parser('export', parents=[common], help='export level tiles, entities and start positions as JSON')
+    command.add_argument('directory', help='Turrican II CDTV game directory')
+    command.add_argument('--output', help='file to write to, instead of standard output')
+    command.set_defaults(handler=command_export)
+
+    command = commands.add_parser('repack', parents=[common], help='load and save all levels')
+    command.add_argument('directory', help='Turrican II CDTV game directory')
+    command.add_argument('--output', help='directory to write a re-packed copy of the game files to')
+    command.add_argument('--in-place', action='store_true', help='overwrite the game files')
+    command.set_defaults(handler=command_repack)
+
+    command = commands.add_parser('render', parents=[common], help='render full level maps to PNG files')
+    command.add_argument('directory', help='Turrican II CDTV game directory')
+    command.add_argument('--output', required=True, help='directory to write PNG files to')
+    command.add_argument('--no-entities', action='store_true', help='do not draw entities')
+    command.add_argument('--collision', action='store_true', help='draw tile collision instead of tile graphics')
+    command.add_argument('--blockmap', action='store_true', help='draw the entity blockmap')
+    command.add_argument('--strip-height', type=int, default=1024, help='height of the strips that maps are rendered in, in pixels')
+    command.add_argument('--rgba', action='store_true', help='always write RGBA files instead of palette-indexed files')
+    command.add_argument('--graphics', default='graphics.json', help='graphics file to load entity graphics with')
+    command.add_argument('--compress-level', type=int, default=6, choices=range(1, 10), metavar='1-9', help='PNG compression level')
+    command.add_argument('--workers', type=int, default=None, help='number of worker processes, defaults to the number of CPUs')
+    command.set_defaults(handler=command_render)
+
+    command = commands.add_parser('generate', parents=[common], help='generate synthetic game data for testing')
+    command.add_argument('directory', help='directory to write the game data to')
+    command.add_argument('--worlds', type=int, default=5, help='number of worlds, from 1 to 5')
+    command.add_argument('--levels', type=int, default=2, help='number of levels in each world')
+    command.add_argument('--width', type=int, default=256, help='tilemap width in tiles')
+    command.add_argument('--height', type=int, default=32, help='tilemap height in tiles')
+    command.add_argument('--tile-count', type=int, default=128, help='number of tiles in each tileset, up to 256')
+    command.add_argument('--entities', type=int, default=200, help='number of entities in each level')
+    command.add_argument('--entity-density', type=float, default=None, help='entities per 100 tiles, instead of a fixed number')
+    command.add_argument('--scale', type=float, default=1.0, help='multiply the tilemap area and entity count by this factor')
+    command.add_argument('--seed', type=int, default=1, help='seed for the generated data')
+    command.add_argument('--verify', action='store_true', help='check that the levels survive loading and saving unchanged')
+    command.set_defaults(handler=command_generate)
+
+    command = commands.add_parser('stats', parents=[common], help='report tile, entity, blockmap and collision statistics')
+    command.add_argument('directory', help='Turrican II CDTV game directory')
+    command.set_defaults(handler=command_stats)
+
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    args = create_parser().parse_args(argv)
+    handler: Callable = args.handler
+    tracer = Tracer() if args.trace else None
+
+    try:
+        if tracer:
+            tracer.start()
+        data, lines, exit_code = handler(args)
+    except Exception as e:
+        if args.json:
+            print(json.dumps({'error': str(e)}))
+        else:
+            print('Error: {}'.format(e), file=sys.stderr)
+        return 2
+    finally:
+        if tracer:
+            tracer.stop()
+
+    if tracer:
+        data['trace'] = tracer.to_dict()
+        lines = lines + ['', 'Trace:'] + tracer.get_lines()
+
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        print('\n'.join(lines))
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -21,11 +21,35 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from typing import Optional
+
+
 APP_NAME = 'Turrican II Editor'
 APP_VERSION = '1.1.0'
 
 SCALE: int = 2
 
+LOG_LEVEL: str = 'WARNING'
+
 MAX_UNDO: int = 64
 
 MOVE_SENSITIVITY: float = 1.5
+
+# Flood fill connectivity. 4 only spreads to horizontal and vertical neighbours, 8 also spreads diagonally.
+FLOOD_FILL_CONNECTIVITY: int = 4
+
+# Convert entity graphics into run-length encoded sprites at load time, to speed up drawing entities.
+COMPILE_SPRITES: bool = True
+
+# Number of frames that viewport frame time percentiles are calculated over.
+FRAME_STATS_WINDOW: int = 240
+
+# File that viewport frame time percentiles are logged to once every window, or None to not log them. The log is
+# rotated once it grows past FRAME_STATS_LOG_SIZE bytes. Frame statistics are collected for every frame if they are
+# logged, otherwise only while the F12 overlay is shown.
+FRAME_STATS_LOG: Optional[str] = None
+FRAME_STATS_LOG_SIZE: int = 1024 * 1024
+
+# Find out which source lines allocate the most memory while opening a game directory, for the diagnostics dialog. This
+# makes opening a game directory several times slower.
+TRACE_LOAD_ALLOCATIONS: bool = False
@@ -22,10 +22,15 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import ctypes
+import logging
+import sys
+
 import wx
 
 from ui.frame_main import FrameMain
 
+import config
+
 
 class Turrican2EditApp(wx.App):
 
@@ -34,7 +39,10 @@ class Turrican2EditApp(wx.App):
 
 
 def main():
-    ctypes.CDLL('user32').SetProcessDPIAware()
+    logging.basicConfig(level=config.LOG_LEVEL, format='%(asctime)s %(name)s %(levelname)s: %(message)s')
+
+    if sys.platform == 'win32':
+        ctypes.CDLL('user32').SetProcessDPIAware()
 
     app: Turrican2EditApp = Turrican2EditApp()
 
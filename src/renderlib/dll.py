@@ -21,6 +21,22 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import os
+import sys
 from ctypes import CDLL
 
-dll = CDLL('./renderlib')
+if sys.platform == 'win32':
+    dll = CDLL('./renderlib')
+elif sys.platform == 'darwin':
+    dll = CDLL('./librenderlib.dylib')
+else:
+    dll = CDLL('./librenderlib.so')
+
+# Set RENDERLIB_PROFILE to profile all calls into the library. A report is written to stderr at exit, or to the file
+# named by RENDERLIB_PROFILE if it is set to anything other than 1.
+profile_target = os.environ.get('RENDERLIB_PROFILE')
+if profile_target:
+    from renderlib.profiler import ProfiledLibrary
+
+    dll = ProfiledLibrary(dll)
+    dll.report_at_exit(None if profile_target == '1' else profile_target)
@@ -73,3 +73,17 @@ class Font:
     @property
     def pointer(self) -> int:
         return self._font
+
+    @property
+    def char_width(self) -> int:
+        """
+        :return: The width of a single character of this font.
+        """
+        return fontGetCharWidth(self._font)
+
+    @property
+    def char_height(self) -> int:
+        """
+        :return: The height of a single character of this font.
+        """
+        return fontGetCharHeight(self._font)
@@ -0,0 +1,108 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from renderlib.surface import Surface
+
+
+__all__ = ['OffscreenPresenter']
+
+
+class OffscreenPresenter(object):
+    """
+    Presents a Surface into an offscreen frame instead of a window. Works the same as a Presenter, but does not need
+    a window or any native GUI toolkit.
+    """
+
+    def __init__(self, width: int, height: int, scale: int):
+        if scale < 1:
+            raise Exception('Invalid presenter scale {}.'.format(scale))
+
+        self._scale: int = scale
+        self._width: int = width
+        self._height: int = height
+
+        self._surface: Surface = Surface.empty(width, height)
+        self._frame: Surface = Surface.empty(width * scale, height * scale)
+
+    def resize(self, width: int, height: int):
+        """
+        Resizes this presenter's surface and frame.
+        :param width: the new unscaled width.
+        :param height: the new unscaled height.
+        """
+        self._width = width
+        self._height = height
+        self._surface = Surface.empty(width, height)
+        self._frame = Surface.empty(width * self._scale, height * self._scale)
+
+    def present(self):
+        """
+        Scales this presenter's surface into the frame.
+        """
+        self._surface.scale_to(self._frame, self._scale)
+
+    def get_frame_bytes(self) -> bytes:
+        """
+        :return: a copy of the last presented frame, as rows of 32 bit pixels.
+        """
+        return self._frame.get_bytes()
+
+    def get_frame_buffer(self) -> memoryview:
+        """
+        :return: a view of the last presented frame's pixels, shaped as rows of 32 bit pixels. It becomes invalid once
+        the presenter is resized or its scale changes.
+        """
+        return self._frame.get_buffer()
+
+    @property
+    def scale(self) -> int:
+        """
+        :return: The pixel scale of this presenter.
+        """
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale: int):
+        """
+        Sets the pixel scale of this presenter.
+        :param scale: the new pixel scale.
+        """
+        if scale < 1:
+            raise Exception('Invalid presenter scale {}.'.format(scale))
+
+        self._scale = scale
+        self._frame = Surface.empty(self._width * scale, self._height * scale)
+
+    @property
+    def surface(self) -> Surface:
+        """
+        :return: The surface object of this presenter.
+        """
+        return self._surface
+
+    @property
+    def frame(self) -> Surface:
+        """
+        :return: The surface holding the last presented frame.
+        """
+        return self._frame
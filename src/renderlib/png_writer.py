@@ -0,0 +1,164 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from ctypes import *
+from typing import Optional
+
+from renderlib.dll import dll
+from renderlib.surface import Surface
+
+
+__all__ = ['PNGWriter']
+
+
+pngWriterCreate = dll.pngWriterCreate
+pngWriterCreate.argtypes = [c_char_p, c_uint, c_uint, c_uint, c_bool]
+pngWriterCreate.restype = c_void_p
+
+pngWriterWriteRows = dll.pngWriterWriteRows
+pngWriterWriteRows.argtypes = [c_void_p, c_void_p, c_uint, c_uint]
+pngWriterWriteRows.restype = c_bool
+
+pngWriterClose = dll.pngWriterClose
+pngWriterClose.argtypes = [c_void_p]
+pngWriterClose.restype = c_bool
+
+pngWriterAbort = dll.pngWriterAbort
+pngWriterAbort.argtypes = [c_void_p]
+pngWriterAbort.restype = None
+
+pngWriterGetRow = dll.pngWriterGetRow
+pngWriterGetRow.argtypes = [c_void_p]
+pngWriterGetRow.restype = c_uint
+
+pngWriterGetPaletteSize = dll.pngWriterGetPaletteSize
+pngWriterGetPaletteSize.argtypes = [c_void_p]
+pngWriterGetPaletteSize.restype = c_uint
+
+
+class PNGWriter:
+    """
+    Writes a PNG file from strips of rows, so that the full image never needs to be held in memory.
+
+    In indexed mode the image is written with a palette of up to 256 colors. Writing fails if the image uses more colors
+    than that, after which the image can be written again in RGBA mode.
+    """
+
+    def __init__(self, filename: str, width: int, height: int, compress_level: int = 9, indexed: bool = False):
+        """
+        Opens a new PNG file for writing.
+        :param filename: the name of the file to write.
+        :param width: the width of the image.
+        :param height: the height of the image.
+        :param compress_level: the zlib compression level, from 1 to 9.
+        :param indexed: write a palette-indexed image instead of an RGBA image.
+        """
+        self._writer: Optional[int] = pngWriterCreate(filename.encode(), width, height, compress_level, indexed)
+        if not self._writer:
+            raise Exception('Could not create PNG file "{}".'.format(filename))
+
+        self._filename: str = filename
+        self._width: int = width
+        self._height: int = height
+        self._indexed: bool = indexed
+
+    def __del__(self):
+        self.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def write(self, surface: Surface, y: int = 0, count: Optional[int] = None):
+        """
+        Writes rows of a surface below the rows that were written before.
+        :param surface: the surface to write rows from. Must be as wide as the image.
+        :param y: the first row of the surface to write.
+        :param count: the number of rows to write, or None to write all rows from y down.
+        """
+        if not self._writer:
+            raise Exception('PNG file "{}" is already closed.'.format(self._filename))
+
+        if count is None:
+            count = surface.height - y
+
+        if not pngWriterWriteRows(self._writer, surface.pointer, y, count):
+            if self._indexed and self.palette_size == 256:
+                raise Exception('PNG file "{}" has more than 256 colors and cannot be written indexed.'.format(self._filename))
+            raise Exception('Could not write rows to PNG file "{}".'.format(self._filename))
+
+    def close(self):
+        """
+        Finishes writing the PNG file. All rows must have been written.
+        """
+        if not self._writer:
+            return
+
+        rows = self.rows_written
+        success = pngWriterClose(self._writer)
+        self._writer = None
+
+        if not success:
+            raise Exception('Could not complete PNG file "{}", {} of {} rows were written.'.format(self._filename, rows, self._height))
+
+    def abort(self):
+        """
+        Stops writing and removes the incomplete PNG file.
+        """
+        if not self._writer:
+            return
+
+        pngWriterAbort(self._writer)
+        self._writer = None
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def indexed(self) -> bool:
+        return self._indexed
+
+    @property
+    def rows_written(self) -> int:
+        return pngWriterGetRow(self._writer) if self._writer else 0
+
+    @property
+    def palette_size(self) -> int:
+        """
+        :return: The number of colors in the palette so far, or 0 in RGBA mode.
+        """
+        return pngWriterGetPaletteSize(self._writer) if self._writer else 0
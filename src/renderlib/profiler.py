@@ -0,0 +1,315 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import atexit
+import sys
+import time
+from ctypes import Array, Structure, c_uint, c_void_p, sizeof
+from typing import Callable, Dict, List, Optional, TextIO
+
+
+__all__ = ['ProfiledLibrary', 'ProfiledFunction', 'FunctionProfile', 'PayloadSizes', 'get_profiled_library',
+           'get_argument_size']
+
+
+def get_argument_size(args: tuple) -> int:
+    """
+    Returns the number of bytes of buffer-like data passed in a set of arguments. Plain numbers and pointers do not
+    count towards the size.
+    :param args: the arguments passed to a function.
+    :return: the total size of all buffer-like arguments, in bytes.
+    """
+    size = 0
+    for arg in args:
+        if isinstance(arg, (bytes, bytearray, str)):
+            size += len(arg)
+        elif isinstance(arg, memoryview):
+            size += arg.nbytes
+        elif isinstance(arg, (Array, Structure)):
+            size += sizeof(arg)
+    return size
+
+
+class PayloadSizes:
+    """
+    Determines how many bytes of pixels or stream data a renderlib entry point works on. Surfaces and sprites are passed
+    to renderlib as pointers, so their sizes are read from the library itself.
+    """
+
+    BYTES_PER_PIXEL: int = 4
+
+    # For each known entry point, returns its payload size from a PayloadSizes object and the arguments of a call.
+    ENTRY_POINTS: Dict[str, Callable[['PayloadSizes', tuple], int]] = {
+        'surfaceCreate': lambda sizes, args: sizes.area(args[0], args[1]),
+        'surfaceCreateFromBuffer': lambda sizes, args: sizes.area(args[1], args[2]),
+        'surfaceClone': lambda sizes, args: sizes.surface(args[0]),
+        'surfaceFlipY': lambda sizes, args: sizes.surface(args[0]),
+        'surfaceFill': lambda sizes, args: sizes.surface(args[0]),
+        'surfaceClear': lambda sizes, args: sizes.surface(args[0]),
+        'surfaceUsedRect': lambda sizes, args: sizes.surface(args[0]),
+        'surfaceWriteToPNG': lambda sizes, args: sizes.surface(args[0]),
+        'surfaceExtract': lambda sizes, args: sizes.surface(args[1]),
+        'surfaceScale': lambda sizes, args: sizes.surface(args[0]) * args[2] * args[2],
+        'renderBlit': lambda sizes, args: sizes.surface(args[1]),
+        'renderBlitBlend': lambda sizes, args: sizes.surface(args[1]),
+        'renderOutline': lambda sizes, args: sizes.surface(args[1]),
+        'renderBlitBlendScale': lambda sizes, args: sizes.area(args[4], args[5]),
+        'renderBoxFill': lambda sizes, args: sizes.area(args[3], args[4]),
+        'renderBlitSprite': lambda sizes, args: sizes.sprite(args[1]),
+        'spriteCreate': lambda sizes, args: sizes.surface(args[0]),
+        'pngWriterWriteRows': lambda sizes, args: sizes.surface(args[1], args[3]),
+        'streamReadBytes': lambda sizes, args: args[1],
+        'streamReadCreateFromMemory': lambda sizes, args: args[1],
+        'streamWriteBytes': lambda sizes, args: args[2],
+    }
+
+    def __init__(self, library):
+        """
+        :param library: the unprofiled ctypes library to read sizes from.
+        """
+        self._surface_width = self._get_function(library, 'surfaceGetWidth')
+        self._surface_height = self._get_function(library, 'surfaceGetHeight')
+        self._sprite_width = self._get_function(library, 'spriteGetWidth')
+        self._sprite_height = self._get_function(library, 'spriteGetHeight')
+
+    @staticmethod
+    def _get_function(library, name: str):
+        # Indexing creates a separate function object, so these bindings do not change the library's own.
+        function = library[name]
+        function.argtypes = [c_void_p]
+        function.restype = c_uint
+        return function
+
+    def get_function(self, name: str) -> Optional[Callable[[tuple], int]]:
+        """
+        :param name: the name of a renderlib entry point.
+        :return: a function that returns the payload size of a call to the entry point from its arguments, or None
+        if the entry point is not known.
+        """
+        size = PayloadSizes.ENTRY_POINTS.get(name)
+        if size is None:
+            return None
+
+        return lambda args: size(self, args)
+
+    def area(self, width: int, height: int) -> int:
+        """
+        :return: the size of an area of pixels, in bytes.
+        """
+        return max(0, width) * max(0, height) * PayloadSizes.BYTES_PER_PIXEL
+
+    def surface(self, surface: Optional[int], rows: Optional[int] = None) -> int:
+        """
+        :param surface: a pointer to a surface.
+        :param rows: the number of rows to count, or None to count all of the surface's rows.
+        :return: the size of the surface's pixels, in bytes.
+        """
+        if not surface:
+            return 0
+        if rows is None:
+            rows = self._surface_height(surface)
+        return self.area(self._surface_width(surface), rows)
+
+    def sprite(self, sprite: Optional[int]) -> int:
+        """
+        :param sprite: a pointer to a sprite.
+        :return: the size of the area that the sprite covers, in bytes.
+        """
+        if not sprite:
+            return 0
+        return self.area(self._sprite_width(sprite), self._sprite_height(sprite))
+
+
+class FunctionProfile:
+    """
+    Call statistics of a single library function.
+    """
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.calls: int = 0
+        self.time: float = 0.0
+
+        # Number of calls per payload size bucket. Bucket 0 holds calls without a payload, bucket n holds calls with
+        # 2 ** (n - 1) up to 2 ** n - 1 bytes of payload.
+        self.sizes: Dict[int, int] = {}
+
+    def add(self, duration: float, size: int):
+        """
+        Records a single call.
+        :param duration: how long the call took, in seconds.
+        :param size: the size of the call's payload, in bytes.
+        """
+        self.calls += 1
+        self.time += duration
+
+        bucket = size.bit_length()
+        self.sizes[bucket] = self.sizes.get(bucket, 0) + 1
+
+    @staticmethod
+    def get_bucket_name(bucket: int) -> str:
+        """
+        Returns a readable name for a payload size bucket.
+        :param bucket: the bucket index.
+        :return: the range of sizes in the bucket.
+        """
+        if bucket == 0:
+            return '0'
+        if bucket == 1:
+            return '1'
+        return '{}-{}'.format(2 ** (bucket - 1), 2 ** bucket - 1)
+
+
+class ProfiledFunction:
+    """
+    Wraps a ctypes function and records how often it is called, how long the calls take and how much data they work
+    on. Setting argtypes, restype and errcheck is passed on to the wrapped function, so bindings can be declared the same
+    way as without profiling.
+    """
+
+    def __init__(self, function, profile: FunctionProfile, get_size: Callable[[tuple], int] = get_argument_size):
+        """
+        :param function: the ctypes function to wrap.
+        :param profile: the statistics to record calls in.
+        :param get_size: returns the payload size of a call from its arguments.
+        """
+        object.__setattr__(self, '_function', function)
+        object.__setattr__(self, '_profile', profile)
+        object.__setattr__(self, '_get_size', get_size)
+
+    def __call__(self, *args):
+        # Sizes are read before the call, which may destroy what they are read from, and are not part of its time.
+        size = self._get_size(args)
+
+        start = time.perf_counter()
+        try:
+            return self._function(*args)
+        finally:
+            self._profile.add(time.perf_counter() - start, size)
+
+    def __getattr__(self, name: str):
+        return getattr(self._function, name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self._function, name, value)
+
+    @property
+    def profile(self) -> FunctionProfile:
+        return self._profile
+
+
+class ProfiledLibrary:
+    """
+    Stands in for a ctypes library, and returns profiled wrappers of its functions.
+    """
+
+    def __init__(self, library):
+        """
+        :param library: the ctypes library to profile.
+        """
+        self._library = library
+        self._payload_sizes: PayloadSizes = PayloadSizes(library)
+        self._functions: Dict[str, ProfiledFunction] = {}
+        self._start: float = time.perf_counter()
+
+    def __getattr__(self, name: str) -> ProfiledFunction:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        function = self._functions.get(name)
+        if function is None:
+            get_size = self._payload_sizes.get_function(name) or get_argument_size
+            function = ProfiledFunction(getattr(self._library, name), FunctionProfile(name), get_size)
+            self._functions[name] = function
+
+        return function
+
+    def reset(self):
+        """
+        Clears the statistics of all functions.
+        """
+        for name, function in self._functions.items():
+            object.__setattr__(function, '_profile', FunctionProfile(name))
+        self._start = time.perf_counter()
+
+    def get_profiles(self) -> List[FunctionProfile]:
+        """
+        :return: the statistics of every function that was called, sorted by their cumulative time.
+        """
+        profiles = [function.profile for function in self._functions.values() if function.profile.calls]
+        profiles.sort(key=lambda profile: profile.time, reverse=True)
+        return profiles
+
+    def write_report(self, file: TextIO):
+        """
+        Writes a table of call statistics, followed by the payload size histograms of functions that were passed
+        pixels or other data.
+        :param file: the file to write the report to.
+        """
+        profiles = self.get_profiles()
+        elapsed = time.perf_counter() - self._start
+        total_calls = sum([profile.calls for profile in profiles])
+        total_time = sum([profile.time for profile in profiles])
+
+        file.write('renderlib calls: {} in {:.1f} ms, {:.1f}% of {:.1f} ms elapsed\n'.format(
+            total_calls, total_time * 1000, total_time / elapsed * 100 if elapsed else 0.0, elapsed * 1000
+        ))
+        file.write('{:<32} {:>10} {:>12} {:>10} {:>7}\n'.format('function', 'calls', 'total ms', 'mean us', 'time %'))
+        for profile in profiles:
+            file.write('{:<32} {:>10} {:>12.3f} {:>10.3f} {:>7.1f}\n'.format(
+                profile.name, profile.calls, profile.time * 1000, profile.time / profile.calls * 1000000,
+                profile.time / total_time * 100 if total_time else 0.0
+            ))
+
+        for profile in profiles:
+            if list(profile.sizes.keys()) == [0]:
+                continue
+
+            buckets = ', '.join(['{}: {}'.format(FunctionProfile.get_bucket_name(bucket), count)
+                                 for bucket, count in sorted(profile.sizes.items())])
+            file.write('{} payload bytes: {}\n'.format(profile.name, buckets))
+
+    def report_at_exit(self, filename: Optional[str] = None):
+        """
+        Writes a report when the process exits.
+        :param filename: the file to write the report to, or None to write it to stderr.
+        """
+        def report():
+            if filename:
+                with open(filename, 'w') as file:
+                    self.write_report(file)
+            else:
+                self.write_report(sys.stderr)
+
+        atexit.register(report)
+
+
+def get_profiled_library() -> Optional[ProfiledLibrary]:
+    """
+    :return: the profiled renderlib library, or None if profiling is not enabled.
+    """
+    from renderlib.dll import dll
+
+    if isinstance(dll, ProfiledLibrary):
+        return dll
+    return None
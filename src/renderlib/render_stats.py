@@ -0,0 +1,57 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from ctypes import *
+
+from renderlib.dll import dll
+
+
+__all__ = ['RenderStats', 'get_render_stats', 'reset_render_stats']
+
+
+class RenderStats(Structure):
+    _fields_ = [
+        ('blits', c_uint32),
+        ('fills', c_uint32),
+        ('primitives', c_uint32),
+        ('pixels', c_uint64)
+    ]
+
+
+renderGetStats = dll.renderGetStats
+renderGetStats.argtypes = [POINTER(RenderStats)]
+renderGetStats.restype = None
+
+renderResetStats = dll.renderResetStats
+renderResetStats.argtypes = []
+renderResetStats.restype = None
+
+
+def get_render_stats() -> RenderStats:
+    stats = RenderStats()
+    renderGetStats(byref(stats))
+    return stats
+
+
+def reset_render_stats():
+    renderResetStats()
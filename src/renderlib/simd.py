@@ -0,0 +1,66 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from ctypes import *
+
+from renderlib.dll import dll
+
+
+__all__ = ['SIMDLevel', 'get_simd_level', 'get_simd_supported', 'set_simd_level']
+
+
+renderGetSIMD = dll.renderGetSIMD
+renderGetSIMD.argtypes = []
+renderGetSIMD.restype = c_int
+
+renderGetSIMDSupported = dll.renderGetSIMDSupported
+renderGetSIMDSupported.argtypes = []
+renderGetSIMDSupported.restype = c_int
+
+renderSetSIMD = dll.renderSetSIMD
+renderSetSIMD.argtypes = [c_int]
+renderSetSIMD.restype = c_int
+
+
+class SIMDLevel:
+    NONE: int = 0
+    SSE2: int = 1
+    AVX2: int = 2
+
+    NAMES = {
+        NONE: 'none',
+        SSE2: 'SSE2',
+        AVX2: 'AVX2',
+    }
+
+
+def get_simd_level() -> int:
+    return renderGetSIMD()
+
+
+def get_simd_supported() -> int:
+    return renderGetSIMDSupported()
+
+
+def set_simd_level(level: int) -> int:
+    return renderSetSIMD(level)
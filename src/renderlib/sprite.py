@@ -0,0 +1,106 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from ctypes import *
+
+from renderlib.dll import dll
+from renderlib.surface import Surface
+
+
+__all__ = ['Sprite']
+
+
+spriteCreate = dll.spriteCreate
+spriteCreate.argtypes = [c_void_p]
+spriteCreate.restype = c_void_p
+
+spriteDestroy = dll.spriteDestroy
+spriteDestroy.argtypes = [c_void_p]
+spriteDestroy.restype = None
+
+spriteGetWidth = dll.spriteGetWidth
+spriteGetWidth.argtypes = [c_void_p]
+spriteGetWidth.restype = c_uint
+
+spriteGetHeight = dll.spriteGetHeight
+spriteGetHeight.argtypes = [c_void_p]
+spriteGetHeight.restype = c_uint
+
+spriteGetRunCount = dll.spriteGetRunCount
+spriteGetRunCount.argtypes = [c_void_p]
+spriteGetRunCount.restype = c_uint
+
+spriteGetPixelCount = dll.spriteGetPixelCount
+spriteGetPixelCount.argtypes = [c_void_p]
+spriteGetPixelCount.restype = c_uint
+
+
+class Sprite:
+    """
+    A run-length encoded copy of a Surface, for fast blitting of mostly transparent or opaque images.
+    """
+
+    def __init__(self, ptr: int):
+        self._sprite: int = ptr
+
+    def __del__(self):
+        spriteDestroy(self._sprite)
+
+    @classmethod
+    def from_surface(cls, surface: Surface):
+        """
+        Encodes a surface into a new sprite.
+        :param surface: the surface to encode.
+        :return: a new Sprite object.
+        """
+        ptr = spriteCreate(surface.pointer)
+        if not ptr:
+            raise Exception('Could not create Sprite object from a {}x{} surface.'.format(surface.width, surface.height))
+
+        return cls(ptr)
+
+    @property
+    def pointer(self) -> int:
+        return self._sprite
+
+    @property
+    def width(self) -> int:
+        return spriteGetWidth(self._sprite)
+
+    @property
+    def height(self) -> int:
+        return spriteGetHeight(self._sprite)
+
+    @property
+    def run_count(self) -> int:
+        """
+        :return: The number of opaque and translucent runs in this sprite.
+        """
+        return spriteGetRunCount(self._sprite)
+
+    @property
+    def pixel_count(self) -> int:
+        """
+        :return: The number of visible pixels stored in this sprite.
+        """
+        return spriteGetPixelCount(self._sprite)
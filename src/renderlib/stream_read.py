@@ -75,7 +75,7 @@ streamReadGetEndianness.argtypes = [c_void_p]
 streamReadGetEndianness.restype = c_uint32
 
 streamReadSetEndianness = dll.streamReadSetEndianness
-streamReadSetEndianness.argtypes = [c_void_p, c_uint8]
+streamReadSetEndianness.argtypes = [c_void_p, c_int]
 streamReadSetEndianness.restype = None
 
 streamReadDestroy = dll.streamReadDestroy
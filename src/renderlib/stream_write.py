@@ -71,7 +71,7 @@ streamWriteGetEndianness.argtypes = [c_void_p]
 streamWriteGetEndianness.restype = c_uint32
 
 streamWriteSetEndianness = dll.streamWriteSetEndianness
-streamWriteSetEndianness.argtypes = [c_void_p, c_uint8]
+streamWriteSetEndianness.argtypes = [c_void_p, c_int]
 streamWriteSetEndianness.restype = None
 
 streamWriteDestroy = dll.streamWriteDestroy
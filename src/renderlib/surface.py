@@ -56,6 +56,10 @@ surfaceCreate = dll.surfaceCreate
 surfaceCreate.argtypes = [c_uint, c_uint]
 surfaceCreate.restype = c_void_p
 
+surfaceCreateFromBuffer = dll.surfaceCreateFromBuffer
+surfaceCreateFromBuffer.argtypes = [c_void_p, c_uint, c_uint]
+surfaceCreateFromBuffer.restype = c_void_p
+
 surfaceDestroy = dll.surfaceDestroy
 surfaceDestroy.argtypes = [c_void_p]
 surfaceDestroy.restype = None
@@ -76,6 +80,14 @@ surfaceClone = dll.surfaceClone
 surfaceClone.argtypes = [c_void_p]
 surfaceClone.restype = c_void_p
 
+surfaceGetData = dll.surfaceGetData
+surfaceGetData.argtypes = [c_void_p]
+surfaceGetData.restype = c_void_p
+
+surfaceScale = dll.surfaceScale
+surfaceScale.argtypes = [c_void_p, c_void_p, c_uint]
+surfaceScale.restype = None
+
 surfaceUsedRect = dll.surfaceUsedRect
 surfaceUsedRect.argtypes = [c_void_p]
 surfaceUsedRect.restype = Rectangle
@@ -102,17 +114,21 @@ renderBlit.argtypes = [c_void_p, c_void_p, c_int, c_int]
 renderBlit.restype = None
 
 renderBoxFill = dll.renderBoxFill
-renderBoxFill.argtypes = [c_void_p, c_int, c_int, c_int, c_int, c_uint, c_uint8]
+renderBoxFill.argtypes = [c_void_p, c_int, c_int, c_int, c_int, c_uint, c_int]
 renderBoxFill.restype = None
 
 renderBlitBlend = dll.renderBlitBlend
-renderBlitBlend.argtypes = [c_void_p, c_void_p, c_int, c_int, c_uint8]
+renderBlitBlend.argtypes = [c_void_p, c_void_p, c_int, c_int, c_int]
 renderBlitBlend.restype = None
 
 renderBlitBlendScale = dll.renderBlitBlendScale
-renderBlitBlendScale.argtypes = [c_void_p, c_void_p, c_int, c_int, c_int, c_int, c_uint8]
+renderBlitBlendScale.argtypes = [c_void_p, c_void_p, c_int, c_int, c_int, c_int, c_int]
 renderBlitBlendScale.restype = None
 
+renderBlitSprite = dll.renderBlitSprite
+renderBlitSprite.argtypes = [c_void_p, c_void_p, c_int, c_int, c_int]
+renderBlitSprite.restype = None
+
 
 class BlendOp:
     SOLID: int = 0
@@ -127,6 +143,9 @@ class Surface:
         self._surface: int = ptr
         self._destroy: bool = destroy
 
+        # Keeps a wrapped buffer alive for as long as this surface uses it.
+        self._buffer = None
+
     def __del__(self):
         if self._destroy:
             surfaceDestroy(self._surface)
@@ -139,6 +158,26 @@ class Surface:
 
         return cls(ptr)
 
+    @classmethod
+    def from_buffer(cls, buffer, width: int, height: int):
+        # Wraps a writable, contiguous buffer of width * height 32 bit pixels without copying it.
+        view = memoryview(buffer)
+        if view.readonly:
+            raise Exception('Cannot create a Surface object from a read-only buffer.')
+        if not view.c_contiguous:
+            raise Exception('Cannot create a Surface object from a non-contiguous buffer.')
+        if view.nbytes != width * height * 4:
+            raise Exception('Buffer of {} bytes does not match a Surface size of {}x{}.'.format(view.nbytes, width, height))
+
+        data = (c_uint32 * (width * height)).from_buffer(view.cast('B'))
+        ptr = surfaceCreateFromBuffer(data, width, height)
+        if not ptr:
+            raise Exception('Could not create Surface object with size {}x{}.'.format(width, height))
+
+        surface = cls(ptr)
+        surface._buffer = data
+        return surface
+
     @classmethod
     def from_png(cls, filename: str):
         ptr = surfaceReadFromPNG(filename.encode())
@@ -161,6 +200,10 @@ class Surface:
     def extract(self, surface_dest, x: int, y: int):
         surfaceExtract(self._surface, surface_dest.pointer, x, y)
 
+    def scale_to(self, surface_dest, scale: int):
+        # Integer upscale into the top left of another surface.
+        surfaceScale(self._surface, surface_dest.pointer, scale)
+
     def fill(self, color: int):
         surfaceFill(self._surface, color)
 
@@ -191,9 +234,36 @@ class Surface:
     def blit_blend_scale(self, surface_source, x: int, y: int, width: int, height: int, blend_op: int):
         renderBlitBlendScale(self._surface, surface_source.pointer, x, y, width, height, blend_op)
 
+    def blit_sprite(self, sprite, x: int, y: int, blend_op: int):
+        if blend_op == BlendOp.SOLID:
+            raise Exception('Sprites cannot be blitted with the SOLID blend operation.')
+
+        renderBlitSprite(self._surface, sprite.pointer, x, y, blend_op)
+
     def get_used_rectangle(self) -> Rectangle:
         return surfaceUsedRect(self._surface)
 
+    def get_bytes(self) -> bytes:
+        return string_at(surfaceGetData(self._surface), self.width * self.height * 4)
+
+    def get_buffer(self) -> memoryview:
+        # Returns a writable view of this surface's pixels, shaped as rows of 32 bit pixels. The view keeps this surface
+        # alive, but becomes invalid once the surface is resized.
+        width = self.width
+        height = self.height
+        data = (c_uint32 * (width * height)).from_address(surfaceGetData(self._surface))
+        data._surface = self
+        return memoryview(data).cast('B').cast('I', (height, width))
+
+    def as_array(self):
+        # Returns a NumPy array of shape (height, width) that shares this surface's pixels.
+        try:
+            import numpy
+        except ImportError:
+            raise Exception('NumPy is required to access Surface pixels as an array.')
+
+        return numpy.asarray(self.get_buffer())
+
     @property
     def pointer(self) -> int:
         return self._surface
@@ -0,0 +1,331 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Benchmarks loading, rendering, editing and saving game data. Runs on synthetic game data unless a game directory is
+# given, and writes JSON results that can be compared against an earlier run.
+# Run from the program's root directory with: python -m tools.benchmark (with src on the Python path).
+
+import argparse
+import json
+import os.path
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from copy import copy, deepcopy
+from typing import Callable, Dict, List, Optional, Tuple
+
+from renderlib.offscreen import OffscreenPresenter
+from renderlib.palette import Palette
+from renderlib.simd import SIMDLevel, get_simd_level
+from renderlib.stream_read import StreamRead
+from renderlib.utils import Endianness
+
+from turrican2.camera import Camera
+from turrican2.game import Game
+from turrican2.graphics import Graphics
+from turrican2.levelrenderer import LevelRenderer
+from turrican2.tilemap import Tilemap
+from turrican2.tileset import TileSet
+from turrican2.world import World
+
+from tools.synthetic import SyntheticOptions, generate
+
+
+# Unscaled viewport size and scale of the rendering benchmarks, similar to a maximized editor window.
+VIEWPORT_WIDTH: int = 960
+VIEWPORT_HEIGHT: int = 540
+VIEWPORT_SCALE: int = 2
+
+# Number of camera positions that the rendering benchmarks pan across.
+RENDER_FRAMES: int = 32
+
+
+class BenchmarkData:
+
+    def __init__(self, directory: str, level_data_filename: str, graphics_filename: str):
+        self.directory: str = directory
+        self.level_data_filename: str = level_data_filename
+        self.graphics_filename: str = graphics_filename
+
+        self.game: Game = Game(directory)
+        self.game.load(level_data_filename)
+        self.graphics: Graphics = Graphics(directory, True, graphics_filename)
+
+        # Most benchmarks use the level with the largest tilemap.
+        _, _, self.level = max(self.game.iter_levels(), key=lambda item: len(item[2].tilemap.tiles))
+        self.world: World = next(world for world in self.game.worlds if self.level in world.levels)
+
+
+def measure(operation: Callable, repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+
+    return {
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def read_world_offsets(filename: str) -> Tuple[StreamRead, int, int, int]:
+    stream = StreamRead.from_file(filename, Endianness.BIG)
+    offset_tile_gfx = stream.read_uint() - World.BASE_OFFSET
+    offset_tile_collision = stream.read_uint() - World.BASE_OFFSET
+    offset_palette = stream.read_uint() - World.BASE_OFFSET
+
+    return stream, offset_tile_gfx, offset_tile_collision, offset_palette
+
+
+def bench_stream_tilemap(data: BenchmarkData) -> Callable:
+    world = data.game.worlds[0]
+    level = world.levels[0]
+
+    def operation():
+        stream = StreamRead.from_file(world.filename, Endianness.BIG)
+        stream.seek(level.data_offset)
+        Tilemap.from_stream(stream, level.tilemap.width, level.tilemap.height)
+
+    return operation
+
+
+def bench_tileset_load(data: BenchmarkData) -> Callable:
+    filename = data.game.worlds[0].filename
+
+    def operation():
+        stream, offset_tile_gfx, offset_tile_collision, offset_palette = read_world_offsets(filename)
+        stream.seek(offset_palette)
+        palette = Palette.from_stream(stream, 16, 4)
+        TileSet.from_stream(stream, offset_tile_gfx, offset_tile_collision, palette)
+
+    return operation
+
+
+def bench_graphics_load(data: BenchmarkData) -> Callable:
+    return lambda: Graphics(data.directory, False, data.graphics_filename)
+
+
+def bench_graphics_load_sprites(data: BenchmarkData) -> Callable:
+    return lambda: Graphics(data.directory, True, data.graphics_filename)
+
+
+def bench_game_load(data: BenchmarkData) -> Callable:
+    def operation():
+        game = Game(data.directory)
+        game.load(data.level_data_filename)
+
+    return operation
+
+
+def render_frames(data: BenchmarkData, draw_collision: bool, draw_entities: bool) -> Callable:
+    presenter = OffscreenPresenter(VIEWPORT_WIDTH, VIEWPORT_HEIGHT, VIEWPORT_SCALE)
+    renderer = LevelRenderer(data.graphics)
+    level = data.level
+    tileset = data.world.tileset
+
+    max_x = level.tilemap.width * Tilemap.TILE_SIZE
+    max_y = level.tilemap.height * Tilemap.TILE_SIZE
+    camera = Camera(VIEWPORT_WIDTH, VIEWPORT_HEIGHT, max_x, max_y)
+
+    # Pan diagonally across the whole level.
+    positions = [(max_x * index // RENDER_FRAMES, max_y * index // RENDER_FRAMES) for index in range(RENDER_FRAMES)]
+
+    # Render collision tiles once up front, like the editor does on first use.
+    if draw_collision:
+        for tile in tileset.tiles:
+            tile.surface_collision
+
+    def operation():
+        for x, y in positions:
+            camera.move_absolute(x, y)
+            renderer.render(presenter.surface, camera, level, tileset, draw_collision, False, draw_entities)
+            presenter.present()
+
+    return operation
+
+
+def bench_render_tiles(data: BenchmarkData) -> Callable:
+    return render_frames(data, False, False)
+
+
+def bench_render_entities(data: BenchmarkData) -> Callable:
+    return render_frames(data, False, True)
+
+
+def bench_render_collision(data: BenchmarkData) -> Callable:
+    return render_frames(data, True, True)
+
+
+def bench_generate_blocks(data: BenchmarkData) -> Callable:
+    return data.level.generate_blocks
+
+
+def bench_blockmap_size(data: BenchmarkData) -> Callable:
+    return data.level.calculate_blockmap_size
+
+
+def bench_undo_tiles(data: BenchmarkData) -> Callable:
+    return lambda: copy(data.level.tilemap.tiles)
+
+
+def bench_undo_entities(data: BenchmarkData) -> Callable:
+    return lambda: deepcopy(data.level.entities)
+
+
+def bench_save(data: BenchmarkData) -> Callable:
+    def operation():
+        for _, _, level in data.game.iter_levels():
+            level.modified = True
+        data.game.save()
+
+    return operation
+
+
+# Benchmark names, setup functions that return the operation to time, and the number of times to repeat it.
+BENCHMARKS: List[Tuple[str, Callable[[BenchmarkData], Callable], int]] = [
+    ('stream.tilemap', bench_stream_tilemap, 20),
+    ('tileset.load', bench_tileset_load, 10),
+    ('graphics.load', bench_graphics_load, 10),
+    ('graphics.load_sprites', bench_graphics_load_sprites, 10),
+    ('game.load', bench_game_load, 5),
+    ('render.tiles', bench_render_tiles, 10),
+    ('render.entities', bench_render_entities, 10),
+    ('render.collision', bench_render_collision, 10),
+    ('level.generate_blocks', bench_generate_blocks, 20),
+    ('level.blockmap_size', bench_blockmap_size, 20),
+    ('undo.tiles', bench_undo_tiles, 100),
+    ('undo.entities', bench_undo_entities, 20),
+    ('game.save', bench_save, 5),
+]
+
+
+def run(data: BenchmarkData, repeat_scale: float, name_filter: Optional[str]) -> Dict[str, Dict]:
+    results = {}
+    for name, setup, repeat in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+
+        operation = setup(data)
+        results[name] = measure(operation, max(1, int(repeat * repeat_scale)))
+        print('{:<24}{:>12.3f} ms'.format(name, results[name]['median'] * 1000))
+
+    return results
+
+
+# Prints the change in median time against earlier results, and returns the number of regressions.
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> int:
+    regressions = 0
+
+    print()
+    print('{:<24}{:>12}{:>12}{:>10}'.format('Compared to baseline', 'baseline', 'current', 'change'))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        before = baseline[name]['median']
+        after = result['median']
+        change = (after - before) / before if before else 0.0
+
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print('{:<24}{:>10.3f}ms{:>10.3f}ms{:>+9.1f}%{}'.format(name, before * 1000, after * 1000, change * 100, flag))
+
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark loading, rendering, editing and saving game data.')
+    parser.add_argument('--data', help='game directory to benchmark with, instead of synthetic data')
+    parser.add_argument('--level-data', default='level-data.json', help='level data file for the game directory')
+    parser.add_argument('--graphics', default='graphics.json', help='graphics file for the game directory')
+    parser.add_argument('--width', type=int, default=256, help='synthetic tilemap width in tiles')
+    parser.add_argument('--height', type=int, default=32, help='synthetic tilemap height in tiles')
+    parser.add_argument('--entities', type=int, default=200, help='synthetic entities per level')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply the synthetic tilemap area and entity count by this factor')
+    parser.add_argument('--seed', type=int, default=1, help='seed for synthetic data')
+    parser.add_argument('--repeat-scale', type=float, default=1.0, help='multiplier for the number of runs of each benchmark')
+    parser.add_argument('--filter', help='only run benchmarks with names containing this text')
+    parser.add_argument('--output', help='file to write JSON results to')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown that counts as a regression')
+    args = parser.parse_args(argv)
+
+    # Saving modifies game files, so always work on a copy.
+    with tempfile.TemporaryDirectory() as temp_directory:
+        directory = os.path.join(temp_directory, 'game')
+
+        if args.data:
+            shutil.copytree(args.data, directory)
+            level_data_filename = args.level_data
+            graphics_filename = args.graphics
+            source = {'directory': args.data}
+        else:
+            options = SyntheticOptions(width=args.width, height=args.height, entities=args.entities, seed=args.seed)
+            options.scale(args.scale)
+            generate(directory, options)
+            level_data_filename = os.path.join(directory, 'level-data.json')
+            graphics_filename = os.path.join(directory, 'graphics.json')
+            source = {'synthetic': vars(options)}
+
+        data = BenchmarkData(directory, level_data_filename, graphics_filename)
+        print('Benchmarking with level "{}", {}x{} tiles and {} entities.'.format(
+            data.level.name, data.level.tilemap.width, data.level.tilemap.height, len(data.level.entities)
+        ))
+        results = run(data, args.repeat_scale, args.filter)
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'simd': SIMDLevel.NAMES[get_simd_level()],
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'data': source,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as fp:
+            baseline = json.load(fp)
+        if compare(results, baseline['results'], args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,197 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Verifies and benchmarks renderlib's blend operations at each supported SIMD level.
+# Run from the program's root directory with: python -m tools.blendbench (with src on the Python path).
+
+import argparse
+import random
+import sys
+import time
+
+from typing import Callable, List, Optional, Tuple
+
+from renderlib.simd import SIMDLevel, get_simd_level, get_simd_supported, set_simd_level
+from renderlib.surface import BlendOp, Surface
+
+
+BLEND_OPS: List[Tuple[str, int]] = [
+    ('ALPHA', BlendOp.ALPHA),
+    ('ALPHA50', BlendOp.ALPHA50),
+    ('ALPHA_SIMPLE', BlendOp.ALPHA_SIMPLE),
+]
+
+FILL_OPS: List[Tuple[str, int]] = [
+    ('ALPHA', BlendOp.ALPHA),
+    ('ALPHA50', BlendOp.ALPHA50),
+]
+
+FILL_COLORS: List[int] = [0x00FF8040, 0x80FF8040, 0x01123456, 0xFEABCDEF, 0xFF00FF00]
+
+# Destination offsets that exercise clipping and unaligned row tails.
+BLIT_OFFSETS: List[Tuple[int, int]] = [(0, 0), (3, 1), (-5, -2), (61, 17), (-70, 40)]
+
+
+def random_pixels(rng: random.Random, width: int, height: int) -> bytearray:
+    pixels = bytearray(rng.getrandbits(8) for _ in range(width * height * 4))
+
+    # Sprites are mostly fully transparent or fully opaque, with some translucent pixels in between.
+    alphas = rng.choices([0x00, 0xFF, None], weights=[4, 4, 2], k=width * height)
+    pixels[3::4] = bytes(rng.randrange(1, 255) if alpha is None else alpha for alpha in alphas)
+
+    return pixels
+
+
+def levels_to_test() -> List[int]:
+    return list(range(SIMDLevel.NONE, get_simd_supported() + 1))
+
+
+def render_cases(src: Surface, width: int, height: int) -> List[Tuple[str, Callable]]:
+    cases = []
+
+    for name, blend_op in BLEND_OPS:
+        for x, y in BLIT_OFFSETS:
+            cases.append(('blit {} at {},{}'.format(name, x, y), lambda dest, x=x, y=y, op=blend_op: dest.blit_blend(src, x, y, op)))
+        for scale_width, scale_height in [(src.width * 2, src.height * 2), (src.width * 3 - 1, src.height + 5)]:
+            cases.append(('scale {} to {}x{}'.format(name, scale_width, scale_height), lambda dest, w=scale_width, h=scale_height, op=blend_op: dest.blit_blend_scale(src, -7, -3, w, h, op)))
+
+    for name, blend_op in FILL_OPS:
+        for color in FILL_COLORS:
+            cases.append(('fill {} with {:08X}'.format(name, color), lambda dest, c=color, op=blend_op: dest.box_fill(-3, 2, width - 5, height, c, op)))
+
+    return cases
+
+
+def render_case(dest_pixels: bytearray, width: int, height: int, case: Callable, level: int) -> bytes:
+    pixels = bytearray(dest_pixels)
+    dest = Surface.from_buffer(pixels, width, height)
+
+    set_simd_level(level)
+    case(dest)
+    del dest
+
+    return bytes(pixels)
+
+
+def first_difference(a: bytes, b: bytes) -> Optional[int]:
+    for index in range(0, len(a), 4):
+        if a[index:index + 4] != b[index:index + 4]:
+            return index // 4
+
+    return None
+
+
+def verify(width: int, height: int, seed: int) -> int:
+    rng = random.Random(seed)
+    dest_pixels = random_pixels(rng, width, height)
+    src_pixels = random_pixels(rng, width // 2 + 3, height // 2 + 1)
+    src = Surface.from_buffer(src_pixels, width // 2 + 3, height // 2 + 1)
+
+    levels = levels_to_test()
+    failures = 0
+    for name, case in render_cases(src, width, height):
+        expected = render_case(dest_pixels, width, height, case, SIMDLevel.NONE)
+
+        for level in levels[1:]:
+            result = render_case(dest_pixels, width, height, case, level)
+            pixel = first_difference(expected, result)
+            if pixel is None:
+                continue
+
+            failures += 1
+            print('MISMATCH {} with {}: first differing pixel at {},{} (scalar {}, vector {}).'.format(
+                name, SIMDLevel.NAMES[level], pixel % width, pixel // width,
+                expected[pixel * 4:pixel * 4 + 4].hex(), result[pixel * 4:pixel * 4 + 4].hex()
+            ))
+
+    return failures
+
+
+def measure(operation: Callable, pixels: int, duration: float) -> float:
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        operation()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+
+    return (iterations * pixels) / elapsed / 1000000
+
+
+def benchmark(width: int, height: int, duration: float, seed: int):
+    rng = random.Random(seed)
+    dest = Surface.empty(width, height)
+    src = Surface.from_buffer(random_pixels(rng, width, height), width, height)
+    half = Surface.from_buffer(random_pixels(rng, width // 2, height // 2), width // 2, height // 2)
+
+    operations = []
+    for name, blend_op in BLEND_OPS:
+        operations.append(('blit_blend {}'.format(name), lambda op=blend_op: dest.blit_blend(src, 0, 0, op)))
+    for name, blend_op in FILL_OPS:
+        operations.append(('box_fill {}'.format(name), lambda op=blend_op: dest.box_fill(0, 0, width, height, 0x80FF8040 if op == BlendOp.ALPHA else 0xFFFF8040, op)))
+    for name, blend_op in BLEND_OPS:
+        operations.append(('blit_blend_scale {}'.format(name), lambda op=blend_op: dest.blit_blend_scale(half, 0, 0, width, height, op)))
+
+    levels = levels_to_test()
+    print('{:<28}'.format('Mpixels/s at {}x{}'.format(width, height)) + ''.join('{:>10}'.format(SIMDLevel.NAMES[level]) for level in levels))
+    for name, operation in operations:
+        results = []
+        for level in levels:
+            set_simd_level(level)
+            results.append(measure(operation, width * height, duration))
+        print('{:<28}'.format(name) + ''.join('{:>10.1f}'.format(result) for result in results))
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, _, height = value.partition('x')
+    return int(width), int(height)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Verify and benchmark renderlib blend operations.')
+    parser.add_argument('--size', type=parse_size, default=(640, 360), help='benchmark surface size, as WIDTHxHEIGHT')
+    parser.add_argument('--duration', type=float, default=0.5, help='seconds to run each benchmark for')
+    parser.add_argument('--seed', type=int, default=1, help='seed for random pixel data')
+    parser.add_argument('--verify-only', action='store_true', help='only compare vector results against scalar results')
+    args = parser.parse_args(argv)
+
+    initial_level = get_simd_level()
+    print('SIMD support: {}.'.format(SIMDLevel.NAMES[get_simd_supported()]))
+
+    failures = verify(133, 71, args.seed)
+    if failures:
+        print('{} vector results differ from scalar results.'.format(failures))
+    else:
+        print('Vector results match scalar results.')
+
+    if not args.verify_only:
+        width, height = args.size
+        benchmark(width, height, args.duration, args.seed)
+
+    set_simd_level(initial_level)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,397 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Renders a fixed set of camera positions and views of every level, and compares hashes of the rendered surfaces against
+# stored golden hashes, so that changes to tile, entity or blend rendering that alter the output do not go unnoticed.
+# Mismatching images are written as PNG files, together with a diff against the stored reference image.
+# Runs on synthetic game data unless a game directory is given. Create or update the golden hashes with --update.
+# Run from the program's root directory with: python -m tools.golden (with src on the Python path).
+
+import argparse
+import hashlib
+import json
+import os.path
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from renderlib.surface import Surface
+
+from turrican2.camera import Camera
+from turrican2.game import Game
+from turrican2.graphics import Graphics
+from turrican2.level import Level
+from turrican2.levelrenderer import LevelRenderer
+from turrican2.tilemap import Tilemap
+
+from tools.synthetic import SyntheticOptions, generate
+
+
+VERSION: int = 1
+
+# Unscaled viewport size. Neither dimension is a multiple of the tile size, so that partially visible tiles are drawn.
+VIEWPORT_WIDTH: int = 400
+VIEWPORT_HEIGHT: int = 232
+
+# Views of each level, with the draw_collision, draw_blockmap, draw_entities, entity_origins and entities_translucent
+# arguments to pass to the level renderer. The normal and entities views match the tiles and entities edit modes.
+VIEWS: Dict[str, Tuple[bool, bool, bool, bool, bool]] = {
+    'normal': (False, False, True, False, True),
+    'collision': (True, False, False, False, False),
+    'entities': (False, False, True, True, False),
+    'blockmap': (False, True, False, False, False),
+}
+
+# Camera positions of each level, as fractions of the distance the camera can move. The level start is added to these.
+POSITIONS: Dict[str, Tuple[float, float]] = {
+    'top-left': (0.0, 0.0),
+    'center': (0.5, 0.5),
+    'bottom-right': (1.0, 1.0),
+    'third': (0.37, 0.71),
+}
+
+# Entities per synthetic level, more than the default so that nearly every camera position shows several of them.
+SYNTHETIC_ENTITIES: int = 800
+
+GOLDEN_FILENAME: str = 'golden.json'
+
+# Pixels that match the reference image are drawn darkened in diff images, pixels that differ in this color.
+COLOR_DIFF: int = 0xFFFF00FF
+
+
+# Settings shared by every level that is checked.
+class GoldenOptions:
+
+    def __init__(self, golden_directory: str, diff_directory: str, update: bool = False, width: int = VIEWPORT_WIDTH,
+                 height: int = VIEWPORT_HEIGHT, graphics_filename: str = 'graphics.json', compile_sprites: bool = False):
+        self.golden_directory: str = golden_directory
+        self.diff_directory: str = diff_directory
+        self.graphics_filename: str = graphics_filename
+        self.width: int = width
+        self.height: int = height
+
+        # Entities are drawn from run-length encoded sprites instead of surfaces. Both must render the same images.
+        self.compile_sprites: bool = compile_sprites
+
+        # Write reference images instead of diffs.
+        self.update: bool = update
+
+
+# A rendered image that does not match its golden hash.
+class ImageMismatch:
+
+    def __init__(self, name: str, expected: Optional[str], actual: str):
+        self.name: str = name
+        self.expected: Optional[str] = expected
+        self.actual: str = actual
+
+        # Only known if a reference image exists.
+        self.pixels: Optional[int] = None
+        self.rectangle: Optional[Tuple[int, int, int, int]] = None
+
+
+# The result of checking a single level.
+class LevelCheck:
+
+    def __init__(self, world_index: int, level_index: int, name: str):
+        self.world_index: int = world_index
+        self.level_index: int = level_index
+        self.name: str = name
+        self.hashes: Dict[str, str] = {}
+        self.mismatches: List[ImageMismatch] = []
+
+
+def get_image_name(world_index: int, level_index: int, view: str, position: str) -> str:
+    return 'L{}-{}-{}-{}'.format(world_index + 1, level_index + 1, view, position)
+
+
+def get_camera_positions(level: Level, width: int, height: int) -> Dict[str, Tuple[int, int]]:
+    range_x = max(0, level.tilemap.width * Tilemap.TILE_SIZE - width)
+    range_y = max(0, level.tilemap.height * Tilemap.TILE_SIZE - height)
+
+    # The same position that the editor centers a level on when it is opened.
+    positions = {
+        'start': (
+            int(level.camera_tile_x * Tilemap.TILE_SIZE + 152 - width / 2),
+            int(level.camera_tile_y * Tilemap.TILE_SIZE + 96 - height / 2),
+        ),
+    }
+    for name, (fraction_x, fraction_y) in POSITIONS.items():
+        positions[name] = (int(round(range_x * fraction_x)), int(round(range_y * fraction_y)))
+
+    return positions
+
+
+def hash_surface(surface: Surface) -> str:
+    return hashlib.sha1(surface.get_bytes()).hexdigest()
+
+
+# Writes an image showing which pixels of a surface differ from a reference image. Returns the number of differing
+# pixels and the rectangle that contains them.
+def write_diff(surface: Surface, reference: Surface, filename: str) -> Tuple[int, Optional[Tuple[int, int, int, int]]]:
+    if reference.width != surface.width or reference.height != surface.height:
+        raise Exception('Reference image is {}x{}, not {}x{}.'.format(reference.width, reference.height, surface.width, surface.height))
+
+    width = surface.width
+    actual_pixels = surface.get_buffer().cast('B').cast('I').tolist()
+    reference_pixels = reference.get_buffer().cast('B').cast('I').tolist()
+
+    diff = Surface.empty(width, surface.height)
+    diff_pixels = diff.get_buffer().cast('B').cast('I')
+
+    count = 0
+    x1 = y1 = x2 = y2 = -1
+    for index, (actual, expected) in enumerate(zip(actual_pixels, reference_pixels)):
+        if actual == expected:
+            diff_pixels[index] = ((actual >> 2) & 0x3F3F3F) | 0xFF000000
+            continue
+
+        diff_pixels[index] = COLOR_DIFF
+        y, x = divmod(index, width)
+        if not count:
+            x1, y1, x2, y2 = x, y, x, y
+        else:
+            x1 = min(x1, x)
+            x2 = max(x2, x)
+            y2 = y
+        count += 1
+
+    diff.write_to_png(filename)
+    if not count:
+        return 0, None
+    return count, (x1, y1, x2 - x1 + 1, y2 - y1 + 1)
+
+
+# Renders every level and checks it against golden hashes, or writes reference images if updating, one level per worker
+# process.
+def check(game_directory: str, level_data_filename: str, options: GoldenOptions, expected: Dict[str, str],
+          workers: Optional[int] = None) -> List[LevelCheck]:
+    game = Game(game_directory)
+    game.load(level_data_filename)
+    levels = [(world_index, level_index) for world_index, level_index, _ in game.iter_levels()]
+
+    if options.update:
+        os.makedirs(options.golden_directory, exist_ok=True)
+    else:
+        os.makedirs(options.diff_directory, exist_ok=True)
+
+        # Remove images of an earlier check, which may since have been fixed.
+        for filename in os.listdir(options.diff_directory):
+            if filename.endswith('-actual.png') or filename.endswith('-diff.png'):
+                os.remove(os.path.join(options.diff_directory, filename))
+
+    results: List[LevelCheck] = []
+
+    # Check in this process if only one worker is requested, which is easier to debug.
+    if workers == 1:
+        _worker_start(game_directory, level_data_filename, options, game)
+        for world_index, level_index in levels:
+            results.append(_worker_check_level(world_index, level_index, expected))
+
+    else:
+        initargs = (game_directory, level_data_filename, options)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_start, initargs=initargs) as executor:
+            futures = [executor.submit(_worker_check_level, world_index, level_index, expected) for world_index, level_index in levels]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    results.sort(key=lambda result: (result.world_index, result.level_index))
+    return results
+
+
+# Game data loaded once by each worker process.
+_worker_game: Optional[Game] = None
+_worker_renderer: Optional[LevelRenderer] = None
+_worker_options: Optional[GoldenOptions] = None
+
+
+def _worker_start(game_directory: str, level_data_filename: str, options: GoldenOptions, game: Optional[Game] = None):
+    global _worker_game, _worker_renderer, _worker_options
+
+    if game is None:
+        game = Game(game_directory)
+        game.load(level_data_filename)
+
+    graphics = Graphics(game_directory, options.compile_sprites, options.graphics_filename)
+
+    _worker_game = game
+    _worker_renderer = LevelRenderer(graphics)
+    _worker_options = options
+
+
+def _worker_check_level(world_index: int, level_index: int, expected: Dict[str, str]) -> LevelCheck:
+    world = _worker_game.worlds[world_index]
+    level = world.levels[level_index]
+    options = _worker_options
+    result = LevelCheck(world_index, level_index, level.name)
+
+    surface = Surface.empty(options.width, options.height)
+    max_x = level.tilemap.width * Tilemap.TILE_SIZE
+    max_y = level.tilemap.height * Tilemap.TILE_SIZE
+    camera = Camera(options.width, options.height, max_x, max_y)
+
+    for position, (x, y) in get_camera_positions(level, options.width, options.height).items():
+        camera.move_absolute(x, y)
+
+        for view, (draw_collision, draw_blockmap, draw_entities, entity_origins, entities_translucent) in VIEWS.items():
+            _worker_renderer.render(surface, camera, level, world.tileset, draw_collision, draw_blockmap, draw_entities,
+                                    entity_origins, None, entities_translucent)
+
+            name = get_image_name(world_index, level_index, view, position)
+            image_hash = hash_surface(surface)
+            result.hashes[name] = image_hash
+
+            if options.update:
+                surface.write_to_png(os.path.join(options.golden_directory, name + '.png'), 6)
+                continue
+
+            if expected.get(name) == image_hash:
+                continue
+
+            mismatch = ImageMismatch(name, expected.get(name), image_hash)
+            surface.write_to_png(os.path.join(options.diff_directory, name + '-actual.png'), 6)
+
+            reference_filename = os.path.join(options.golden_directory, name + '.png')
+            if os.path.exists(reference_filename):
+                reference = Surface.from_png(reference_filename)
+                diff_filename = os.path.join(options.diff_directory, name + '-diff.png')
+                mismatch.pixels, mismatch.rectangle = write_diff(surface, reference, diff_filename)
+
+            result.mismatches.append(mismatch)
+
+    return result
+
+
+def read_golden(filename: str) -> Dict:
+    with open(filename, 'r') as fp:
+        golden = json.load(fp)
+
+    if golden.get('version') != VERSION:
+        raise Exception('Golden file "{}" has unsupported version {}.'.format(filename, golden.get('version')))
+
+    return golden
+
+
+# Prints mismatching and missing images, and returns the number of failures.
+def print_report(results: List[LevelCheck], expected: Dict[str, str], diff_directory: str) -> int:
+    hashes = {}
+    failures = 0
+
+    for result in results:
+        hashes.update(result.hashes)
+        if not result.mismatches:
+            print('{}: ok'.format(result.name))
+            continue
+
+        print('{}: {} of {} images differ'.format(result.name, len(result.mismatches), len(result.hashes)))
+        for mismatch in result.mismatches:
+            failures += 1
+            if mismatch.expected is None:
+                print('  {}: no golden hash'.format(mismatch.name))
+            elif mismatch.pixels is None:
+                print('  {}: hash differs, no reference image to diff against'.format(mismatch.name))
+            elif not mismatch.pixels:
+                print('  {}: hash differs from the golden hash, but not from the reference image'.format(mismatch.name))
+            else:
+                x, y, width, height = mismatch.rectangle
+                print('  {}: {} pixels differ in {}x{} at {},{}'.format(mismatch.name, mismatch.pixels, width, height, x, y))
+
+    for name in sorted(set(expected) - set(hashes)):
+        print('{}: golden image was not rendered'.format(name))
+        failures += 1
+
+    if failures:
+        print('{} of {} images failed, see {} for their actual and diff images.'.format(failures, len(expected), diff_directory))
+    else:
+        print('All {} images match.'.format(len(hashes)))
+
+    return failures
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Compare rendered level views against golden image hashes.')
+    parser.add_argument('--data', help='game directory to render, instead of synthetic data')
+    parser.add_argument('--level-data', default='level-data.json', help='level data file for the game directory')
+    parser.add_argument('--graphics', default='graphics.json', help='graphics file for the game directory')
+    parser.add_argument('--seed', type=int, default=1, help='seed for synthetic data')
+    parser.add_argument('--golden', default='golden', help='directory with the golden hashes and reference images')
+    parser.add_argument('--diffs', default='golden-diffs', help='directory to write images that do not match to')
+    parser.add_argument('--sprites', action='store_true', help='draw entities from compiled sprites')
+    parser.add_argument('--update', action='store_true', help='write new golden hashes and reference images')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes, defaults to the number of CPUs')
+    args = parser.parse_args(argv)
+
+    golden_filename = os.path.join(args.golden, GOLDEN_FILENAME)
+    golden = None
+    if not args.update:
+        if not os.path.exists(golden_filename):
+            print('No golden hashes in "{}", create them with --update.'.format(args.golden))
+            return 1
+        golden = read_golden(golden_filename)
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        if args.data:
+            directory = args.data
+            level_data_filename = args.level_data
+            graphics_filename = args.graphics
+            source = {'directory': args.data}
+        else:
+            directory = os.path.join(temp_directory, 'game')
+            options = SyntheticOptions(entities=SYNTHETIC_ENTITIES, seed=args.seed)
+            generate(directory, options)
+            level_data_filename = os.path.join(directory, 'level-data.json')
+            graphics_filename = os.path.join(directory, 'graphics.json')
+            source = {'synthetic': vars(options)}
+
+        # Check with the same viewport size that the golden hashes were rendered at.
+        options = GoldenOptions(args.golden, args.diffs, args.update, graphics_filename=graphics_filename,
+                                compile_sprites=args.sprites)
+        if golden:
+            options.width, options.height = golden['viewport']
+            if golden['data'] != source:
+                print('Warning: the golden hashes were rendered from different game data.')
+
+        expected = golden['images'] if golden else {}
+        results = check(directory, level_data_filename, options, expected, args.workers)
+
+    if args.update:
+        hashes = {}
+        for result in results:
+            hashes.update(result.hashes)
+
+        with open(golden_filename, 'w') as fp:
+            json.dump({
+                'version': VERSION,
+                'data': source,
+                'viewport': [options.width, options.height],
+                'images': hashes,
+            }, fp, indent=2, sort_keys=True)
+        print('Wrote {} golden hashes and reference images to "{}".'.format(len(hashes), args.golden))
+        return 0
+
+    return 1 if print_report(results, expected, args.diffs) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
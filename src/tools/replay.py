@@ -0,0 +1,424 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Replays an input session recorded with Help > Record input in the editor, as fast as possible and without a window.
+# Events are fed through the same edit modes as in the editor, and the viewport is painted into an offscreen presenter
+# whenever the editor would repaint it. Reports the handling latency of each type of event and the resulting level
+# state hash, which must match the hash that was recorded at the end of the session.
+# Run from the program's root directory with: python -m tools.replay <session> <game directory> (with src on the Python
+# path).
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from renderlib.offscreen import OffscreenPresenter
+
+from turrican2.camera import Camera
+from turrican2.game import Game
+from turrican2.graphics import Graphics
+from turrican2.level import Level
+from turrican2.levelrenderer import LevelRenderer
+from turrican2.tilemap import Tilemap
+from turrican2.world import World
+
+from ui.editmodes.editmode import EditMode
+from ui.editmodes.editmodeentities import EditModeEntities
+from ui.editmodes.editmodestart import EditModeStart
+from ui.editmodes.editmodetiles import EditModeTiles
+from ui.inputsession import InputEvent, read_input_session
+
+import config
+
+
+# Edit mode numbers, the same as the editor's.
+MODE_TILES: int = 0
+MODE_ENTITIES: int = 1
+MODE_START: int = 2
+
+# Events after which the editor always repaints the viewport. Other events only repaint if the edit mode asks for it.
+REPAINT_EVENTS = {InputEvent.MODE, InputEvent.LEVEL, InputEvent.PAN, InputEvent.RESIZE, InputEvent.MOUSE_LEFT_DOWN, InputEvent.MOUSE_LEFT_UP,
+                  InputEvent.MOUSE_LEAVE, InputEvent.VIEW}
+
+
+# Stands in for the editor's entity picker, which passes the template of a selected entity on to the entities mode.
+class ReplayEntityPicker:
+
+    def __init__(self, frame):
+        self._frame = frame
+
+    def set_selection(self, entity_type: int, entity_subtype: int):
+        self._frame.set_entity_template(entity_type, entity_subtype)
+
+
+# Provides the parts of the editor's main frame that edit modes use, without a window.
+class ReplayFrame:
+
+    def __init__(self, game: Game, graphics: Graphics, width: int, height: int, paint: bool = True):
+        self._worlds: List[World] = game.worlds
+        self._world: Optional[World] = None
+        self._level: Optional[Level] = None
+        self._camera: Optional[Camera] = None
+
+        self._graphics: Graphics = graphics
+        self._renderer: LevelRenderer = LevelRenderer(graphics)
+        self._presenter: OffscreenPresenter = OffscreenPresenter(width, height, config.SCALE)
+        self._paint: bool = paint
+
+        # View options of the editor's Level menu, with the editor's defaults.
+        self._always_draw_entities: bool = True
+        self._draw_tile_collision: bool = False
+        self._draw_blockmap: bool = False
+
+        self._edit_modes: Dict[int, EditMode] = {
+            MODE_TILES: EditModeTiles(self),
+            MODE_ENTITIES: EditModeEntities(self),
+            MODE_START: EditModeStart(self),
+        }
+        self._edit_mode: EditMode = self._edit_modes[MODE_TILES]
+
+        self._keys: List[int] = []
+        self._refresh: bool = False
+
+        self.Entities: ReplayEntityPicker = ReplayEntityPicker(self)
+
+    def get_key_state(self, key: int) -> bool:
+        return key in self._keys
+
+    def set_viewport_cursor(self, cursor: int):
+        pass
+
+    def refresh_viewport(self):
+        self._refresh = True
+
+    def update_status(self):
+        pass
+
+    def set_level_modified(self, is_modified: bool):
+        self._level.modified = is_modified
+
+    def undo_add(self, data: Optional[Dict] = None):
+        mode = self.get_mode()
+
+        # Edit modes can pass their own undo data, otherwise they store a snapshot of the current state.
+        if data is None:
+            data = self._edit_mode.undo_store_item()
+
+        self._level.undo_push({'editmode': mode, 'data': data}, config.MAX_UNDO)
+
+    def undo(self):
+        self._edit_mode.end_drag()
+        item = self._level.undo_pop()
+        if item is not None:
+            self._edit_modes[item['editmode']].undo_restore_item(item['data'])
+
+    def get_mode(self) -> int:
+        return list(self._edit_modes.keys())[list(self._edit_modes.values()).index(self._edit_mode)]
+
+    def set_mode(self, mode: int):
+        if mode not in self._edit_modes:
+            raise Exception('Unknown edit mode {}.'.format(mode))
+        self._edit_mode.end_drag()
+        self._edit_mode = self._edit_modes[mode]
+
+    # The editor sizes the camera from the window size, which can be a fraction of a pixel larger than the viewport
+    # surface.
+    def resize(self, width: int, height: int, camera_width: float, camera_height: float):
+        self._presenter.resize(width, height)
+        if self._camera:
+            self._camera.set_size(camera_width, camera_height)
+
+    def set_view(self, view: Dict):
+        self._always_draw_entities = view.get('entities', self._always_draw_entities)
+        self._draw_tile_collision = view.get('collision', self._draw_tile_collision)
+        self._draw_blockmap = view.get('blockmap', self._draw_blockmap)
+
+    def set_entity_template(self, entity_type: int, entity_subtype: int):
+        template = self._level.get_entity_template(entity_type, entity_subtype)
+        if template is not None:
+            self._edit_modes[MODE_ENTITIES].set_template(template)
+
+    def select_level(self, world_index: int, level_index: int):
+        if world_index >= len(self._worlds) or level_index >= len(self._worlds[world_index].levels):
+            raise Exception('Level {}-{} does not exist.'.format(world_index + 1, level_index + 1))
+
+        if self._level:
+            self._edit_mode.end_drag()
+
+        self._world = self._worlds[world_index]
+        self._level = self._world.levels[level_index]
+
+        # Levels keep their camera, like in the editor. New cameras are centered on the level start.
+        width = self._presenter.surface.width
+        height = self._presenter.surface.height
+        if self._level.camera:
+            self._camera = self._level.camera
+            self._camera.set_size(width, height)
+        else:
+            max_x = self._level.tilemap.width * Tilemap.TILE_SIZE
+            max_y = self._level.tilemap.height * Tilemap.TILE_SIZE
+            self._camera = Camera(width, height, max_x, max_y)
+            self._level.camera = self._camera
+
+            x = (self._level.camera_tile_x * Tilemap.TILE_SIZE) + 152 - self._camera.width / 2
+            y = (self._level.camera_tile_y * Tilemap.TILE_SIZE) + 96 - self._camera.height / 2
+            self._camera.move_absolute(x, y)
+
+        for edit_mode in self._edit_modes.values():
+            edit_mode.set_level(self._world, self._level)
+
+    # Handles a single recorded event, and returns whether the editor would have repainted the viewport after it.
+    def handle(self, event: Dict) -> bool:
+        event_type = event['type']
+        self._keys = event.get('keys', [])
+        self._refresh = False
+        repaint = event_type in REPAINT_EVENTS
+
+        if event_type == InputEvent.MODE:
+            self.set_mode(event['mode'])
+
+        elif event_type == InputEvent.LEVEL:
+            self.select_level(event['world'], event['level'])
+
+        elif event_type == InputEvent.MOUSE_MOVE:
+            self._edit_mode.set_mouse_position((event['x'], event['y']))
+            repaint = self._edit_mode.mouse_move(None)
+
+        elif event_type == InputEvent.PAN:
+            # Jumping to the level start moves the camera without a mouse position.
+            if 'x' in event:
+                self._edit_mode.set_mouse_position((event['x'], event['y']))
+            self._camera.move_absolute(event['camera'][0], event['camera'][1])
+
+        elif event_type == InputEvent.RESIZE:
+            self.resize(event['viewport'][0], event['viewport'][1], event['camera_size'][0], event['camera_size'][1])
+            self._camera.move_absolute(event['camera'][0], event['camera'][1])
+
+        elif event_type == InputEvent.MOUSE_LEFT_DOWN:
+            self._edit_mode.mouse_left_down(None)
+
+        elif event_type == InputEvent.MOUSE_LEFT_UP:
+            self._edit_mode.mouse_left_up(None)
+
+        elif event_type == InputEvent.MOUSE_LEAVE:
+            self._edit_mode.end_drag()
+
+        elif event_type == InputEvent.KEY_CHAR:
+            self._edit_mode.key_char(event['key'])
+
+        elif event_type == InputEvent.TILE_SELECTION:
+            selection = Tilemap(list(event['tiles']), event['width'], event['height'])
+            self._edit_modes[MODE_TILES].set_selection(selection)
+
+        elif event_type == InputEvent.ENTITY_TEMPLATE:
+            self.set_entity_template(event['entity_type'], event['entity_subtype'])
+
+        elif event_type == InputEvent.UNDO:
+            self.undo()
+
+        elif event_type == InputEvent.VIEW:
+            self.set_view(event)
+
+        else:
+            raise Exception('Unknown input event type "{}".'.format(event_type))
+
+        return repaint or self._refresh
+
+    def paint(self):
+        if not self._paint:
+            return
+
+        editing_entities = (self._edit_mode == self._edit_modes[MODE_ENTITIES])
+        if editing_entities:
+            hover_entity = self._edit_mode.get_hover_entity()
+        else:
+            hover_entity = None
+
+        surface = self._presenter.surface
+        self._renderer.render(surface, self._camera, self._level, self._world.tileset,
+                              draw_collision=self._draw_tile_collision,
+                              draw_blockmap=self._draw_blockmap,
+                              draw_entities=self._always_draw_entities,
+                              entity_origins=editing_entities,
+                              hover_entity=hover_entity,
+                              entities_translucent=not editing_entities)
+        self._edit_mode.paint(surface, self._camera, self._graphics)
+        self._presenter.present()
+
+    @property
+    def level(self) -> Level:
+        return self._level
+
+    @property
+    def camera(self) -> Camera:
+        return self._camera
+
+
+def get_latency_stats(latencies: List[float]) -> Dict:
+    latencies = sorted(latencies)
+
+    def percentile(value: int) -> float:
+        index = max(0, min(len(latencies) - 1, int(round(value / 100 * len(latencies) + 0.5)) - 1))
+        return latencies[index]
+
+    return {
+        'count': len(latencies),
+        'mean': sum(latencies) / len(latencies),
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+        'max': latencies[-1],
+    }
+
+
+# Replays a session, and returns the replay report.
+def replay(events: List[Dict], frame: ReplayFrame) -> Dict:
+    start = events[0]
+    frame.select_level(start['world'], start['level'])
+    frame.set_mode(start['mode'])
+    frame.set_view(start.get('view', {}))
+    frame.camera.move_absolute(start['camera'][0], start['camera'][1])
+    initial_state = frame.level.get_state_hash()
+
+    latencies: Dict[str, List[float]] = {}
+    all_latencies = []
+    repaints = 0
+    recorded_state = None
+
+    replay_start = time.perf_counter()
+    for event in events[1:]:
+        if event['type'] == InputEvent.END:
+            recorded_state = event['state']
+            break
+
+        event_start = time.perf_counter()
+        if frame.handle(event):
+            frame.paint()
+            repaints += 1
+        latency = time.perf_counter() - event_start
+
+        latencies.setdefault(event['type'], []).append(latency)
+        all_latencies.append(latency)
+    elapsed = time.perf_counter() - replay_start
+
+    state = frame.level.get_state_hash()
+    return {
+        'events': len(all_latencies),
+        'repaints': repaints,
+        'seconds': elapsed,
+        'initial_state_matches': initial_state == start['state'],
+        'state': state,
+        'recorded_state': recorded_state,
+        'state_matches': recorded_state is None or state == recorded_state,
+        'latency': get_latency_stats(all_latencies) if all_latencies else None,
+        'latency_by_type': {event_type: get_latency_stats(values) for event_type, values in sorted(latencies.items())},
+    }
+
+
+def print_report(report: Dict):
+    print('Replayed {} events with {} repaints in {:.3f} seconds.'.format(report['events'], report['repaints'], report['seconds']))
+
+    print('{:<20}{:>8}{:>10}{:>10}{:>10}{:>10}'.format('Event', 'count', 'mean ms', 'p50 ms', 'p95 ms', 'max ms'))
+    rows = list(report['latency_by_type'].items())
+    if report['latency']:
+        rows.append(('all', report['latency']))
+    for name, stats in rows:
+        print('{:<20}{:>8}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}'.format(
+            name, stats['count'], stats['mean'] * 1000, stats['p50'] * 1000, stats['p95'] * 1000, stats['max'] * 1000
+        ))
+
+    print('Level state hash: {}'.format(report['state']))
+    if not report['initial_state_matches']:
+        print('Warning: the level did not start out the same as when the session was recorded.')
+    if report['recorded_state'] is None:
+        print('The session has no recorded end state to compare with.')
+    elif report['state_matches']:
+        print('The level state matches the recorded end state.')
+    else:
+        print('The level state does not match the recorded end state {}.'.format(report['recorded_state']))
+
+
+# Prints the change in p95 latency per event type against an earlier report, and returns the number of regressions.
+def compare(report: Dict, baseline: Dict, threshold: float) -> int:
+    regressions = 0
+
+    print()
+    print('{:<20}{:>14}{:>14}{:>10}'.format('Compared to baseline', 'baseline p95', 'current p95', 'change'))
+    for name, stats in report['latency_by_type'].items():
+        if name not in baseline['latency_by_type']:
+            continue
+
+        before = baseline['latency_by_type'][name]['p95']
+        after = stats['p95']
+        change = (after - before) / before if before else 0.0
+
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print('{:<20}{:>12.3f}ms{:>12.3f}ms{:>+9.1f}%{}'.format(name, before * 1000, after * 1000, change * 100, flag))
+
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Replay a recorded editor input session and report its latency.')
+    parser.add_argument('session', help='input session file recorded in the editor')
+    parser.add_argument('directory', help='game directory to replay the session on')
+    parser.add_argument('--level-data', default='level-data.json', help='level data file for the game directory')
+    parser.add_argument('--graphics', default='graphics.json', help='graphics file for the game directory')
+    parser.add_argument('--no-paint', action='store_true', help='only time event handling, without painting the viewport')
+    parser.add_argument('--output', help='file to write the JSON report to')
+    parser.add_argument('--compare', help='JSON report of an earlier replay to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative p95 slowdown that counts as a regression')
+    args = parser.parse_args(argv)
+
+    events = read_input_session(args.session)
+
+    game = Game(args.directory)
+    game.load(args.level_data)
+    graphics = Graphics(args.directory, config.COMPILE_SPRITES, args.graphics)
+
+    width, height = events[0]['viewport']
+    frame = ReplayFrame(game, graphics, width, height, not args.no_paint)
+    report = replay(events, frame)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+    exit_code = 0 if report['state_matches'] else 1
+    if args.compare:
+        with open(args.compare, 'r') as fp:
+            baseline = json.load(fp)
+        if compare(report, baseline, args.threshold):
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
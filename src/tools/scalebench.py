@@ -0,0 +1,140 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Verifies and benchmarks renderlib's integer upscaler, as used to present frames at common output sizes.
+# Run from the program's root directory with: python -m tools.scalebench (with src on the Python path).
+
+import argparse
+import random
+import sys
+import time
+
+from typing import Callable, List, Tuple
+
+from renderlib.simd import SIMDLevel, get_simd_level, get_simd_supported, set_simd_level
+from renderlib.surface import BlendOp, Surface
+
+
+# Output sizes and the presenter scales to test at each of them.
+OUTPUTS: List[Tuple[str, int, int, List[int]]] = [
+    ('1080p', 1920, 1080, [1, 2, 3, 4]),
+    ('4K', 3840, 2160, [2, 3, 4]),
+]
+
+
+def opaque_pixels(rng: random.Random, width: int, height: int) -> bytearray:
+    pixels = bytearray(rng.getrandbits(8) for _ in range(width * height * 4))
+    pixels[3::4] = b'\xFF' * (width * height)
+    return pixels
+
+
+def reference_scale(pixels: bytes, width: int, height: int, scale: int) -> bytes:
+    rows = []
+    for y in range(height):
+        row = pixels[y * width * 4:(y + 1) * width * 4]
+        row = b''.join(row[x * 4:x * 4 + 4] * scale for x in range(width))
+        rows.append(row * scale)
+
+    return b''.join(rows)
+
+
+def verify(seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+
+    # Odd sizes exercise the scalar tails of the widening kernels.
+    width, height = 37, 11
+    src = Surface.from_buffer(opaque_pixels(rng, width, height), width, height)
+
+    for scale in range(1, 6):
+        expected_bytes = reference_scale(src.get_bytes(), width, height, scale)
+
+        for level in range(SIMDLevel.NONE, get_simd_supported() + 1):
+            set_simd_level(level)
+            result = Surface.empty(width * scale, height * scale)
+            src.scale_to(result, scale)
+            if result.get_bytes() != expected_bytes:
+                failures += 1
+                print('MISMATCH at scale {} with {}.'.format(scale, SIMDLevel.NAMES[level]))
+
+    return failures
+
+
+def measure(operation: Callable, duration: float) -> float:
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        operation()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+
+    return elapsed / iterations * 1000
+
+
+def benchmark(duration: float, seed: int):
+    rng = random.Random(seed)
+    levels = list(range(SIMDLevel.NONE, get_simd_supported() + 1))
+
+    print('{:<20}{:>14}'.format('ms per frame', 'blit_scale') + ''.join('{:>10}'.format(SIMDLevel.NAMES[level]) for level in levels))
+    for name, output_width, output_height, scales in OUTPUTS:
+        frame = Surface.empty(output_width, output_height)
+        for scale in scales:
+            width = output_width // scale
+            height = output_height // scale
+            src = Surface.from_buffer(opaque_pixels(rng, width, height), width, height)
+
+            # The generic scaling blit is what presenting at any scale cost before.
+            results = [measure(lambda: frame.blit_blend_scale(src, 0, 0, output_width, output_height, BlendOp.SOLID), duration)]
+            for level in levels:
+                set_simd_level(level)
+                results.append(measure(lambda: src.scale_to(frame, scale), duration))
+
+            print('{:<20}{:>14.2f}'.format('{} at scale {}'.format(name, scale), results[0]) + ''.join('{:>10.2f}'.format(result) for result in results[1:]))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Verify and benchmark the renderlib integer upscaler.')
+    parser.add_argument('--duration', type=float, default=0.5, help='seconds to run each benchmark for')
+    parser.add_argument('--seed', type=int, default=1, help='seed for random pixel data')
+    parser.add_argument('--verify-only', action='store_true', help='only compare upscaled results against a reference')
+    args = parser.parse_args(argv)
+
+    initial_level = get_simd_level()
+    print('SIMD support: {}.'.format(SIMDLevel.NAMES[get_simd_supported()]))
+
+    failures = verify(args.seed)
+    if failures:
+        print('{} upscaled results differ from the reference.'.format(failures))
+    else:
+        print('Upscaled results match the reference.')
+
+    if not args.verify_only:
+        benchmark(args.duration, args.seed)
+
+    set_simd_level(initial_level)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
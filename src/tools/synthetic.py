@@ -0,0 +1,493 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+# Generates synthetic Turrican II CDTV game data, so that tools and benchmarks can run without the original game files.
+# The generated directory contains world and level files, a graphics file and matching graphics.json and
+# level-data.json files. Entity templates are read from the program's entities directory, so run from its root.
+
+import hashlib
+import json
+import math
+import os.path
+import random
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from turrican2.game import Game
+from turrican2.level import Entity, Level
+from turrican2.tilemap import Tilemap
+from turrican2.tileset import CollisionType
+from turrican2.world import World
+
+
+LEVEL_HEADER_SIZE: int = 50
+PALETTE_LENGTH: int = 16
+
+TILE_PLANES: int = 4
+TILE_DATA_SIZE: int = Tilemap.TILE_SIZE * Tilemap.TILE_SIZE * TILE_PLANES // 8
+TILE_COLLISION_SIZE: int = 16
+
+SPRITE_SIZE: int = 32
+SPRITE_PLANES: int = 4
+
+# Graphics that the editor draws itself, besides entity graphics, with their sprite counts.
+EDITOR_GRAPHICS: Dict[str, int] = {
+    'player': 2,
+}
+
+# Level 2 of world 3 stores its tilemap at this offset in its level file.
+WORLD3_LEVEL2_OFFSET: int = 19620
+
+# Saving a stream grows it by a byte if the last byte of the stream was written. Files end with padding that is never
+# written to, so that saving keeps their size.
+FILE_PADDING: int = 4
+
+COLLISION_VALUES: List[int] = [
+    CollisionType.SOLID,
+    CollisionType.DESTRUCTABLE,
+    CollisionType.SECRET,
+    CollisionType.HURT,
+]
+
+
+class SyntheticOptions:
+
+    def __init__(self, worlds: int = 5, levels: int = 2, width: int = 256, height: int = 32, tile_count: int = 128,
+                 entities: int = 200, entity_density: Optional[float] = None, seed: int = 1):
+        self.worlds: int = worlds
+        self.levels: int = levels
+
+        # Tilemap size in tiles.
+        self.width: int = width
+        self.height: int = height
+
+        self.tile_count: int = tile_count
+        self.seed: int = seed
+
+        # Entities per level. If a density is set, the number of entities per 100 tiles is used instead.
+        self.entities: int = entities
+        self.entity_density: Optional[float] = entity_density
+
+    # Scales the tilemap area by a factor, keeping its aspect ratio and the number of entities per tile.
+    def scale(self, factor: float):
+        side = math.sqrt(factor)
+        if self.entity_density is None:
+            self.entities = max(1, int(round(self.entities * factor)))
+        self.width = int(round(self.width * side))
+        self.height = int(round(self.height * side))
+
+    def get_entity_count(self) -> int:
+        if self.entity_density is not None:
+            return max(1, int(self.width * self.height * self.entity_density / 100))
+
+        return self.entities
+
+    def validate(self):
+        if not 1 <= self.worlds <= 5:
+            raise Exception('Synthetic games can have 1 to 5 worlds, not {}.'.format(self.worlds))
+        if not 1 <= self.levels <= 9:
+            raise Exception('Synthetic worlds can have 1 to 9 levels, not {}.'.format(self.levels))
+        if not 2 <= self.tile_count <= 256:
+            raise Exception('Synthetic tilesets can have 2 to 256 tiles, not {}.'.format(self.tile_count))
+        if self.width < 10 or self.height < 7:
+            raise Exception('Synthetic tilemaps must be at least 10x7 tiles, not {}x{}.'.format(self.width, self.height))
+        if self.width > 0xFFFF or self.height > 0xFFFF:
+            raise Exception('Tilemaps can be at most 65535x65535 tiles, not {}x{}.'.format(self.width, self.height))
+        if self.get_entity_count() < 1:
+            raise Exception('Synthetic levels need at least 1 entity.')
+
+        # Blockmap row pointers are 16 bit offsets into the block pointers.
+        blockmap_width, blockmap_height = get_blockmap_size(self.width, self.height)
+        if (blockmap_height - 1) * blockmap_width * 4 > 0xFFFF:
+            raise Exception('Tilemaps of {}x{} tiles need more blockmap blocks than the format supports.'.format(self.width, self.height))
+
+
+# Returns the blockmap size for a tilemap, such that the last row and column contain the map's bottom right corner.
+# Level.generate_blocks prunes an empty last row and column, so a corner entity keeps the blockmap size stable.
+def get_blockmap_size(width: int, height: int) -> Tuple[int, int]:
+    block_width = 512 if width <= 16 else 256
+    block_height = 512 if height <= 16 else 256
+
+    corner_x, corner_y = get_corner_position(width, height)
+    blockmap_width = int(((corner_x + 3) * 8) / block_width) + 1
+    blockmap_height = int((corner_y * 8) / block_height) + 1
+
+    return blockmap_width, blockmap_height
+
+
+# Returns the position of an entity in the bottom right tile of a tilemap, in entity origin units.
+def get_corner_position(width: int, height: int) -> Tuple[int, int]:
+    tile_origins = Tilemap.TILE_SIZE // Level.ORIGIN_SIZE
+    return (width - 1) * tile_origins, (height - 1) * tile_origins
+
+
+def get_blockmap_reserve(width: int, height: int, entities: int) -> int:
+    blockmap_width, blockmap_height = get_blockmap_size(width, height)
+    blocks = blockmap_width * blockmap_height
+
+    # Row pointers, block pointers, every entity and a terminator for each block.
+    return blockmap_height * 2 + blocks * 4 + entities * 3 + blocks + 1
+
+
+def encode_planar(pixels: List[int], width: int, height: int, planes: int) -> bytes:
+    data = bytearray()
+    for y in range(height):
+        row = pixels[y * width:(y + 1) * width]
+        for plane in range(planes):
+            for x in range(0, width, 8):
+                value = 0
+                for bit in range(8):
+                    if (row[x + bit] >> plane) & 1:
+                        value |= 0x80 >> bit
+                data.append(value)
+
+    return bytes(data)
+
+
+def create_palette(rng: random.Random) -> bytes:
+    colors = [0] + [rng.getrandbits(12) for _ in range(PALETTE_LENGTH - 1)]
+    return struct.pack('>{}H'.format(PALETTE_LENGTH), *colors)
+
+
+def create_tile(rng: random.Random, index: int) -> Tuple[bytes, bytes]:
+    size = Tilemap.TILE_SIZE
+
+    # Tile 0 is empty.
+    if index == 0:
+        return bytes(TILE_DATA_SIZE), bytes(TILE_COLLISION_SIZE)
+
+    # A pattern of two colors with some noise, so that tiles differ but compress like real graphics.
+    base = rng.randrange(1, PALETTE_LENGTH)
+    accent = rng.randrange(1, PALETTE_LENGTH)
+    pattern = rng.randrange(2, 5)
+    pixels = []
+    for y in range(size):
+        for x in range(size):
+            if rng.random() < 0.05:
+                pixels.append(rng.randrange(PALETTE_LENGTH))
+            elif (x // 8 + y // 8) % pattern == 0:
+                pixels.append(accent)
+            else:
+                pixels.append(base)
+
+    # Most tiles are fully solid or empty, some have a mix of collision types.
+    kind = rng.random()
+    if kind < 0.4:
+        collision = bytes([CollisionType.SOLID] * TILE_COLLISION_SIZE)
+    elif kind < 0.7:
+        collision = bytes(TILE_COLLISION_SIZE)
+    else:
+        collision = bytes(rng.choice([0] + COLLISION_VALUES) for _ in range(TILE_COLLISION_SIZE))
+
+    return encode_planar(pixels, size, size, TILE_PLANES), collision
+
+
+def create_sprite(rng: random.Random) -> bytes:
+    size = SPRITE_SIZE
+
+    # An ellipse on a transparent background.
+    radius_x = rng.uniform(6, size / 2)
+    radius_y = rng.uniform(6, size / 2)
+    colors = [rng.randrange(1, PALETTE_LENGTH) for _ in range(3)]
+    pixels = []
+    for y in range(size):
+        for x in range(size):
+            distance = ((x + 0.5 - size / 2) / radius_x) ** 2 + ((y + 0.5 - size / 2) / radius_y) ** 2
+            if distance > 1.0:
+                pixels.append(0)
+            else:
+                pixels.append(colors[min(2, int(distance * 3))])
+
+    return encode_planar(pixels, size, size, SPRITE_PLANES)
+
+
+# Column-major tile data, as stored in level files. Each column has a ground height that varies slowly, with empty
+# tiles above it and runs of similar tiles below.
+def create_tilemap(rng: random.Random, width: int, height: int, tile_count: int) -> bytes:
+    columns = []
+    ground = height // 2
+    for _ in range(width):
+        ground = max(1, min(height - 1, ground + rng.choice([-1, 0, 0, 0, 1])))
+
+        column = bytearray(height)
+        tile = rng.randrange(1, tile_count)
+        for y in range(ground, height):
+            if rng.random() < 0.2:
+                tile = rng.randrange(1, tile_count)
+            column[y] = tile
+        columns.append(bytes(column))
+
+    return b''.join(columns)
+
+
+def get_graphics_names(entities_directory: str = 'entities') -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for filename in sorted(os.listdir(entities_directory)):
+        if not filename.endswith('.json'):
+            continue
+
+        with open(os.path.join(entities_directory, filename), 'r') as fp:
+            data = json.load(fp)
+
+        for type_data in data.values():
+            for subtype_data in type_data['subtypes'].values():
+                merged = type_data['type'].copy()
+                merged.update(subtype_data)
+
+                name = merged.get('gfx', 'fontsmall')
+                counts[name] = max(counts.get(name, 0), merged.get('gfx_index', 0) + 1)
+
+    return counts
+
+
+def write_graphics(directory: str, rng: random.Random):
+    names = get_graphics_names()
+    for name, count in EDITOR_GRAPHICS.items():
+        names[name] = max(names.get(name, 0), count)
+
+    data = bytearray(create_palette(rng))
+    graphics = []
+    for name, count in sorted(names.items()):
+        graphics.append({
+            'name': name,
+            'description': 'Synthetic {}'.format(name),
+            'offset': len(data),
+            'count': count,
+            'width': SPRITE_SIZE,
+            'height': SPRITE_SIZE,
+            'planes': SPRITE_PLANES,
+            'mode': 'planar',
+            'mask': 'color_zero',
+            'palette': 'synthetic',
+            'flip_y': False,
+        })
+        for _ in range(count):
+            data.extend(create_sprite(rng))
+
+    with open(os.path.join(directory, 'MAIN'), 'wb') as fp:
+        fp.write(data)
+
+    graphics_data = {
+        'MAIN': {
+            'palettes': {'synthetic': {'offset': 0, 'length': PALETTE_LENGTH}},
+            'graphics': graphics,
+        }
+    }
+    with open(os.path.join(directory, 'graphics.json'), 'w') as fp:
+        json.dump(graphics_data, fp, indent=2)
+
+
+def write_level_header(data_offset: int, options: SyntheticOptions, blockmap_offset: int) -> bytes:
+    blockmap_width, blockmap_height = get_blockmap_size(options.width, options.height)
+    player_x = 2 * Tilemap.TILE_SIZE
+    player_y = 2 * Tilemap.TILE_SIZE
+
+    return struct.pack(
+        '>IHHhhhhHHIIB3xIIIHI',
+        data_offset + World.BASE_OFFSET,
+        options.width, options.height,
+        0, 0,
+        player_x + 32, player_y + 32,
+        blockmap_width - 1, blockmap_height - 1,
+        World.BASE_OFFSET, World.BASE_OFFSET,
+        0,
+        World.BASE_OFFSET,
+        blockmap_offset + World.BASE_OFFSET,
+        blockmap_offset + blockmap_height * 2 + World.BASE_OFFSET,
+        0,
+        World.BASE_OFFSET
+    )
+
+
+# An empty blockmap, with every block pointing to the same empty entity list.
+def create_empty_blockmap(offset: int, width: int, height: int) -> bytes:
+    data = bytearray()
+    for row in range(height):
+        data.extend(struct.pack('>H', row * width * 4))
+
+    empty_block = offset + len(data) + width * height * 4
+    for _ in range(width * height):
+        data.extend(struct.pack('>I', empty_block + World.BASE_OFFSET))
+    data.append(0xFF)
+
+    return bytes(data)
+
+
+def write_world(directory: str, world_index: int, options: SyntheticOptions, rng: random.Random) -> List[Dict]:
+    level_count = options.levels
+    tilemap_size = options.width * options.height
+    blockmap_reserve = get_blockmap_reserve(options.width, options.height, options.get_entity_count())
+    blockmap_width, blockmap_height = get_blockmap_size(options.width, options.height)
+
+    offset_headers = 5 * 4 + 2 + level_count * 4
+    offset_palette = offset_headers + level_count * LEVEL_HEADER_SIZE
+    offset_tile_gfx = offset_palette + PALETTE_LENGTH * 2
+    offset_tile_collision = offset_tile_gfx + options.tile_count * (4 + TILE_DATA_SIZE)
+    offset_tilemap = offset_tile_collision + options.tile_count * TILE_COLLISION_SIZE
+    offset_blockmaps = offset_tilemap + tilemap_size
+    world_size = offset_blockmaps + level_count * blockmap_reserve + FILE_PADDING
+
+    data = bytearray(world_size)
+    struct.pack_into('>IIIIIH', data, 0, offset_tile_gfx + World.BASE_OFFSET, offset_tile_collision + World.BASE_OFFSET,
+                     offset_palette + World.BASE_OFFSET, 0, 0, level_count)
+
+    for level_index in range(level_count):
+        struct.pack_into('>I', data, 22 + level_index * 4, offset_headers + level_index * LEVEL_HEADER_SIZE + World.BASE_OFFSET)
+
+        # Other levels are stored in their own files, which are inserted past the end of the world file when loading.
+        data_offset = offset_tilemap if level_index == 0 else world_size
+        blockmap_offset = offset_blockmaps + level_index * blockmap_reserve
+        header = write_level_header(data_offset, options, blockmap_offset)
+        data[offset_headers + level_index * LEVEL_HEADER_SIZE:offset_headers + (level_index + 1) * LEVEL_HEADER_SIZE] = header
+
+        blockmap = create_empty_blockmap(blockmap_offset, blockmap_width, blockmap_height)
+        data[blockmap_offset:blockmap_offset + len(blockmap)] = blockmap
+
+    data[offset_palette:offset_palette + PALETTE_LENGTH * 2] = create_palette(rng)
+
+    tile_offset = options.tile_count * 4
+    for tile_index in range(options.tile_count):
+        tile_data, collision = create_tile(rng, tile_index)
+        struct.pack_into('>I', data, offset_tile_gfx + tile_index * 4, tile_offset)
+        data[offset_tile_gfx + tile_offset:offset_tile_gfx + tile_offset + TILE_DATA_SIZE] = tile_data
+        data[offset_tile_collision + tile_index * TILE_COLLISION_SIZE:offset_tile_collision + (tile_index + 1) * TILE_COLLISION_SIZE] = collision
+        tile_offset += TILE_DATA_SIZE
+
+    data[offset_tilemap:offset_tilemap + tilemap_size] = create_tilemap(rng, options.width, options.height, options.tile_count)
+
+    with open(os.path.join(directory, 'L{}-1'.format(world_index + 1)), 'wb') as fp:
+        fp.write(data)
+
+    for level_index in range(1, level_count):
+        offset = WORLD3_LEVEL2_OFFSET if world_index == 2 and level_index == 1 else 0
+        level_data = bytes(offset) + create_tilemap(rng, options.width, options.height, options.tile_count) + bytes(FILE_PADDING)
+        with open(os.path.join(directory, 'L{}-{}'.format(world_index + 1, level_index + 1)), 'wb') as fp:
+            fp.write(level_data)
+
+    return [{
+        'name': 'Synthetic {}-{}'.format(world_index + 1, level_index + 1),
+        'blockmap_size': blockmap_reserve,
+    } for level_index in range(level_count)]
+
+
+def add_entities(level: Level, options: SyntheticOptions, rng: random.Random):
+    templates = sorted(level.get_entity_templates().keys())
+    max_x, max_y = get_corner_position(options.width, options.height)
+
+    entities = []
+    for index in range(options.get_entity_count()):
+        entity_type, entity_subtype = rng.choice(templates)
+        entity = Entity(entity_type, entity_subtype)
+        if index == 0:
+            entity.x, entity.y = max_x, max_y
+        else:
+            entity.x = rng.randint(0, max_x)
+            entity.y = rng.randint(0, max_y)
+        entities.append(entity)
+
+    level.entities = entities
+    level.modified = True
+
+
+def generate(directory: str, options: SyntheticOptions) -> Game:
+    options.validate()
+    rng = random.Random(options.seed)
+
+    os.makedirs(directory, exist_ok=True)
+
+    level_data = []
+    for world_index in range(options.worlds):
+        levels = write_world(directory, world_index, options, rng)
+        level_data.append({'world_file': 'L{}-1'.format(world_index + 1), 'levels': levels})
+
+    level_data_filename = os.path.join(directory, 'level-data.json')
+    with open(level_data_filename, 'w') as fp:
+        json.dump(level_data, fp, indent=2)
+
+    write_graphics(directory, rng)
+
+    # Files that every game directory contains, but that are not used by the editor.
+    for filename in Game.REQUIRED_FILES:
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            with open(path, 'wb') as fp:
+                fp.write(bytes(FILE_PADDING))
+
+    # Entities are added through the regular save path, which builds their blockmaps.
+    game = Game(directory)
+    game.load(level_data_filename)
+    for _, _, level in game.iter_levels():
+        add_entities(level, options, rng)
+
+    levels_not_saved = game.save()
+    if levels_not_saved:
+        raise Exception('{} synthetic levels could not be saved.'.format(levels_not_saved))
+
+    return game
+
+
+def hash_files(directory: str) -> Dict[str, str]:
+    hashes = {}
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            with open(path, 'rb') as fp:
+                hashes[filename] = hashlib.sha1(fp.read()).hexdigest()
+
+    return hashes
+
+
+def get_level_state(level: Level) -> Tuple:
+    entities = sorted((entity.type, entity.subtype, entity.x, entity.y) for entity in level.entities)
+    return (bytes(level.tilemap.tiles), tuple(entities), level.player_x, level.player_y, level.camera_tile_x,
+            level.camera_tile_y)
+
+
+# Loads and saves every level of a game directory twice, and returns a list of differences. The level contents must
+# survive the first save unchanged, and the second save must not change any file.
+def verify_round_trip(directory: str, level_data_filename: str) -> List[str]:
+    problems = []
+
+    game = Game(directory)
+    game.load(level_data_filename)
+    states = {(world_index, level_index): get_level_state(level) for world_index, level_index, level in game.iter_levels()}
+
+    for _, _, level in game.iter_levels():
+        level.modified = True
+    if game.save():
+        problems.append('Not all levels could be saved.')
+    hashes = hash_files(directory)
+
+    game = Game(directory)
+    game.load(level_data_filename)
+    for world_index, level_index, level in game.iter_levels():
+        if get_level_state(level) != states[(world_index, level_index)]:
+            problems.append('Level {}-{} changed after saving and loading it.'.format(world_index + 1, level_index + 1))
+        level.modified = True
+    game.save()
+
+    for filename, digest in hash_files(directory).items():
+        if hashes.get(filename) != digest:
+            problems.append('"{}" changed after saving it a second time.'.format(filename))
+
+    return problems
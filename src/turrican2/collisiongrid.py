@@ -0,0 +1,182 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from array import array
+from typing import Dict, List, Optional
+
+from turrican2.tilemap import Tilemap
+from turrican2.tileset import CollisionType, TileSet
+
+
+class CollisionBitset:
+
+    def __init__(self, bits: int, width: int, height: int):
+        self.bits: int = bits
+        self.width: int = width
+        self.height: int = height
+
+    def get(self, x: int, y: int) -> bool:
+        return bool((self.bits >> (x + y * self.width)) & 1)
+
+    def count(self) -> int:
+        return bin(self.bits).count('1')
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.width * self.height + 7) // 8, 'little')
+
+
+class CollisionGrid:
+
+    CELLS: int = 4
+
+    CLASSES: List[int] = [
+        CollisionType.SOLID,
+        CollisionType.DESTRUCTABLE,
+        CollisionType.SECRET,
+        CollisionType.HURT,
+    ]
+
+    def __init__(self, tilemap: Tilemap, tileset: TileSet):
+        self._tilemap: Tilemap = tilemap
+        self._tileset: TileSet = tileset
+
+        self._width: int = 0
+        self._height: int = 0
+
+        # The grid is built on first use, and kept up to date afterwards.
+        self._grid: Optional[bytearray] = None
+        self._bitsets: Dict[int, CollisionBitset] = {}
+
+        # For each tile index, the 4 cell rows of its collision data.
+        self._tile_rows: List[List[bytes]] = self.get_tile_rows(tileset)
+
+        self._tilemap.add_listener(self.tilemap_changed)
+
+    @staticmethod
+    def get_tile_rows(tileset: TileSet) -> List[List[bytes]]:
+        cells = CollisionGrid.CELLS
+        empty = bytes(cells)
+
+        tile_rows = []
+        for row in range(0, cells):
+            strips = [empty] * 256
+            for index, tile in enumerate(tileset.tiles[:256]):
+                strips[index] = bytes(tile.collision[row * cells:(row + 1) * cells])
+            tile_rows.append(strips)
+
+        return tile_rows
+
+    def build(self):
+        cells = CollisionGrid.CELLS
+        tiles = self._tilemap.tiles
+        width = self._tilemap.width
+
+        self._width = width * cells
+        self._height = self._tilemap.height * cells
+
+        # Compose each grid row by joining the matching collision row of every tile on the tilemap row.
+        rows = []
+        for y in range(0, self._tilemap.height):
+            tile_row = tiles[y * width:(y + 1) * width]
+            for strips in self._tile_rows:
+                rows.append(b''.join(map(strips.__getitem__, tile_row)))
+
+        self._grid = bytearray(b''.join(rows))
+        self._bitsets = {}
+
+    def tilemap_changed(self, offsets: Optional[array], old: Optional[bytes]):
+        if self._grid is None:
+            return
+
+        if offsets is None:
+            self._grid = None
+            self._bitsets = {}
+            return
+
+        cells = CollisionGrid.CELLS
+        tiles = self._tilemap.tiles
+        width = self._tilemap.width
+        grid = self._grid
+        grid_width = self._width
+
+        for offset in offsets:
+            index = tiles[offset]
+            x = (offset % width) * cells
+            y = (offset // width) * cells
+            for row, strips in enumerate(self._tile_rows):
+                start = x + (y + row) * grid_width
+                grid[start:start + cells] = strips[index]
+
+        self._bitsets = {}
+
+    def detach(self):
+        self._tilemap.remove_listener(self.tilemap_changed)
+
+    def get(self, x: int, y: int) -> int:
+        grid = self.grid
+        if x < 0 or y < 0 or x >= self._width or y >= self._height:
+            return 0
+
+        return grid[x + y * self._width]
+
+    def get_bitset(self, collision_type: int) -> CollisionBitset:
+        bitset = self._bitsets.get(collision_type)
+        if bitset is not None:
+            return bitset
+
+        # Translate cells to ASCII 0 and 1 digits and parse them as one big binary number, least significant bit first.
+        grid = self.grid
+        if len(grid):
+            table = bytes(0x31 if value == collision_type else 0x30 for value in range(256))
+            bits = int(grid.translate(table)[::-1], 2)
+        else:
+            bits = 0
+
+        bitset = CollisionBitset(bits, self._width, self._height)
+        self._bitsets[collision_type] = bitset
+
+        return bitset
+
+    def get_bitsets(self) -> Dict[int, CollisionBitset]:
+        return {collision_type: self.get_bitset(collision_type) for collision_type in CollisionGrid.CLASSES}
+
+    @property
+    def grid(self) -> bytearray:
+        if self._grid is None:
+            self.build()
+
+        return self._grid
+
+    @property
+    def width(self) -> int:
+        if self._grid is None:
+            self.build()
+
+        return self._width
+
+    @property
+    def height(self) -> int:
+        if self._grid is None:
+            self.build()
+
+        return self._height
@@ -0,0 +1,128 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+
+class EntityTemplate:
+
+    def __init__(self, name: str, type: int, subtype: int, data: Dict):
+        self.name: str = name
+
+        self.type: int = type
+        self.subtype: int = subtype
+
+        self.gfx: str = data.get('gfx', 'fontsmall')
+        self.gfx_index: int = data.get('gfx_index', 0)
+
+        offset = data.get('offset', [0, 0])
+        self.offset_x: int = offset[0]
+        self.offset_y: int = offset[1]
+
+
+TemplateKey = Tuple[int, int]
+
+
+# Process-wide cache of entity template files. Each file is parsed once, and parsed again only if its modification time
+# changes. Levels that use the same files share the same template objects and the same read-only view.
+class TemplateRegistry:
+
+    def __init__(self):
+        self._files: Dict[str, Tuple[int, Dict[TemplateKey, EntityTemplate]]] = {}
+        self._views: Dict[Tuple[str, ...], Tuple[Tuple[int, ...], Mapping[TemplateKey, EntityTemplate]]] = {}
+
+    def get_file_templates(self, filename: str) -> Tuple[int, Dict[TemplateKey, EntityTemplate]]:
+        mtime = os.stat(filename).st_mtime_ns
+
+        cached = self._files.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached
+
+        entry = (mtime, self.parse(filename))
+        self._files[filename] = entry
+
+        return entry
+
+    def get_templates(self, filenames: Sequence[str]) -> Mapping[TemplateKey, EntityTemplate]:
+        layers = [self.get_file_templates(filename) for filename in filenames]
+        mtimes = tuple(layer[0] for layer in layers)
+
+        key = tuple(filenames)
+        cached = self._views.get(key)
+        if cached is not None and cached[0] == mtimes:
+            return cached[1]
+
+        # Later files override templates from earlier ones.
+        merged: Dict[TemplateKey, EntityTemplate] = {}
+        for _, templates in layers:
+            merged.update(templates)
+
+        view = MappingProxyType(merged)
+        self._views[key] = (mtimes, view)
+
+        return view
+
+    def clear(self):
+        self._files = {}
+        self._views = {}
+
+    @staticmethod
+    def parse(filename: str) -> Dict[TemplateKey, EntityTemplate]:
+        with open(filename, 'r') as fp:
+            data = json.load(fp)
+
+        templates: Dict[TemplateKey, EntityTemplate] = {}
+        for type_key, data in data.items():
+            type_key = int(type_key)
+            type_data = data['type']
+
+            for subtype_key, subtype_data in data['subtypes'].items():
+                subtype_key = int(subtype_key)
+
+                merged_data = type_data.copy()
+                merged_data.update(subtype_data)
+
+                type_name = type_data.get('name', 'Unnamed')
+                subtype_name = subtype_data.get('name', None)
+
+                if type_name and subtype_name:
+                    name = '{} - {}'.format(type_name, subtype_name)
+                elif subtype_name:
+                    name = subtype_name
+                else:
+                    name = type_name
+
+                key = (type_key, subtype_key)
+                templates[key] = EntityTemplate(name, type_key, subtype_key, merged_data)
+
+        return templates
+
+    @property
+    def filenames(self) -> List[str]:
+        return list(self._files.keys())
+
+
+registry = TemplateRegistry()
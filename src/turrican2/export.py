@@ -0,0 +1,199 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os.path
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from renderlib.png_writer import PNGWriter
+from renderlib.surface import Surface
+
+from turrican2.camera import Camera
+from turrican2.game import Game
+from turrican2.graphics import Graphics
+from turrican2.level import Level
+from turrican2.levelrenderer import LevelRenderer
+from turrican2.tilemap import Tilemap
+from turrican2.tileset import TileSet
+
+
+# The result of exporting a single level map.
+class LevelExport:
+
+    def __init__(self, world_index: int, level_index: int, name: str, width: int, height: int):
+        self.world_index: int = world_index
+        self.level_index: int = level_index
+        self.name: str = name
+        self.width: int = width
+        self.height: int = height
+        self.filename: str = ''
+        self.indexed: bool = False
+        self.seconds: float = 0.0
+
+
+# Settings shared by every level that is exported.
+class MapExportOptions:
+
+    def __init__(self, output_directory: str, draw_entities: bool = True, draw_collision: bool = False,
+                 draw_blockmap: bool = False, strip_height: int = 1024, compile_sprites: bool = False,
+                 indexed: bool = True, graphics_filename: str = 'graphics.json', compress_level: int = 6):
+        self.output_directory: str = output_directory
+        self.draw_entities: bool = draw_entities
+        self.draw_collision: bool = draw_collision
+        self.draw_blockmap: bool = draw_blockmap
+        self.compile_sprites: bool = compile_sprites
+        self.graphics_filename: str = graphics_filename
+
+        # Write palette-indexed PNG files where possible, which are much smaller.
+        self.indexed: bool = indexed
+
+        # Compression level 9 is several times slower than 6, for files that are only a little smaller.
+        self.compress_level: int = compress_level
+
+        # Maps are rendered and written in horizontal strips of this many pixels, so that a full map surface never needs
+        # to be held in memory.
+        self.strip_height: int = max(Tilemap.TILE_SIZE, strip_height - strip_height % Tilemap.TILE_SIZE)
+
+
+# Renders full level maps to PNG files, one level per worker process.
+class MapExporter:
+
+    def __init__(self, game_directory: str, options: MapExportOptions, level_data_filename: str = 'level-data.json'):
+        self._game_directory: str = game_directory
+        self._options: MapExportOptions = options
+        self._level_data_filename: str = level_data_filename
+
+    def export(self, workers: Optional[int] = None,
+               callback: Optional[Callable[[LevelExport], None]] = None) -> List[LevelExport]:
+        game = Game(self._game_directory)
+        game.load(self._level_data_filename)
+        levels = [(world_index, level_index) for world_index, level_index, _ in game.iter_levels()]
+
+        os.makedirs(self._options.output_directory, exist_ok=True)
+
+        results: List[LevelExport] = []
+
+        # Export in this process if only one worker is requested, which is easier to debug.
+        if workers == 1:
+            _worker_start(self._game_directory, self._level_data_filename, self._options, game)
+            for world_index, level_index in levels:
+                result = _worker_export_level(world_index, level_index)
+                results.append(result)
+                if callback:
+                    callback(result)
+
+        else:
+            initargs = (self._game_directory, self._level_data_filename, self._options)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_worker_start, initargs=initargs) as executor:
+                futures = [executor.submit(_worker_export_level, world_index, level_index) for world_index, level_index in levels]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if callback:
+                        callback(result)
+
+        results.sort(key=lambda result: (result.world_index, result.level_index))
+        return results
+
+
+# Game data loaded once by each worker process. Surfaces cannot be sent between processes, so every worker loads its
+# own copy.
+_worker_game: Optional[Game] = None
+_worker_renderer: Optional[LevelRenderer] = None
+_worker_options: Optional[MapExportOptions] = None
+
+
+def _worker_start(game_directory: str, level_data_filename: str, options: MapExportOptions, game: Optional[Game] = None):
+    global _worker_game, _worker_renderer, _worker_options
+
+    if game is None:
+        game = Game(game_directory)
+        game.load(level_data_filename)
+
+    graphics = None
+    if options.draw_entities:
+        graphics = Graphics(game_directory, options.compile_sprites, options.graphics_filename)
+
+    _worker_game = game
+    _worker_renderer = LevelRenderer(graphics)
+    _worker_options = options
+
+
+def _worker_export_level(world_index: int, level_index: int) -> LevelExport:
+    start = time.perf_counter()
+
+    world = _worker_game.worlds[world_index]
+    level = world.levels[level_index]
+    options = _worker_options
+
+    width = level.tilemap.width * Tilemap.TILE_SIZE
+    height = level.tilemap.height * Tilemap.TILE_SIZE
+    result = LevelExport(world_index, level_index, level.name, width, height)
+    result.filename = get_map_filename(options.output_directory, world_index, level_index)
+
+    # Fall back to RGBA if the map uses more colors than fit in a palette.
+    result.indexed = options.indexed
+    if not result.indexed or not _write_map(result.filename, world.tileset, level, width, height, True):
+        result.indexed = False
+        _write_map(result.filename, world.tileset, level, width, height, False)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+# Renders a map strip by strip into a PNG file. Returns False if an indexed PNG file has too many colors.
+def _write_map(filename: str, tileset: TileSet, level: Level, width: int, height: int, indexed: bool) -> bool:
+    options = _worker_options
+
+    surface = Surface.empty(width, min(height, options.strip_height))
+    camera = Camera(width, surface.height, width, height)
+
+    with PNGWriter(filename, width, height, options.compress_level, indexed) as writer:
+        for strip_y, strip_height in get_strips(height, options.strip_height):
+            # The last strip can be shorter than the others. Render it at the bottom of the surface, so that the
+            # camera does not need to be resized.
+            offset_y = surface.height - strip_height
+            camera.move_absolute(0, strip_y - offset_y)
+
+            _worker_renderer.render(surface, camera, level, tileset, options.draw_collision, options.draw_blockmap,
+                                    options.draw_entities)
+
+            try:
+                writer.write(surface, offset_y, strip_height)
+            except Exception:
+                if indexed and writer.palette_size == 256:
+                    writer.abort()
+                    return False
+                raise
+
+    return True
+
+
+# Returns the y coordinate and height of each horizontal strip that a map of a height is divided into.
+def get_strips(height: int, strip_height: int) -> List[Tuple[int, int]]:
+    return [(y, min(strip_height, height - y)) for y in range(0, height, strip_height)]
+
+
+def get_map_filename(directory: str, world_index: int, level_index: int) -> str:
+    return os.path.join(directory, 'L{}-{}.png'.format(world_index + 1, level_index + 1))
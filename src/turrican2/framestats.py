@@ -0,0 +1,181 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import logging
+import logging.handlers
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from renderlib.render_stats import get_render_stats, reset_render_stats
+
+
+# Timing and drawing work of a single phase of a frame.
+class PhaseStats:
+
+    def __init__(self):
+        self.time: float = 0.0
+        self.blits: int = 0
+        self.fills: int = 0
+        self.primitives: int = 0
+        self.pixels: int = 0
+
+
+# Measures how long each phase of a frame takes and how much drawing it does, over a rolling window of frames.
+# Phases are marked in the order they complete; the time and work since the previous mark is attributed to them.
+class FrameStats:
+
+    PERCENTILES: Tuple[int, ...] = (50, 95, 99)
+
+    def __init__(self, window: int = 240, log_filename: Optional[str] = None, log_size: int = 1024 * 1024,
+                 log_count: int = 3):
+        if window < 1:
+            raise Exception('Invalid frame statistics window size {}.'.format(window))
+
+        self._window: int = window
+        self._times: Deque[float] = deque(maxlen=window)
+        self._frame_count: int = 0
+
+        self._phases: Dict[str, PhaseStats] = {}
+        self._last_phases: Dict[str, PhaseStats] = {}
+        self._frame_start: float = 0.0
+        self._mark_time: float = 0.0
+        self._mark_blits: int = 0
+        self._mark_fills: int = 0
+        self._mark_primitives: int = 0
+        self._mark_pixels: int = 0
+        self._in_frame: bool = False
+
+        # Summaries are written to their own logger, so that they do not end up in the regular application log.
+        self._logger: Optional[logging.Logger] = None
+        if log_filename:
+            handler = logging.handlers.RotatingFileHandler(log_filename, maxBytes=log_size, backupCount=log_count,
+                                                           delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+
+            self._logger = logging.getLogger('{}.{}'.format(__name__, id(self)))
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.addHandler(handler)
+
+    def close(self):
+        if not self._logger:
+            return
+
+        for handler in list(self._logger.handlers):
+            handler.close()
+            self._logger.removeHandler(handler)
+        self._logger = None
+
+    def begin_frame(self):
+        reset_render_stats()
+
+        self._phases = {}
+        self._frame_start = time.perf_counter()
+        self._mark_time = self._frame_start
+        self._mark_blits = 0
+        self._mark_fills = 0
+        self._mark_primitives = 0
+        self._mark_pixels = 0
+        self._in_frame = True
+
+    def mark(self, phase: str):
+        if not self._in_frame:
+            return
+
+        now = time.perf_counter()
+        stats = get_render_stats()
+
+        phase_stats = self._phases.get(phase)
+        if phase_stats is None:
+            phase_stats = PhaseStats()
+            self._phases[phase] = phase_stats
+
+        phase_stats.time += now - self._mark_time
+        phase_stats.blits += stats.blits - self._mark_blits
+        phase_stats.fills += stats.fills - self._mark_fills
+        phase_stats.primitives += stats.primitives - self._mark_primitives
+        phase_stats.pixels += stats.pixels - self._mark_pixels
+
+        self._mark_time = now
+        self._mark_blits = stats.blits
+        self._mark_fills = stats.fills
+        self._mark_primitives = stats.primitives
+        self._mark_pixels = stats.pixels
+
+    def end_frame(self):
+        if not self._in_frame:
+            return
+
+        self._times.append(time.perf_counter() - self._frame_start)
+        self._last_phases = self._phases
+        self._in_frame = False
+
+        self._frame_count += 1
+        if self._logger and self._frame_count % self._window == 0:
+            self._logger.info(self.get_summary())
+
+    def get_percentile(self, percentile: int) -> float:
+        if not self._times:
+            return 0.0
+
+        # Nearest-rank percentile.
+        times = sorted(self._times)
+        index = max(0, min(len(times) - 1, int(round(percentile / 100 * len(times) + 0.5)) - 1))
+        return times[index]
+
+    def get_summary(self) -> str:
+        percentiles = ' '.join(['p{}={:.2f}ms'.format(p, self.get_percentile(p) * 1000) for p in FrameStats.PERCENTILES])
+        phases = ' '.join(['{}={:.2f}ms'.format(name, phase.time * 1000) for name, phase in self._last_phases.items()])
+        return 'frames={} {} last: {}'.format(len(self._times), percentiles, phases)
+
+    def get_lines(self) -> List[str]:
+        lines = [
+            'FRAME {:.2f} MS'.format(self.last_time * 1000),
+            ' '.join(['P{} {:.2f}'.format(p, self.get_percentile(p) * 1000) for p in FrameStats.PERCENTILES]),
+        ]
+
+        for name, phase in self._last_phases.items():
+            lines.append('{:<9} {:6.2f} MS {:5} BLITS {:4} FILLS {:5} PRIM {:8} PX'.format(
+                name.upper(), phase.time * 1000, phase.blits, phase.fills, phase.primitives, phase.pixels
+            ))
+
+        return lines
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    @property
+    def last_time(self) -> float:
+        if not self._times:
+            return 0.0
+        return self._times[-1]
+
+    @property
+    def last_phases(self) -> Dict[str, PhaseStats]:
+        return self._last_phases
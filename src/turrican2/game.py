@@ -0,0 +1,81 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os.path
+from typing import Iterator, List, Tuple
+
+from turrican2.level import Level
+from turrican2.tracing import traced
+from turrican2.world import World
+
+
+# A Turrican II CDTV game directory, with all of its worlds.
+class Game:
+
+    # Files that every Turrican II CDTV directory contains.
+    REQUIRED_FILES: List[str] = ['L1-1', 'L2-1', 'L3-1', 'L4-1', 'L5-1', 'LOADER', 'MAIN']
+
+    def __init__(self, directory: str):
+        self._directory: str = directory
+        self._worlds: List[World] = []
+
+    @staticmethod
+    def is_game_directory(directory: str) -> bool:
+        for filename in Game.REQUIRED_FILES:
+            if not os.path.exists(os.path.join(directory, filename)):
+                return False
+
+        return True
+
+    @traced('game.load')
+    def load(self, level_data_filename: str = 'level-data.json'):
+        with open(level_data_filename, 'r') as fp:
+            level_data = json.load(fp)
+
+        self._worlds = []
+        for data in level_data:
+            world = World()
+            world.load(os.path.join(self._directory, data['world_file']), data['levels'])
+            self._worlds.append(world)
+
+    # Saves all modified levels in all worlds, and returns the number of levels that could not be saved.
+    def save(self) -> int:
+        levels_not_saved = 0
+        for world in self._worlds:
+            levels_not_saved += world.save()
+
+        return levels_not_saved
+
+    def iter_levels(self) -> Iterator[Tuple[int, int, Level]]:
+        for world_index, world in enumerate(self._worlds):
+            for level_index, level in enumerate(world.levels):
+                yield world_index, level_index, level
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def worlds(self) -> List[World]:
+        return self._worlds
@@ -23,24 +23,36 @@
 
 import json
 import os.path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from renderlib.stream_read import StreamRead
 from renderlib.palette import Palette
 from renderlib.bitplane import Bitplane, BitplaneType, MaskMode
+from renderlib.sprite import Sprite
 from renderlib.surface import Surface
 from renderlib.utils import Endianness
 
+from turrican2.tracing import traced
+
 
 class Graphics:
 
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, compile_sprites: bool=False, json_filename: str='graphics.json'):
         self.graphics: Dict[str, List[Surface]] = {}
-        self.load_graphics('graphics.json', directory)
+
+        # Run-length encoded copies of each surface, for faster blitting.
+        self.sprites: Dict[str, List[Sprite]] = {}
+        self._compile_sprites: bool = compile_sprites
+
+        self.load_graphics(json_filename, directory)
 
     def get_surfaces(self, name: str) -> List[Surface]:
         return self.graphics.get(name, None)
 
+    def get_sprites(self, name: str) -> Optional[List[Sprite]]:
+        return self.sprites.get(name, None)
+
+    @traced('graphics.load_graphics')
     def load_graphics(self, json_filename: str, directory: str):
         with open(json_filename, 'r') as fp:
             data = json.load(fp)
@@ -106,3 +118,7 @@ class Graphics:
                     self.graphics[gfx['name']].extend(surfaces)
                 else:
                     self.graphics[gfx['name']] = surfaces
+
+                if self._compile_sprites:
+                    sprites = [Sprite.from_surface(surface) for surface in surfaces]
+                    self.sprites.setdefault(gfx['name'], []).extend(sprites)
@@ -21,15 +21,17 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import json
-from typing import Dict, List, Optional, Tuple
+import hashlib
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from renderlib.stream_read import StreamRead
 from renderlib.stream_write import StreamWrite
 
+from turrican2.camera import Camera
+from turrican2.entitytemplates import EntityTemplate, registry
 from turrican2.tilemap import Tilemap
-
-from ui.camera import Camera
+from turrican2.tileindex import TileIndex
+from turrican2.tracing import traced
 
 
 class Entity:
@@ -42,22 +44,6 @@ class Entity:
         self.selected: bool = False
 
 
-class EntityTemplate:
-
-    def __init__(self, name: str, type: int, subtype: int, data: Dict):
-        self.name: str = name
-
-        self.type: int = type
-        self.subtype: int = subtype
-
-        self.gfx: str = data.get('gfx', 'fontsmall')
-        self.gfx_index: int = data.get('gfx_index', 0)
-
-        offset = data.get('offset', [0, 0])
-        self.offset_x: int = offset[0]
-        self.offset_y: int = offset[1]
-
-
 class Block:
 
     def __init__(self):
@@ -98,8 +84,11 @@ class Level:
         self._u2: int = 0
 
         self._tilemap: Optional[Tilemap] = None
+
+        # Built on first use, only highlighting and replacing tiles need it.
+        self._tile_index: Optional[TileIndex] = None
         self._entities: List[Entity] = []
-        self._entity_templates: Dict[Tuple[int, int], EntityTemplate] = {}
+        self._entity_templates: Mapping[Tuple[int, int], EntityTemplate] = {}
 
         self._tilemap_width: int = 0
         self._tilemap_height: int = 0
@@ -118,36 +107,15 @@ class Level:
         self.camera: Optional[Camera] = None
         self.modified: bool = False
 
-        self.load_entity_templates('entities/shared.json')
-        self.load_entity_templates('entities/world{}-shared.json'.format(world_index + 1))
-        self.load_entity_templates('entities/world{}-level{}.json'.format(world_index + 1, level_index + 1))
-
-    def load_entity_templates(self, filename: str):
-        with open(filename, 'r') as fp:
-            data = json.load(fp)
-
-        for type_key, data in data.items():
-            type_key = int(type_key)
-            type_data = data['type']
-
-            for subtype_key, subtype_data in data['subtypes'].items():
-                subtype_key = int(subtype_key)
-
-                merged_data = type_data.copy()
-                merged_data.update(subtype_data)
-
-                type_name = type_data.get('name', 'Unnamed')
-                subtype_name = subtype_data.get('name', None)
+        self.load_entity_templates()
 
-                if type_name and subtype_name:
-                    name = '{} - {}'.format(type_name, subtype_name)
-                elif subtype_name:
-                    name = subtype_name
-                else:
-                    name = type_name
-
-                key = (type_key, subtype_key)
-                self._entity_templates[key] = EntityTemplate(name, type_key, subtype_key, merged_data)
+    @traced('level.load_entity_templates')
+    def load_entity_templates(self):
+        self._entity_templates = registry.get_templates([
+            'entities/shared.json',
+            'entities/world{}-shared.json'.format(self._world_index + 1),
+            'entities/world{}-level{}.json'.format(self._world_index + 1, self._level_index + 1),
+        ])
 
     def save_header(self, stream: StreamWrite):
         stream.write_uint(self._offset_level_data + Level.BASE_OFFSET)
@@ -218,9 +186,13 @@ class Level:
 
         self._offset_code_3 = stream.read_uint() - Level.BASE_OFFSET
 
+    @traced('level.load')
     def load(self, stream: StreamRead, offset: int = 0):
         stream.seek(self._offset_level_data + offset)
         self._tilemap = Tilemap.from_stream(stream, self._tilemap_width, self._tilemap_height)
+        if self._tile_index is not None:
+            self._tile_index.detach()
+            self._tile_index = None
 
         self.read_entities(stream, self._offset_blockmap_pointers)
 
@@ -373,7 +345,7 @@ class Level:
 
         return template
 
-    def get_entity_templates(self) -> Dict[Tuple[int, int], EntityTemplate]:
+    def get_entity_templates(self) -> Mapping[Tuple[int, int], EntityTemplate]:
         return self._entity_templates
 
     def get_entities_inside(self, x1: int, y1: int, x2: int, y2: int) -> List[Entity]:
@@ -498,10 +470,50 @@ class Level:
 
         return True
 
+    # Adds an item to the undo stack. Items that were undone are discarded, as is the oldest item if the stack is full.
+    def undo_push(self, item: Dict, max_size: int):
+        if len(self.undo) == max_size:
+            self.undo = self.undo[1:]
+            self.undo_index -= 1
+
+        self.undo = self.undo[0:self.undo_index + 1]
+        self.undo.append(item)
+        self.undo_index += 1
+
+    # Returns the most recent undo item and steps back past it, or None if there is nothing left to undo.
+    def undo_pop(self) -> Optional[Dict]:
+        if self.undo_index == -1:
+            return None
+
+        item = self.undo[self.undo_index]
+        self.undo_index -= 1
+        return item
+
+    # Returns a hash of everything that can be edited in this level, to compare level states without saving them.
+    def get_state_hash(self) -> str:
+        digest = hashlib.sha1()
+        digest.update('{} {}\n'.format(self._tilemap.width, self._tilemap.height).encode())
+        digest.update(bytes(self._tilemap.tiles))
+
+        entities = sorted((entity.type, entity.subtype, entity.x, entity.y) for entity in self._entities)
+        for entity in entities:
+            digest.update('{} {} {} {}\n'.format(*entity).encode())
+
+        digest.update('{} {} {} {}\n'.format(self.camera_tile_x, self.camera_tile_y, self.player_x, self.player_y).encode())
+
+        return digest.hexdigest()
+
     @property
     def tilemap(self) -> Tilemap:
         return self._tilemap
 
+    @property
+    def tile_index(self) -> TileIndex:
+        if self._tile_index is None:
+            self._tile_index = TileIndex(self._tilemap)
+
+        return self._tile_index
+
     @property
     def entities(self) -> List[Entity]:
         return self._entities
@@ -0,0 +1,136 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from typing import Optional
+
+from renderlib.surface import BlendOp, Surface
+
+from turrican2.camera import Camera
+from turrican2.framestats import FrameStats
+from turrican2.graphics import Graphics
+from turrican2.level import Entity, Level
+from turrican2.tileset import TileSet
+
+
+# Renders a level view onto any surface, independent of where that surface is presented.
+class LevelRenderer:
+
+    COLOR_ORIGIN: int = 0xFFFFFFFF
+    COLOR_BLOCKMAP: int = 0xFFFF00FF
+
+    COLOR_ENTITY_HOVER: int = 0xFFFFFFFF
+    COLOR_ENTITY_SELECTED: int = 0xFFFF0000
+
+    # Graphics are only needed to render entities.
+    def __init__(self, graphics: Optional[Graphics]):
+        self._graphics: Optional[Graphics] = graphics
+
+        # If set, each render phase is marked in these frame statistics.
+        self.frame_stats: Optional[FrameStats] = None
+
+    def render(self, surface: Surface, camera: Camera, level: Level, tileset: TileSet, draw_collision: bool=False,
+               draw_blockmap: bool=False, draw_entities: bool=True, entity_origins: bool=False,
+               hover_entity: Optional[Entity]=None, entities_translucent: bool=False):
+        frame_stats = self.frame_stats
+
+        surface.clear()
+
+        level.tilemap.render(surface, camera, tileset, draw_collision)
+        if frame_stats:
+            frame_stats.mark('tilemap')
+
+        if draw_blockmap:
+            self.render_blockmap(surface, camera, level)
+            if frame_stats:
+                frame_stats.mark('blockmap')
+
+        if draw_entities:
+            self.render_entities(surface, camera, level, entity_origins, hover_entity, entities_translucent)
+            if frame_stats:
+                frame_stats.mark('entities')
+
+    def render_blockmap(self, surface: Surface, camera: Camera, level: Level):
+        _, _, block_width, block_height = level.get_blockmap_dimensions()
+        block_width = int(block_width)
+        block_height = int(block_height)
+        for y in range(0, level.tilemap.height * 32, block_height):
+            for x in range(-24, level.tilemap.width * 32 + 24, block_width):
+                rx, ry = camera.world_to_camera(x, y)
+                surface.box(rx, ry, block_width, block_height, LevelRenderer.COLOR_BLOCKMAP)
+
+    def render_entities(self, surface: Surface, camera: Camera, level: Level, draw_origin: bool=False,
+                        hover_entity: Optional[Entity]=None, translucent: bool=False):
+        if translucent:
+            blend_op = BlendOp.ALPHA50
+        else:
+            blend_op = BlendOp.ALPHA_SIMPLE
+
+        for entity in level.entities:
+            template = level.get_entity_template(entity.type, entity.subtype)
+            if template is None:
+                continue
+
+            origin_x, origin_y = camera.world_to_camera(entity.x * Level.ORIGIN_SIZE, entity.y * Level.ORIGIN_SIZE)
+            origin_width = Level.ORIGIN_SIZE
+            origin_height = Level.ORIGIN_SIZE
+
+            sprite_surfaces = self._graphics.get_surfaces(template.gfx)
+
+            if sprite_surfaces:
+                sprite_surface = sprite_surfaces[template.gfx_index]
+                sprite_x = origin_x + template.offset_x
+                sprite_y = origin_y + template.offset_y
+                sprite_width = sprite_surface.width
+                sprite_height = sprite_surface.height
+            else:
+                sprite_surface = None
+                sprite_x = origin_x
+                sprite_y = origin_y
+                sprite_width = 0
+                sprite_height = 0
+
+            x1 = min(origin_x, sprite_x)
+            y1 = min(origin_y, sprite_y)
+            x2 = max(origin_x + origin_width, sprite_x + sprite_width)
+            y2 = max(origin_y + origin_height, sprite_y + sprite_height)
+
+            if not camera.screen_contains(x1, y1, x2, y2):
+                continue
+
+            if sprite_surface is not None:
+                sprites = self._graphics.get_sprites(template.gfx)
+                if sprites:
+                    surface.blit_sprite(sprites[template.gfx_index], sprite_x, sprite_y, blend_op)
+                else:
+                    surface.blit_blend(sprite_surface, sprite_x, sprite_y, blend_op)
+                if entity == hover_entity:
+                    surface.outline(sprite_surface, sprite_x, sprite_y, LevelRenderer.COLOR_ENTITY_HOVER)
+                elif entity.selected:
+                    surface.outline(sprite_surface, sprite_x, sprite_y, LevelRenderer.COLOR_ENTITY_SELECTED)
+
+            if draw_origin:
+                surface.box_fill(origin_x, origin_y, origin_width, origin_height, LevelRenderer.COLOR_ORIGIN, BlendOp.ALPHA50)
+
+    @property
+    def graphics(self) -> Optional[Graphics]:
+        return self._graphics
@@ -0,0 +1,110 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from array import array
+from typing import List, Optional, Set, Tuple
+
+from turrican2.tilemap import Tilemap, TilemapChange
+
+
+class TileIndex:
+
+    TILE_COUNT: int = 256
+
+    def __init__(self, tilemap: Tilemap):
+        self._tilemap: Tilemap = tilemap
+        self._uses: List[Set[int]] = []
+
+        self.rebuild()
+        self._tilemap.add_listener(self.tilemap_changed)
+
+    def rebuild(self):
+        self._uses = [set() for _ in range(TileIndex.TILE_COUNT)]
+        for offset, index in enumerate(self._tilemap.tiles):
+            self._uses[index].add(offset)
+
+    def tilemap_changed(self, offsets: Optional[array], old: Optional[bytes]):
+        if offsets is None:
+            self.rebuild()
+            return
+
+        tiles = self._tilemap.tiles
+        uses = self._uses
+        for offset, old_index in zip(offsets, old):
+            uses[old_index].discard(offset)
+            uses[tiles[offset]].add(offset)
+
+    def detach(self):
+        self._tilemap.remove_listener(self.tilemap_changed)
+
+    def count(self, index: int) -> int:
+        return len(self._uses[index])
+
+    def find_all(self, index: int) -> List[Tuple[int, int]]:
+        width = self._tilemap.width
+        return [(offset % width, offset // width) for offset in sorted(self._uses[index])]
+
+    def find_inside(self, index: int, x1: int, y1: int, x2: int, y2: int) -> List[Tuple[int, int]]:
+        width = self._tilemap.width
+        x1 = max(x1, 0)
+        y1 = max(y1, 0)
+        x2 = min(x2, width)
+        y2 = min(y2, self._tilemap.height)
+        if x2 <= x1 or y2 <= y1:
+            return []
+
+        uses = self._uses[index]
+
+        # Walk whichever is smaller, the rectangle or the set of uses.
+        if (x2 - x1) * (y2 - y1) < len(uses):
+            positions = []
+            for y in range(y1, y2):
+                row = y * width
+                for x in range(x1, x2):
+                    if row + x in uses:
+                        positions.append((x, y))
+            return positions
+
+        positions = []
+        for offset in uses:
+            x = offset % width
+            y = offset // width
+            if x1 <= x < x2 and y1 <= y < y2:
+                positions.append((x, y))
+
+        return positions
+
+    def replace(self, index: int, new_index: int, rect: Optional[Tuple[int, int, int, int]] = None) -> TilemapChange:
+        if index == new_index:
+            return TilemapChange(array('I'), b'', b'')
+
+        if rect is None:
+            offsets = array('I', sorted(self._uses[index]))
+        else:
+            width = self._tilemap.width
+            offsets = array('I', sorted(x + y * width for x, y in self.find_inside(index, *rect)))
+
+        change = TilemapChange(offsets, bytes([index]) * len(offsets), bytes([new_index]) * len(offsets))
+        change.apply(self._tilemap)
+
+        return change
@@ -22,15 +22,56 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import math
-from typing import List
+from array import array
+from typing import Callable, Dict, List, Optional
 
 from renderlib.stream_read import StreamRead
 from renderlib.stream_write import StreamWrite
 from renderlib.surface import Surface
 
+from turrican2.camera import Camera
 from turrican2.tileset import TileSet
 
-from ui.camera import Camera
+
+class TilemapChange:
+
+    def __init__(self, offsets: array, old: bytes, new: bytes):
+        self.offsets: array = offsets
+        self.old: bytes = old
+        self.new: bytes = new
+
+    def apply(self, tilemap):
+        tilemap.write(self.offsets, self.new, self.old)
+
+    def revert(self, tilemap):
+        tilemap.write(self.offsets, self.old, self.new)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    # Combines consecutive changes into one, with the oldest and newest value of every cell that they changed. Cells
+    # that were changed back to their old value are left out.
+    @classmethod
+    def combine(cls, changes: List['TilemapChange']):
+        cells: Dict[int, List[int]] = {}
+        for change in changes:
+            for offset, old, new in zip(change.offsets, change.old, change.new):
+                if offset in cells:
+                    cells[offset][1] = new
+                else:
+                    cells[offset] = [old, new]
+
+        offsets = array('I')
+        old = bytearray()
+        new = bytearray()
+        for offset in sorted(cells.keys()):
+            old_value, new_value = cells[offset]
+            if old_value != new_value:
+                offsets.append(offset)
+                old.append(old_value)
+                new.append(new_value)
+
+        return cls(offsets, bytes(old), bytes(new))
 
 
 class Tilemap:
@@ -42,6 +83,10 @@ class Tilemap:
         self._width: int = width
         self._height: int = height
 
+        # Called with the changed offsets and their previous values after every modification, or with None for both
+        # if all tiles were replaced.
+        self._listeners: List[Callable] = []
+
     @classmethod
     def from_stream(cls, stream: StreamRead, width: int, height: int):
         tiles = [0] * width * height
@@ -118,8 +163,25 @@ class Tilemap:
                 else:
                     surface.blit(tile.surface, rx, ry)
 
-    def put_from(self, other, put_x: int, put_y: int):
+    def add_listener(self, listener: Callable):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        self._listeners.remove(listener)
+
+    def write(self, offsets: array, values: bytes, old: bytes):
+        tiles = self._tiles
+        for offset, value in zip(offsets, values):
+            tiles[offset] = value
+
+        for listener in self._listeners:
+            listener(offsets, old)
+
+    def put_from(self, other, put_x: int, put_y: int) -> TilemapChange:
         other_tiles = other.tiles
+        offsets = array('I')
+        old = bytearray()
+        new = bytearray()
 
         for y in range(0, other.height):
             for x in range(0, other.width):
@@ -130,19 +192,36 @@ class Tilemap:
 
                 src = x + y * other.width
                 dest = put_x + x + (put_y + y) * self._width
-                self._tiles[dest] = other_tiles[src]
 
-    def fill_with(self, other, x1: int, y1: int, x2: int, y2: int):
+                # Only record cells that actually change.
+                if self._tiles[dest] != other_tiles[src]:
+                    offsets.append(dest)
+                    old.append(self._tiles[dest])
+                    new.append(other_tiles[src])
+
+        change = TilemapChange(offsets, bytes(old), bytes(new))
+        change.apply(self)
+
+        return change
+
+    def fill_with(self, other, x1: int, y1: int, x2: int, y2: int) -> TilemapChange:
         other_tiles = other.tiles
         other_x = 0
         other_y = 0
 
+        offsets = array('I')
+        old = bytearray()
+        new = bytearray()
+
         for y in range(y1, y2):
             for x in range(x1, x2):
                 if not (x < 0 or y < 0 or x >= self._width or y >= self._height):
                     src = other_x + other_y * other.width
                     dest = x + y * self._width
-                    self._tiles[dest] = other_tiles[src]
+                    if self._tiles[dest] != other_tiles[src]:
+                        offsets.append(dest)
+                        old.append(self._tiles[dest])
+                        new.append(other_tiles[src])
 
                 other_x += 1
                 if other_x >= other.width:
@@ -153,11 +232,103 @@ class Tilemap:
             if other_y >= other.height:
                 other_y = 0
 
+        change = TilemapChange(offsets, bytes(old), bytes(new))
+        change.apply(self)
+
+        return change
+
+    def flood_fill(self, x: int, y: int, pattern, connectivity: int = 4, tileset: Optional[TileSet] = None) -> TilemapChange:
+        if connectivity not in (4, 8):
+            raise Exception('Invalid flood fill connectivity {}.'.format(connectivity))
+
+        width = self._width
+        height = self._height
+        tiles = self._tiles
+        if x < 0 or y < 0 or x >= width or y >= height:
+            return TilemapChange(array('I'), b'', b'')
+
+        # Determine which tile indices belong to the area being filled. If a tileset is passed, tiles match on their
+        # collision data instead of on their tile index.
+        seed = tiles[x + y * width]
+        if tileset is not None:
+            collisions = [tuple(tile.collision) for tile in tileset.tiles]
+            seed_collision = collisions[seed] if seed < len(collisions) else None
+            matches = [index < len(collisions) and collisions[index] == seed_collision for index in range(256)]
+        else:
+            matches = [index == seed for index in range(256)]
+
+        # Scanline fill. Each popped seed is expanded to a full horizontal span, after which the rows above and below
+        # are scanned for runs of matching cells; only one seed is pushed per run.
+        visited = bytearray(width * height)
+        filled = array('I')
+        stack = [(x, y)]
+        while stack:
+            span_x, span_y = stack.pop()
+            row = span_y * width
+            if visited[row + span_x] or not matches[tiles[row + span_x]]:
+                continue
+
+            x1 = span_x
+            while x1 > 0 and not visited[row + x1 - 1] and matches[tiles[row + x1 - 1]]:
+                x1 -= 1
+            x2 = span_x
+            while x2 < width - 1 and not visited[row + x2 + 1] and matches[tiles[row + x2 + 1]]:
+                x2 += 1
+
+            visited[row + x1:row + x2 + 1] = b'\x01' * (x2 - x1 + 1)
+            filled.extend(range(row + x1, row + x2 + 1))
+
+            if connectivity == 8:
+                scan_x1 = max(x1 - 1, 0)
+                scan_x2 = min(x2 + 1, width - 1)
+            else:
+                scan_x1 = x1
+                scan_x2 = x2
+
+            for scan_y in (span_y - 1, span_y + 1):
+                if scan_y < 0 or scan_y >= height:
+                    continue
+
+                scan_row = scan_y * width
+                in_run = False
+                for scan_x in range(scan_x1, scan_x2 + 1):
+                    offset = scan_row + scan_x
+                    if not visited[offset] and matches[tiles[offset]]:
+                        if not in_run:
+                            stack.append((scan_x, scan_y))
+                            in_run = True
+                    else:
+                        in_run = False
+
+        # Tile the pattern over the filled area, anchored at the seed cell. Only cells that change are recorded.
+        pattern_tiles = pattern.tiles
+        pattern_width = pattern.width
+        pattern_height = pattern.height
+        offsets = array('I')
+        old = bytearray()
+        new = bytearray()
+        for offset in filled:
+            pattern_x = (offset % width - x) % pattern_width
+            pattern_y = (offset // width - y) % pattern_height
+            value = pattern_tiles[pattern_x + pattern_y * pattern_width]
+            if tiles[offset] != value:
+                offsets.append(offset)
+                old.append(tiles[offset])
+                new.append(value)
+
+        change = TilemapChange(offsets, bytes(old), bytes(new))
+        change.apply(self)
+
+        return change
+
     def clear(self):
         self._width = 0
         self._height = 0
         self._tiles = []
 
+        for listener in self._listeners:
+            listener(None, None)
+
     @property
     def tiles(self) -> List[int]:
         return self._tiles
@@ -166,6 +337,9 @@ class Tilemap:
     def tiles(self, tiles: List[int]):
         self._tiles = tiles
 
+        for listener in self._listeners:
+            listener(None, None)
+
     @property
     def width(self) -> int:
         return self._width
@@ -28,6 +28,8 @@ from renderlib.palette import Palette
 from renderlib.stream_read import StreamRead
 from renderlib.surface import BlendOp, Surface
 
+from turrican2.tracing import traced
+
 
 class CollisionType:
     SOLID: int = 1
@@ -40,11 +42,20 @@ class Tile:
 
     def __init__(self):
         self.surface: Optional[Surface] = None
-        self.surface_collision: Optional[Surface] = None
         self.collision: Optional[List[int]] = None
 
+        # Rendered on first use, most sessions never show collision.
+        self._surface_collision: Optional[Surface] = None
+
+    @property
+    def surface_collision(self) -> Surface:
+        if self._surface_collision is None:
+            self.render_collision()
+
+        return self._surface_collision
+
     def render_collision(self):
-        self.surface_collision = self.surface.clone()
+        surface_collision = self.surface.clone()
 
         for index in range(0, 16):
             if not self.collision[index]:
@@ -64,7 +75,9 @@ class Tile:
 
             x = (index % 4) * 8
             y = int(index / 4) * 8
-            self.surface_collision.box_fill(x, y, 8, 8, color, BlendOp.ALPHA50)
+            surface_collision.box_fill(x, y, 8, 8, color, BlendOp.ALPHA50)
+
+        self._surface_collision = surface_collision
 
 
 class TileSet:
@@ -73,6 +86,7 @@ class TileSet:
         self._tiles: List[Tile] = tiles
 
     @classmethod
+    @traced('tileset.from_stream')
     def from_stream(cls, stream: StreamRead, offset_gfx: int, offset_collision: int, palette: Palette):
 
         stream.seek(offset_gfx)
@@ -101,7 +115,6 @@ class TileSet:
             tile.collision = [0] * 16
             for index in range(0, 16):
                 tile.collision[index] = stream.read_ubyte()
-            tile.render_collision()
 
         return cls(tiles)
 
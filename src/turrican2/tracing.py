@@ -0,0 +1,262 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import functools
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Returns the highest resident set size of this process so far, in bytes.
+def get_peak_rss() -> int:
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return 0
+        return counters.PeakWorkingSetSize
+
+    import resource
+
+    # Linux reports kilobytes, macOS reports bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+# A traced phase, with the phases that ran inside of it.
+class TraceSpan:
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.seconds: float = 0.0
+
+        # How much the peak resident set size of the process grew during this phase. Only phases that push memory use
+        # past its earlier highest point show a growth.
+        self.peak_rss_delta: int = 0
+
+        # Growth of memory allocated by Python during this phase, if allocations were traced.
+        self.allocated_delta: Optional[int] = None
+
+        # Source lines that allocated the most memory during this phase, with their allocated size and block count.
+        self.allocations: List[Tuple[str, int, int]] = []
+
+        self.children: List['TraceSpan'] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'seconds': round(self.seconds, 6),
+            'peak_rss_delta': self.peak_rss_delta,
+            'allocated_delta': self.allocated_delta,
+            'allocations': [
+                {'location': location, 'size': size, 'count': count} for location, size, count in self.allocations
+            ],
+            'children': [child.to_dict() for child in self.children],
+        }
+
+
+# Records the wall time, peak memory growth and top allocators of nested phases of work. Phases are marked with the
+# trace context manager or the traced decorator, which do nothing while no tracer is active.
+# Finding the top allocators of a phase means comparing two snapshots of all allocations, which gets slow as more memory
+# is allocated. They are only found for phases nested less than allocation_depth deep; the time spent on taking
+# snapshots is left out of the wall time of the phases that contain them.
+class Tracer:
+
+    def __init__(self, trace_allocations: bool = True, top_allocators: int = 5, allocation_depth: int = 2):
+        self._trace_allocations: bool = trace_allocations
+        self._top_allocators: int = top_allocators
+        self._allocation_depth: int = allocation_depth
+        self._started_tracemalloc: bool = False
+        self._overhead: float = 0.0
+
+        self._spans: List[TraceSpan] = []
+        self._stack: List[TraceSpan] = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        global _tracer
+        if _tracer is not None:
+            raise Exception('Another tracer is already active.')
+
+        if self._trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        _tracer = self
+
+    def stop(self):
+        global _tracer
+        if _tracer is self:
+            _tracer = None
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[TraceSpan]:
+        span = TraceSpan(name)
+        if self._stack:
+            self._stack[-1].children.append(span)
+        else:
+            self._spans.append(span)
+        self._stack.append(span)
+
+        tracing = self._trace_allocations and tracemalloc.is_tracing()
+        snapshot = None
+        if tracing and len(self._stack) <= self._allocation_depth:
+            snapshot = self._take_snapshot()
+
+        overhead = self._overhead
+        allocated = tracemalloc.get_traced_memory()[0] if tracing else 0
+        peak_rss = get_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - start - (self._overhead - overhead)
+            span.peak_rss_delta = get_peak_rss() - peak_rss
+            if tracing:
+                span.allocated_delta = tracemalloc.get_traced_memory()[0] - allocated
+            if snapshot is not None:
+                span.allocations = self._get_top_allocations(snapshot)
+            self._stack.pop()
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        start = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot()
+        self._overhead += time.perf_counter() - start
+
+        return snapshot
+
+    def _get_top_allocations(self, before: tracemalloc.Snapshot) -> List[Tuple[str, int, int]]:
+        after = self._take_snapshot()
+
+        start = time.perf_counter()
+        allocations = []
+        for stat in after.compare_to(before, 'lineno'):
+            if stat.size_diff <= 0:
+                continue
+
+            # Leave out the allocations made by tracing itself.
+            frame = stat.traceback[0]
+            if frame.filename in (__file__, tracemalloc.__file__):
+                continue
+
+            allocations.append(('{}:{}'.format(frame.filename, frame.lineno), stat.size_diff, stat.count_diff))
+            if len(allocations) >= self._top_allocators:
+                break
+        self._overhead += time.perf_counter() - start
+
+        return allocations
+
+    def to_dict(self) -> List[Dict]:
+        return [span.to_dict() for span in self._spans]
+
+    def get_lines(self) -> List[str]:
+        lines = []
+
+        def add_span(span: TraceSpan, depth: int):
+            indent = '  ' * depth
+            line = '{}{}: {:.1f} ms, peak RSS +{:.1f} MB'.format(
+                indent, span.name, span.seconds * 1000, span.peak_rss_delta / (1024 * 1024)
+            )
+            if span.allocated_delta is not None:
+                line += ', allocated {:+.1f} MB'.format(span.allocated_delta / (1024 * 1024))
+            lines.append(line)
+            for location, size, count in span.allocations:
+                lines.append('{}    {:.1f} KB in {} blocks at {}'.format(indent, size / 1024, count, location))
+            for child in span.children:
+                add_span(child, depth + 1)
+
+        for span in self._spans:
+            add_span(span, 0)
+
+        return lines
+
+    @property
+    def spans(self) -> List[TraceSpan]:
+        return self._spans
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+# Marks a traced phase if a tracer is active.
+@contextmanager
+def trace(name: str) -> Iterator[Optional[TraceSpan]]:
+    if _tracer is None:
+        yield None
+        return
+
+    with _tracer.span(name) as span:
+        yield span
+
+
+# Decorates a function so that each call to it is a traced phase if a tracer is active.
+def traced(name: str) -> Callable:
+    def decorator(function: Callable) -> Callable:
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return function(*args, **kwargs)
+
+            with _tracer.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
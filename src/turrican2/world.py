@@ -24,8 +24,6 @@
 import os.path
 from typing import Dict, List, Optional
 
-import wx
-
 from renderlib.stream_read import StreamRead
 from renderlib.stream_write import StreamWrite
 from renderlib.palette import Palette
@@ -33,6 +31,7 @@ from renderlib.utils import Endianness
 
 from turrican2.tileset import TileSet
 from turrican2.level import Level
+from turrican2.tracing import traced
 
 
 class World:
@@ -54,7 +53,8 @@ class World:
         self._palette: Optional[Palette] = None
         self._tileset: Optional[TileSet] = None
 
-    def save(self):
+    # Saves all modified levels, and returns the number of levels that could not be saved.
+    def save(self) -> int:
         stream = StreamWrite.from_file(self._filename, Endianness.BIG)
         levels_not_saved = 0
 
@@ -93,9 +93,9 @@ class World:
 
         stream.write_to_file(self._filename)
 
-        if levels_not_saved:
-            wx.MessageBox('{} level(s) could not be saved.'.format(levels_not_saved), 'Levels not saved', wx.ICON_INFORMATION | wx.OK)
+        return levels_not_saved
 
+    @traced('world.load')
     def load(self, filename: str, data: Dict):
         self._filename = filename
         self._world_index = int(os.path.basename(filename)[1]) - 1
@@ -150,6 +150,14 @@ class World:
 
             level.load(stream, offset)
 
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def world_index(self) -> int:
+        return self._world_index
+
     @property
     def levels(self) -> List[Level]:
         return self._levels
@@ -0,0 +1,68 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from typing import List
+
+import wx
+from wx import Event
+
+
+# Shows diagnostic reports as plain text. Built in code, since it is not part of the generated dialogs.
+class DialogDiagnostics(wx.Dialog):
+
+    def __init__(self, parent, lines: List[str]):
+        wx.Dialog.__init__(self, parent, id=wx.ID_ANY, title='Diagnostics', size=wx.Size(800, 600),
+                           style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+
+        self.Report = wx.TextCtrl(self, wx.ID_ANY, '\n'.join(lines), style=wx.TE_DONTWRAP | wx.TE_MULTILINE | wx.TE_READONLY)
+        self.Report.SetFont(wx.Font(9, wx.FONTFAMILY_MODERN, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL, False, 'Courier New'))
+        sizer.Add(self.Report, 1, wx.ALL | wx.EXPAND, 8)
+
+        sizer_button = wx.BoxSizer(wx.HORIZONTAL)
+        sizer_button.Add((0, 0), 1, wx.EXPAND, 5)
+
+        self.Copy = wx.Button(self, wx.ID_ANY, 'Copy')
+        sizer_button.Add(self.Copy, 0, wx.ALL, 5)
+
+        self.Ok = wx.Button(self, wx.ID_OK, 'Ok')
+        self.Ok.SetDefault()
+        sizer_button.Add(self.Ok, 0, wx.ALL, 5)
+
+        sizer.Add(sizer_button, 0, wx.EXPAND | wx.BOTTOM | wx.LEFT | wx.RIGHT, 8)
+
+        self.SetSizer(sizer)
+        self.Layout()
+        self.Centre(wx.BOTH)
+
+        self.Copy.Bind(wx.EVT_BUTTON, self.copy)
+        self.Ok.Bind(wx.EVT_BUTTON, self.ok)
+
+    def copy(self, event: Event):
+        if wx.TheClipboard.Open():
+            wx.TheClipboard.SetData(wx.TextDataObject(self.Report.GetValue()))
+            wx.TheClipboard.Close()
+
+    def ok(self, event: Event):
+        self.Destroy()
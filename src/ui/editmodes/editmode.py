@@ -23,17 +23,33 @@
 
 from typing import Dict, Optional, Tuple
 
-import wx
-
 from renderlib.surface import Surface
 
+from turrican2.camera import Camera
 from turrican2.graphics import Graphics
 from turrican2.level import Level
 from turrican2.world import World
 
-from ui.camera import Camera
+
+# Key codes that edit modes check. These match wxPython's key codes, so key events can be passed on unchanged.
+class Key:
+    DELETE: int = 127
+    SHIFT: int = 306
+    ALT: int = 307
+    CONTROL: int = 308
+
+
+# Cursors that edit modes can show over the viewport.
+class ViewportCursor:
+    DEFAULT: int = 0
+    CROSS: int = 1
+    HAND: int = 2
+    SIZING: int = 3
 
 
+# Edit modes do not depend on wx, so that they can also be driven without a window. The frame they are created with
+# provides key states, viewport cursors, undo and level state updates. Mouse events are passed to them as the original
+# GUI event, or None if there is none.
 class EditMode:
 
     def __init__(self, frame):
@@ -43,14 +59,16 @@ class EditMode:
         self._world: Optional[World] = None
         self._level: Optional[Level] = None
 
-    def mouse_left_down(self, event: wx.MouseEvent):
+    def mouse_left_down(self, event):
         pass
 
-    def mouse_left_up(self, event: wx.MouseEvent):
+    def mouse_left_up(self, event):
         pass
 
-    def mouse_move(self, event: wx.MouseEvent):
-        pass
+    def mouse_move(self, event) -> bool:
+
+        # Return False if the viewport does not need to be repainted.
+        return True
 
     def paint(self, surface: Surface, camera: Camera, graphics: Graphics):
         pass
@@ -61,6 +79,11 @@ class EditMode:
     def level_changed(self):
         pass
 
+    # Called when a drag may not receive its mouse up event, such as when the mouse leaves the viewport or before the
+    # level, edit mode or undo stack changes. Edits that are still pending must be finished here.
+    def end_drag(self):
+        pass
+
     def undo_restore_item(self, item: Dict):
         pass
 
@@ -23,15 +23,13 @@
 
 from typing import Dict, List, Optional, Tuple
 
-import wx
-
 from copy import deepcopy
 
 from renderlib.surface import BlendOp, Surface
 
-from ui.camera import Camera
-from ui.editmodes.editmode import EditMode
+from ui.editmodes.editmode import EditMode, Key, ViewportCursor
 
+from turrican2.camera import Camera
 from turrican2.graphics import Graphics
 from turrican2.level import Entity, EntityTemplate, Level
 
@@ -65,11 +63,11 @@ class EditModeEntities(EditMode):
         self._entity_moved: bool = False
 
     def key_char(self, key_code: int):
-        if key_code == wx.WXK_DELETE:
+        if key_code == Key.DELETE:
             self.delete_entities()
 
-    def mouse_left_down(self, event: wx.MouseEvent):
-        control = wx.GetKeyState(wx.WXK_CONTROL)
+    def mouse_left_down(self, event):
+        control = self._frame.get_key_state(Key.CONTROL)
 
         # Place an entity.
         if control:
@@ -96,9 +94,9 @@ class EditModeEntities(EditMode):
             self._state = State.SELECT
             self._select_start = self.get_entity_position()
             self._select_end = self.get_entity_position()
-            self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_CROSS))
+            self._frame.set_viewport_cursor(ViewportCursor.CROSS)
 
-    def mouse_left_up(self, event: wx.MouseEvent):
+    def mouse_left_up(self, event):
 
         # Entity select state.
         if self._state == State.SELECT:
@@ -108,7 +106,7 @@ class EditModeEntities(EditMode):
             self.select_entities()
 
             self._state = State.NONE
-            self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_DEFAULT))
+            self._frame.set_viewport_cursor(ViewportCursor.DEFAULT)
             self._frame.refresh_viewport()
 
         # Entity move state.
@@ -117,7 +115,7 @@ class EditModeEntities(EditMode):
             if self._entity_moved:
                 self._frame.update_status()
 
-    def mouse_move(self, event: wx.MouseEvent):
+    def mouse_move(self, event) -> bool:
         if self._state == State.SELECT:
             self._select_end = self.get_entity_position()
 
@@ -155,12 +153,14 @@ class EditModeEntities(EditMode):
             x, y = self.get_entity_position()
             self._entity_hover = self._level.get_entity_at(x, y)
             if self._entity_hover:
-                self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_HAND))
+                self._frame.set_viewport_cursor(ViewportCursor.HAND)
             else:
-                self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_DEFAULT))
+                self._frame.set_viewport_cursor(ViewportCursor.DEFAULT)
+
+        return True
 
     def paint(self, surface: Surface, camera: Camera, graphics: Graphics):
-        control = wx.GetKeyState(wx.WXK_CONTROL)
+        control = self._frame.get_key_state(Key.CONTROL)
 
         # Draw template entity.
         if self._state == State.NONE and self._template and control:
@@ -23,15 +23,13 @@
 
 from typing import Dict, Optional, Tuple
 
-import wx
-
 from renderlib.surface import BlendOp, Surface
 
+from turrican2.camera import Camera
 from turrican2.graphics import Graphics
 from turrican2.tilemap import Tilemap
 
-from ui.camera import Camera
-from ui.editmodes.editmode import EditMode
+from ui.editmodes.editmode import EditMode, ViewportCursor
 
 
 class State:
@@ -62,7 +60,7 @@ class EditModeStart(EditMode):
 
         self._move_offset: Optional[Tuple[int, int]] = None
 
-    def mouse_left_down(self, event: wx.MouseEvent):
+    def mouse_left_down(self, event):
         if self._state != State.NONE:
             return
 
@@ -84,10 +82,10 @@ class EditModeStart(EditMode):
             oy = y - self._level.camera_tile_y
             self._move_offset = (ox, oy)
 
-    def mouse_left_up(self, event: wx.MouseEvent):
+    def mouse_left_up(self, event):
         self._state = State.NONE
 
-    def mouse_move(self, event: wx.MouseEvent):
+    def mouse_move(self, event) -> bool:
         mouse = self._mouse_position
 
         if self._state == State.MOVE_PLAYER:
@@ -143,9 +141,11 @@ class EditModeStart(EditMode):
             self._highlight_player = not (mouse[0] < x1 or mouse[0] >= x2 or mouse[1] < y1 or mouse[1] >= y2)
 
             if self._highlight_camera or self._highlight_player:
-                self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_SIZING))
+                self._frame.set_viewport_cursor(ViewportCursor.SIZING)
             else:
-                self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_DEFAULT))
+                self._frame.set_viewport_cursor(ViewportCursor.DEFAULT)
+
+        return True
 
     def paint(self, surface: Surface, camera: Camera, graphics: Graphics):
         x = self._level.camera_tile_x * Tilemap.TILE_SIZE
@@ -21,19 +21,19 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from typing import Dict, Optional, Tuple
-
-import wx
+from typing import Dict, List, Optional, Tuple
 
 from copy import copy
 
 from renderlib.surface import BlendOp, Surface
 
-from ui.camera import Camera
-from ui.editmodes.editmode import EditMode
+from ui.editmodes.editmode import EditMode, Key, ViewportCursor
 
+from turrican2.camera import Camera
 from turrican2.graphics import Graphics
-from turrican2.tilemap import Tilemap
+from turrican2.tilemap import Tilemap, TilemapChange
+
+import config
 
 
 class State:
@@ -48,10 +48,33 @@ class SelectType:
     FILL = 2
 
 
+class StampStats:
+
+    def __init__(self):
+        self.events: int = 0
+        self.skipped: int = 0
+        self.stamps: int = 0
+        self.cells_written: int = 0
+        self.cells_unchanged: int = 0
+
+    def reset(self):
+        self.events = 0
+        self.skipped = 0
+        self.stamps = 0
+        self.cells_written = 0
+        self.cells_unchanged = 0
+
+    def get_line(self) -> str:
+        return 'BRUSH {} EVENTS {} SKIPPED {} STAMPS {} WRITTEN {} UNCHANGED'.format(
+            self.events, self.skipped, self.stamps, self.cells_written, self.cells_unchanged
+        )
+
+
 class EditModeTiles(EditMode):
 
     COLOR_TILE_SELECTION: int = 0xFFFFFFFF
     COLOR_TILE_FILL: int = 0xFF00FF00
+    COLOR_TILE_HIGHLIGHT: int = 0xFFFF00FF
 
     def __init__(self, frame):
         EditMode.__init__(self, frame)
@@ -61,20 +84,34 @@ class EditModeTiles(EditMode):
         self._select_start: Optional[Tuple[int, int]] = None
         self._select_end: Optional[Tuple[int, int]] = None
         self._select_type: int = SelectType.NONE
+        self._select_area: Optional[Tuple[int, int, int, int]] = None
 
         self._selection: Optional[Tilemap] = None
+        self._highlight_tile: Optional[int] = None
 
-    def mouse_left_down(self, event: wx.MouseEvent):
-        shift = wx.GetKeyState(wx.WXK_SHIFT)
-        control = wx.GetKeyState(wx.WXK_CONTROL)
+        self._stamp_last: Optional[Tuple[int, int]] = None
+        self._stamp_changes: List[TilemapChange] = []
+        self._stamp_stats: StampStats = StampStats()
+
+    def mouse_left_down(self, event):
+        shift = self._frame.get_key_state(Key.SHIFT)
+        control = self._frame.get_key_state(Key.CONTROL)
+        alt = self._frame.get_key_state(Key.ALT)
+
+        # A previous drag that did not receive a mouse up event is finished first, so that it can still be undone.
+        self.end_drag()
+
+        # Flood fill with the current selection. Holding Shift matches tiles by collision instead of by tile.
+        if alt:
+            self.flood_fill_selection(shift)
 
         # Enter tile select state.
-        if shift:
+        elif shift:
             self._state = State.SELECT
             self._select_start = self.get_tile_position()
             self._select_end = self.get_tile_position()
             self._select_type = SelectType.SELECT
-            self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_CROSS))
+            self._frame.set_viewport_cursor(ViewportCursor.CROSS)
 
         # Enter fill state.
         elif control and self._selection:
@@ -82,40 +119,74 @@ class EditModeTiles(EditMode):
             self._select_start = self.get_tile_position()
             self._select_end = self.get_tile_position()
             self._select_type = SelectType.FILL
-            self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_CROSS))
+            self._frame.set_viewport_cursor(ViewportCursor.CROSS)
 
         # Draw with the current selection.
         else:
             self._state = State.DRAW
-            self._frame.undo_add()
+            self._stamp_last = None
+            self._stamp_changes = []
             self.place_tile_selection()
 
-    def mouse_left_up(self, event: wx.MouseEvent):
+    def mouse_left_up(self, event):
         if self._state == State.SELECT:
             x, y, width, height = self.get_selection_rectangle(self._select_start, self._select_end)
             if width and height:
                 if self._select_type == SelectType.SELECT:
                     self._selection = Tilemap.from_tilemap(self._level.tilemap, x, y, x + width, y + height)
+                    self._select_area = (x, y, x + width, y + height)
                 elif self._select_type == SelectType.FILL:
-                    self._frame.undo_add()
-                    self._level.tilemap.fill_with(self._selection, x, y, x + width, y + height)
-                    self._frame.set_level_modified(True)
+                    change = self._level.tilemap.fill_with(self._selection, x, y, x + width, y + height)
+                    if len(change):
+                        self._frame.undo_add({'changes': change})
+                        self._frame.set_level_modified(True)
 
             self._state = State.NONE
-            self._frame.set_viewport_cursor(wx.Cursor(wx.CURSOR_DEFAULT))
+            self._frame.set_viewport_cursor(ViewportCursor.DEFAULT)
 
         elif self._state == State.DRAW:
-            self._state = State.NONE
+            self.end_drag()
+
+    def end_drag(self):
+        if self._state != State.DRAW:
+            return
+
+        self._state = State.NONE
+        self._stamp_last = None
 
-    def mouse_move(self, event: wx.MouseEvent):
+        # Undo the whole drag at once, if it changed anything.
+        change = TilemapChange.combine(self._stamp_changes)
+        self._stamp_changes = []
+        if len(change):
+            self._frame.undo_add({'changes': change})
+
+    def mouse_move(self, event) -> bool:
         if self._state == State.DRAW:
-            self.place_tile_selection()
+            return self.place_tile_selection()
 
         elif self._state == State.SELECT:
             self._select_end = self.get_tile_position()
 
+        return True
+
+    def key_char(self, key_code: int):
+        if key_code == ord('H'):
+            self.toggle_highlight()
+        elif key_code == ord('R'):
+            self.replace_tile(self._frame.get_key_state(Key.SHIFT))
+
     def paint(self, surface: Surface, camera: Camera, graphics: Graphics):
-        shift = wx.GetKeyState(wx.WXK_SHIFT)
+        shift = self._frame.get_key_state(Key.SHIFT)
+
+        # Highlight all uses of a tile inside the viewport.
+        if self._highlight_tile is not None:
+            x1 = int(camera.x / Tilemap.TILE_SIZE)
+            y1 = int(camera.y / Tilemap.TILE_SIZE)
+            x2 = int((camera.x + camera.width) / Tilemap.TILE_SIZE) + 1
+            y2 = int((camera.y + camera.height) / Tilemap.TILE_SIZE) + 1
+            for x, y in self._level.tile_index.find_inside(self._highlight_tile, x1, y1, x2, y2):
+                x, y = camera.world_to_camera(x * Tilemap.TILE_SIZE, y * Tilemap.TILE_SIZE)
+                surface.box(x, y, Tilemap.TILE_SIZE - 1, Tilemap.TILE_SIZE - 1, EditModeTiles.COLOR_TILE_HIGHLIGHT)
 
         # Draw current tilemap.
         if self._state == State.SELECT:
@@ -159,26 +230,113 @@ class EditModeTiles(EditMode):
 
         return x, y
 
-    def place_tile_selection(self):
+    def place_tile_selection(self) -> bool:
         if not self._selection:
-            return
+            return False
+
+        self._stamp_stats.events += 1
 
         x, y = self.get_tile_selection_position()
         tile_x = int(x / Tilemap.TILE_SIZE)
         tile_y = int(y / Tilemap.TILE_SIZE)
 
-        self._level.tilemap.put_from(self._selection, tile_x, tile_y)
+        # The brush has not moved to a new cell since the last stamp, so nothing can change.
+        if self._stamp_last == (tile_x, tile_y):
+            self._stamp_stats.skipped += 1
+            return False
+        self._stamp_last = (tile_x, tile_y)
+
+        self._stamp_stats.stamps += 1
+        change = self._level.tilemap.put_from(self._selection, tile_x, tile_y)
+        changed = len(change)
+        self._stamp_stats.cells_written += changed
+        self._stamp_stats.cells_unchanged += self._selection.width * self._selection.height - changed
+
+        if changed:
+            self._stamp_changes.append(change)
+            self._frame.set_level_modified(True)
+
+        return True
+
+    def flood_fill_selection(self, match_collision: bool):
+        if not self._selection:
+            return
+
+        x, y = self.get_tile_position()
+        if match_collision:
+            tileset = self._world.tileset
+        else:
+            tileset = None
+
+        change = self._level.tilemap.flood_fill(x, y, self._selection, config.FLOOD_FILL_CONNECTIVITY, tileset)
+        if not len(change):
+            return
+
+        self._frame.undo_add({'changes': change})
         self._frame.set_level_modified(True)
 
+    def get_tile_at_mouse(self) -> Optional[int]:
+        x, y = self.get_tile_position()
+        tilemap = self._level.tilemap
+        if x < 0 or y < 0 or x >= tilemap.width or y >= tilemap.height:
+            return None
+
+        return tilemap.tiles[x + y * tilemap.width]
+
+    def toggle_highlight(self):
+        tile = self.get_tile_at_mouse()
+        if self._highlight_tile is not None and (tile is None or tile == self._highlight_tile):
+            self._highlight_tile = None
+        else:
+            self._highlight_tile = tile
+
+        self._frame.refresh_viewport()
+
+    def replace_tile(self, inside_selection: bool):
+        if not self._selection:
+            return
+
+        tile = self.get_tile_at_mouse()
+        if tile is None:
+            return
+
+        # Replace with the top left tile of the current selection, optionally limited to the area it was selected from.
+        new_tile = self._selection.tiles[0]
+        if inside_selection:
+            if not self._select_area:
+                return
+            change = self._level.tile_index.replace(tile, new_tile, self._select_area)
+        else:
+            change = self._level.tile_index.replace(tile, new_tile)
+
+        if not len(change):
+            return
+
+        self._frame.undo_add({'changes': change})
+        self._frame.set_level_modified(True)
+        self._frame.refresh_viewport()
+
     def level_changed(self):
         self._selection = None
+        self._select_area = None
+        self._highlight_tile = None
+        self._stamp_last = None
+
+        # Any drag on the previous level was already finished by the frame.
+        self._stamp_changes = []
+        if self._state == State.DRAW:
+            self._state = State.NONE
 
     def set_selection(self, selection: Tilemap):
         self._selection = selection
+        self._select_area = None
         self._frame.refresh_viewport()
 
     def undo_restore_item(self, item: Dict):
-        self._level.tilemap.tiles = item['tiles']
+        if 'changes' in item:
+            item['changes'].revert(self._level.tilemap)
+        else:
+            self._level.tilemap.tiles = item['tiles']
         self._frame.set_level_modified(True)
         self._frame.refresh_viewport()
 
@@ -186,3 +344,7 @@ class EditModeTiles(EditMode):
         return {
             'tiles': copy(self._level.tilemap.tiles)
         }
+
+    @property
+    def stamp_stats(self) -> StampStats:
+        return self._stamp_stats
@@ -21,7 +21,8 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from typing import List, Optional
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 import wx
 import wx.lib.newevent
@@ -39,6 +40,8 @@ ICON_WIDTH: int = 32
 ICON_HEIGHT: int = 28
 ICON_SPACING: int = 1
 
+ICON_CACHE_SIZE: int = 256
+
 
 class PickerEntity:
 
@@ -46,6 +49,51 @@ class PickerEntity:
         self.name: str = name.upper()
         self.template: EntityTemplate = template
         self.surface: Surface = surface
+        self.label: Optional[Surface] = None
+
+
+class IconCache:
+
+    def __init__(self, size: int):
+        self._size: int = size
+        self._icons: OrderedDict = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, graphics: Graphics, gfx: str, gfx_index: int) -> Surface:
+        key = (gfx, gfx_index)
+
+        icon = self._icons.get(key)
+        if icon is not None:
+            self._icons.move_to_end(key)
+            self.hits += 1
+            return icon
+
+        self.misses += 1
+        icon = self.render_icon(graphics.get_surfaces(gfx)[gfx_index])
+        self._icons[key] = icon
+        if len(self._icons) > self._size:
+            self._icons.popitem(last=False)
+
+        return icon
+
+    def clear(self):
+        self._icons.clear()
+
+    @staticmethod
+    def render_icon(src_surface: Surface) -> Surface:
+        src_rect = src_surface.get_used_rectangle()
+        src_width = src_rect.x2 - src_rect.x1
+        src_height = src_rect.y2 - src_rect.y1
+
+        surface = Surface.empty(ICON_WIDTH, ICON_HEIGHT)
+        x = int(ICON_WIDTH / 2 - src_width / 2 - src_rect.x1)
+        y = int(ICON_HEIGHT / 2 - src_height / 2 - src_rect.y1)
+
+        surface.blit_blend(src_surface, x, y, BlendOp.ALPHA_SIMPLE)
+
+        return surface
 
 
 class EntityPicker(wx.Panel):
@@ -71,9 +119,14 @@ class EntityPicker(wx.Panel):
         self._graphics: Optional[Graphics] = None
         self._font: Optional[Font] = None
         self._entities: List[PickerEntity] = []
+        self._icons: IconCache = IconCache(ICON_CACHE_SIZE)
 
         self._selected_index: int = -1
 
+        # Background, highlight and text colors, read from the system settings when first needed.
+        self._colors: Optional[Tuple[int, int, int]] = None
+
+        self.Bind(wx.EVT_SYS_COLOUR_CHANGED, self.system_colors_changed)
         self.Viewport.Bind(wx.EVT_PAINT, self.paint)
         self.Viewport.Bind(wx.EVT_SIZE, self.resize)
         self.Viewport.Bind(wx.EVT_MOUSEWHEEL, self.mouse_wheel)
@@ -82,27 +135,18 @@ class EntityPicker(wx.Panel):
 
     def set_graphics(self, graphics: Graphics):
         self._graphics = graphics
+        self._icons.clear()
 
     def set_font(self, font: Font):
         self._font = font
+        self.clear_labels()
 
     def set_level(self, level: Level):
         self._entities = []
 
         templates = level.get_entity_templates()
         for keys, template in templates.items():
-            src_surface = self._graphics.get_surfaces(template.gfx)[template.gfx_index]
-
-            src_rect = src_surface.get_used_rectangle()
-            src_width = src_rect.x2 - src_rect.x1
-            src_height = src_rect.y2 - src_rect.y1
-
-            surface = src_surface.empty(ICON_WIDTH, ICON_HEIGHT)
-            x = int(ICON_WIDTH / 2 - src_width / 2 - src_rect.x1)
-            y = int(ICON_HEIGHT / 2 - src_height / 2 - src_rect.y1)
-
-            surface.blit_blend(src_surface, x, y, BlendOp.ALPHA_SIMPLE)
-
+            surface = self._icons.get(self._graphics, template.gfx, template.gfx_index)
             self._entities.append(PickerEntity(template.name.upper(), template, surface))
 
         self._selected_index = -1
@@ -110,33 +154,67 @@ class EntityPicker(wx.Panel):
         self.set_scrollbar()
         self.Viewport.Refresh(False)
 
-    def paint(self):
+    def paint(self, event: wx.PaintEvent):
         if not self._entities:
             return
 
         surface = self._presenter.surface
         surface.clear()
 
-        color_background = swap_rgba(wx.SystemSettings.GetColour(wx.SYS_COLOUR_3DDKSHADOW).GetRGBA())
-        color_highlight = swap_rgba(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHT).GetRGBA())
-        color_text = swap_rgba(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT).GetRGBA())
+        color_background, color_highlight, color_text = self.get_colors()
 
-        y = -self.Scrollbar.GetThumbPosition()
+        # Only render the rows that are inside the viewport.
+        item_height = ICON_HEIGHT + ICON_SPACING
+        position = self.Scrollbar.GetThumbPosition()
+        first = max(int(position / item_height), 0)
+        last = min(int((position + surface.height) / item_height) + 1, len(self._entities))
 
-        for index, entity in enumerate(self._entities):
+        y = first * item_height - position
+
+        for index in range(first, last):
+            entity = self._entities[index]
             if index == self._selected_index:
                 color = color_highlight
             else:
                 color = color_background
 
+            if entity.label is None:
+                entity.label = self.render_label(entity.name, color_text)
+
             surface.box_fill(0, y, surface.width, ICON_HEIGHT, color, BlendOp.SOLID)
             surface.blit_blend(entity.surface, 0, y, BlendOp.ALPHA_SIMPLE)
-            surface.text(self._font, ICON_WIDTH + 6, int(y + ICON_HEIGHT / 2 - 3), entity.name, color_text)
+            surface.blit_blend(entity.label, ICON_WIDTH + 6, int(y + ICON_HEIGHT / 2 - 3), BlendOp.ALPHA)
 
-            y += ICON_HEIGHT + ICON_SPACING
+            y += item_height
 
         self._presenter.present()
 
+    def render_label(self, text: str, color: int) -> Surface:
+        label = Surface.empty(max(len(text), 1) * self._font.char_width, self._font.char_height)
+        label.text(self._font, 0, 0, text, color)
+
+        return label
+
+    def clear_labels(self):
+        for entity in self._entities:
+            entity.label = None
+
+    def get_colors(self) -> Tuple[int, int, int]:
+        if self._colors is None:
+            self._colors = (
+                swap_rgba(wx.SystemSettings.GetColour(wx.SYS_COLOUR_3DDKSHADOW).GetRGBA()),
+                swap_rgba(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHT).GetRGBA()),
+                swap_rgba(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT).GetRGBA())
+            )
+
+        return self._colors
+
+    def system_colors_changed(self, event: wx.SysColourChangedEvent):
+        self._colors = None
+        self.clear_labels()
+        self.Viewport.Refresh(False)
+        event.Skip()
+
     def resize(self, event: wx.SizeEvent):
         self._presenter.resize()
         self.set_scrollbar()
@@ -164,7 +242,7 @@ class EntityPicker(wx.Panel):
         event = EntityPicker.PickEvent(template=template)
         wx.PostEvent(self.GetEventHandler(), event)
 
-    def scroll(self):
+    def scroll(self, event: wx.ScrollEvent):
         self.Viewport.Refresh(False)
 
     def set_selection(self, type: int, subtype: int):
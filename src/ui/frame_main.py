@@ -21,8 +21,8 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import os.path
-import json
+import logging
+import time
 
 import wx
 
@@ -32,21 +32,25 @@ import ui.entitypicker
 
 from ui.dialogs import FrameMainBase
 from ui.dialog_about import DialogAbout
+from ui.dialog_diagnostics import DialogDiagnostics
+from ui.inputsession import InputEvent, InputRecorder
 
+from ui.editmodes.editmode import Key, ViewportCursor
 from ui.editmodes.editmodetiles import EditModeTiles
 from ui.editmodes.editmodeentities import EditModeEntities
 from ui.editmodes.editmodestart import EditModeStart
 
 from renderlib.presenter import Presenter
-from renderlib.surface import BlendOp
 from renderlib.font import Font
+from renderlib.surface import BlendOp
 
-from turrican2.world import World
+from turrican2.camera import Camera
+from turrican2.framestats import FrameStats
+from turrican2.game import Game
 from turrican2.tilemap import Tilemap
 from turrican2.graphics import Graphics
-from turrican2.level import Level
-
-from ui.camera import Camera
+from turrican2.levelrenderer import LevelRenderer
+from turrican2.tracing import Tracer, trace
 
 import config
 
@@ -62,14 +66,21 @@ class EditMode:
     START: int = 2
 
 
-COLOR_ORIGIN: int = 0xFFFFFFFF
-
-COLOR_ENTITY_HOVER: int = 0xFFFFFFFF
-COLOR_ENTITY_SELECTED: int = 0xFFFF0000
+logger = logging.getLogger(__name__)
 
 
 class FrameMain(FrameMainBase):
 
+    COLOR_FRAME_STATS: int = 0xFFFFFF00
+    COLOR_FRAME_STATS_BACKGROUND: int = 0xFF000000
+
+    VIEWPORT_CURSORS = {
+        ViewportCursor.DEFAULT: wx.CURSOR_DEFAULT,
+        ViewportCursor.CROSS: wx.CURSOR_CROSS,
+        ViewportCursor.HAND: wx.CURSOR_HAND,
+        ViewportCursor.SIZING: wx.CURSOR_SIZING,
+    }
+
     def __init__(self):
         FrameMainBase.__init__(self, None)
 
@@ -103,6 +114,7 @@ class FrameMain(FrameMainBase):
         self._move_last_pos = 0
 
         self._graphics = None
+        self._renderer = None
         self._worlds = None
         self._world = None
         self._level = None
@@ -116,6 +128,24 @@ class FrameMain(FrameMainBase):
 
         self._font = Font.from_png('fonts/zepto.png')
 
+        # Frame statistics are only collected while the overlay is shown, or if they are logged.
+        self._frame_stats = None
+        self._show_frame_stats = False
+        if config.FRAME_STATS_LOG:
+            self._frame_stats = FrameStats(config.FRAME_STATS_WINDOW, config.FRAME_STATS_LOG, config.FRAME_STATS_LOG_SIZE)
+
+        # Trace of the last time a game directory was opened.
+        self._load_trace = None
+
+        # The diagnostics menu item is not part of the generated frame.
+        self.HelpDiagnostics = self.MenuHelp.Insert(0, wx.ID_ANY, 'Diagnostics...')
+        self.Bind(wx.EVT_MENU, self.diagnostics, id=self.HelpDiagnostics.GetId())
+
+        # Records edit mode input to a file, for replaying it with tools.replay.
+        self._input_recorder = None
+        self.HelpRecordInput = self.MenuHelp.InsertCheckItem(1, wx.ID_ANY, 'Record input...')
+        self.Bind(wx.EVT_MENU, self.toggle_input_recording, id=self.HelpRecordInput.GetId())
+
         self.set_mode(EditMode.TILES)
         self.update_menu_state()
 
@@ -134,38 +164,45 @@ class FrameMain(FrameMainBase):
             return
 
         directory = dialog.GetPath()
-        test_files = ['L1-1', 'L2-1', 'L3-1', 'L4-1', 'L5-1', 'LOADER', 'MAIN']
-        for filename in test_files:
-            if not os.path.exists(os.path.join(directory, filename)):
-                wx.MessageBox('Not a valid Turrican II CDTV directory.', 'Invalid directory', wx.OK | wx.ICON_EXCLAMATION)
-                return
+        if not Game.is_game_directory(directory):
+            wx.MessageBox('Not a valid Turrican II CDTV directory.', 'Invalid directory', wx.OK | wx.ICON_EXCLAMATION)
+            return
 
         self._game_dir = directory
-        self._graphics = Graphics(self._game_dir)
-        self.load_worlds()
 
-        self.Entities.set_graphics(self._graphics)
-        self.Entities.set_font(self._font)
+        self._load_trace = Tracer(config.TRACE_LOAD_ALLOCATIONS)
+        with self._load_trace, trace('open'):
+            self._graphics = Graphics(self._game_dir, config.COMPILE_SPRITES)
+            self._renderer = LevelRenderer(self._graphics)
+            self._renderer.frame_stats = self._frame_stats
+            self.load_worlds()
+
+            self.Entities.set_graphics(self._graphics)
+            self.Entities.set_font(self._font)
+
+            self.LevelSelect.SetSelection(0)
+            with trace('select_level'):
+                self.select_level(0, 0)
 
-        self.LevelSelect.SetSelection(0)
-        self.select_level(0, 0)
         self.update_menu_state()
         self.update_title()
 
     def char_hook(self, event):
         key_code = event.GetKeyCode()
+
+        # F12 toggles the frame statistics overlay.
+        if key_code == wx.WXK_F12:
+            self.toggle_frame_stats()
+            return
+
+        self.record_input(InputEvent.KEY_CHAR, key=key_code)
         self._edit_mode.key_char(key_code)
         event.Skip()
 
     def load_worlds(self):
-        with open('level-data.json', 'r') as fp:
-            level_data = json.load(fp)
-
-        self._worlds = []
-        for data in level_data:
-            world = World()
-            world.load(os.path.join(self._game_dir, data['world_file']), data['levels'])
-            self._worlds.append(world)
+        game = Game(self._game_dir)
+        game.load()
+        self._worlds = game.worlds
 
         for world_index, world in enumerate(self._worlds):
             for level_index, level in enumerate(world.levels):
@@ -173,6 +210,9 @@ class FrameMain(FrameMainBase):
                 self.LevelSelect.Append(level.name, data)
 
     def set_mode(self, new_mode):
+        self.record_input(InputEvent.MODE, mode=new_mode)
+        if self._edit_mode:
+            self._edit_mode.end_drag()
         self._edit_mode = self._edit_modes[new_mode]
 
         # Show only the active mode panel.
@@ -195,87 +235,71 @@ class FrameMain(FrameMainBase):
         self._camera.set_size(viewport_size[0] / self._presenter.scale, viewport_size[1] / self._presenter.scale)
 
         self._presenter.resize()
+        self.record_input(InputEvent.RESIZE, viewport=[self._presenter.surface.width, self._presenter.surface.height],
+                          camera_size=[self._camera.width, self._camera.height],
+                          camera=[self._camera.x, self._camera.y])
 
     def viewport_paint(self, event):
         if not self._presenter:
             return
 
+        editing_entities = (self._edit_mode == self._edit_modes[EditMode.ENTITIES])
+        if editing_entities:
+            hover_entity = self._edit_mode.get_hover_entity()
+        else:
+            hover_entity = None
+
+        frame_stats = self._frame_stats
+        if frame_stats:
+            frame_stats.begin_frame()
+
         surface = self._presenter.surface
-        surface.clear()
-
-        self._level.tilemap.render(surface, self._camera, self._world.tileset, self._draw_tile_collision)
-
-        if self._draw_blockmap:
-            _, _, block_width, block_height = self._level.get_blockmap_dimensions()
-            block_width = int(block_width)
-            block_height = int(block_height)
-            for y in range(0, self._level.tilemap.height * 32, block_height):
-                for x in range(-24, self._level.tilemap.width * 32 + 24, block_width):
-                    rx, ry = self._camera.world_to_camera(x, y)
-                    surface.box(rx, ry, block_width, block_height, 0xFFFF00FF)
-
-        if self._always_draw_entities:
-            editing_entities = (self._edit_mode == self._edit_modes[EditMode.ENTITIES])
-            if editing_entities:
-                hover_entity = self._edit_mode.get_hover_entity()
-            else:
-                hover_entity = None
-
-            draw_origin = editing_entities
-            translucent = not editing_entities
-            self.paint_entities(surface, draw_origin, hover_entity, translucent)
+        self._renderer.render(surface, self._camera, self._level, self._world.tileset,
+                              draw_collision=self._draw_tile_collision,
+                              draw_blockmap=self._draw_blockmap,
+                              draw_entities=self._always_draw_entities,
+                              entity_origins=editing_entities,
+                              hover_entity=hover_entity,
+                              entities_translucent=not editing_entities)
 
         self._edit_mode.paint(surface, self._camera, self._graphics)
+        if frame_stats:
+            frame_stats.mark('editmode')
+
+        if self._show_frame_stats:
+            self.paint_frame_stats(surface)
+            frame_stats.mark('overlay')
 
         self._presenter.present()
+        if frame_stats:
+            frame_stats.mark('present')
+            frame_stats.end_frame()
 
-    def paint_entities(self, surface, draw_origin=False, hover_entity=None, translucent=False):
-        if translucent:
-            blend_op = BlendOp.ALPHA50
-        else:
-            blend_op = BlendOp.ALPHA_SIMPLE
-
-        for entity in self._level.entities:
-            template = self._level.get_entity_template(entity.type, entity.subtype)
-            if template is None:
-                continue
-
-            origin_x, origin_y = self._camera.world_to_camera(entity.x * Level.ORIGIN_SIZE, entity.y * Level.ORIGIN_SIZE)
-            origin_width = Level.ORIGIN_SIZE
-            origin_height = Level.ORIGIN_SIZE
-
-            sprite_surfaces = self._graphics.get_surfaces(template.gfx)
-
-            if sprite_surfaces:
-                sprite_surface = sprite_surfaces[template.gfx_index]
-                sprite_x = origin_x + template.offset_x
-                sprite_y = origin_y + template.offset_y
-                sprite_width = sprite_surface.width
-                sprite_height = sprite_surface.height
-            else:
-                sprite_surface = None
-                sprite_x = origin_x
-                sprite_y = origin_y
-                sprite_width = 0
-                sprite_height = 0
-
-            x1 = min(origin_x, sprite_x)
-            y1 = min(origin_y, sprite_y)
-            x2 = max(origin_x + origin_width, sprite_x + sprite_width)
-            y2 = max(origin_y + origin_height, sprite_y + sprite_height)
-
-            if not self._camera.screen_contains(x1, y1, x2, y2):
-                continue
-
-            if sprite_surface is not None:
-                surface.blit_blend(sprite_surface, sprite_x, sprite_y, blend_op)
-                if entity == hover_entity:
-                    surface.outline(sprite_surface, sprite_x, sprite_y, COLOR_ENTITY_HOVER)
-                elif entity.selected:
-                    surface.outline(sprite_surface, sprite_x, sprite_y, COLOR_ENTITY_SELECTED)
-
-            if draw_origin:
-                surface.box_fill(origin_x, origin_y, origin_width, origin_height, COLOR_ORIGIN, BlendOp.ALPHA50)
+    def toggle_frame_stats(self):
+        self._show_frame_stats = not self._show_frame_stats
+
+        if self._show_frame_stats and not self._frame_stats:
+            self._frame_stats = FrameStats(config.FRAME_STATS_WINDOW, config.FRAME_STATS_LOG, config.FRAME_STATS_LOG_SIZE)
+        elif not self._show_frame_stats and not config.FRAME_STATS_LOG:
+            self._frame_stats = None
+
+        if self._renderer:
+            self._renderer.frame_stats = self._frame_stats
+
+        self.Viewport.Refresh(False)
+
+    # Draws the statistics of the previous frame, since the current one is not complete yet.
+    def paint_frame_stats(self, surface):
+        lines = self._frame_stats.get_lines()
+        if self._edit_mode == self._edit_modes[EditMode.TILES]:
+            lines.append(self._edit_mode.stamp_stats.get_line())
+        line_height = self._font.char_height + 1
+        width = max([len(line) for line in lines]) * self._font.char_width + 4
+        height = len(lines) * line_height + 3
+
+        surface.box_fill(0, 0, width, height, FrameMain.COLOR_FRAME_STATS_BACKGROUND, BlendOp.ALPHA50)
+        for index, line in enumerate(lines):
+            surface.text(self._font, 2, 2 + index * line_height, line, FrameMain.COLOR_FRAME_STATS)
 
     def viewport_mouse_right_down(self, event):
         if not self._camera:
@@ -305,6 +329,7 @@ class FrameMain(FrameMainBase):
         pos = event.GetPosition()
         pos = self._camera.camera_to_world(pos.x / self._presenter.scale, pos.y / self._presenter.scale)
         self._edit_mode.set_mouse_position(pos)
+        pos_world = pos
 
         if self._mouse_state == MouseState.MOVE:
             pos = event.GetPosition()
@@ -313,6 +338,7 @@ class FrameMain(FrameMainBase):
             delta_y = -((pos.y - self._move_last_pos[1]) * config.MOVE_SENSITIVITY) / self._presenter.scale
 
             self._camera.move_relative(delta_x, delta_y)
+            self.record_input(InputEvent.PAN, x=pos_world[0], y=pos_world[1], camera=[self._camera.x, self._camera.y])
 
             if abs(delta_x) > 0:
                 self._move_last_pos[0] = pos.x
@@ -320,7 +346,9 @@ class FrameMain(FrameMainBase):
                 self._move_last_pos[1] = pos.y
 
         else:
-            self._edit_mode.mouse_move()
+            self.record_input(InputEvent.MOUSE_MOVE, x=pos_world[0], y=pos_world[1])
+            if not self._edit_mode.mouse_move(event):
+                return
 
         self.Viewport.Refresh(False)
 
@@ -328,31 +356,53 @@ class FrameMain(FrameMainBase):
         if not self._world:
             return
 
-        self._edit_mode.mouse_left_down()
+        self.record_input(InputEvent.MOUSE_LEFT_DOWN)
+        self._edit_mode.mouse_left_down(event)
         self.Viewport.Refresh(False)
 
     def viewport_mouse_left_up(self, event):
         if not self._world:
             return
 
-        self._edit_mode.mouse_left_up()
+        self.record_input(InputEvent.MOUSE_LEFT_UP)
+        self._edit_mode.mouse_left_up(event)
+        self.Viewport.Refresh(False)
+
+    # The viewport does not capture the mouse, so a drag that leaves it may never receive its mouse up event.
+    def viewport_mouse_leave(self, event):
+        event.Skip()
+        if not self._world:
+            return
+
+        self.record_input(InputEvent.MOUSE_LEAVE)
+        self._edit_mode.end_drag()
         self.Viewport.Refresh(False)
 
     def set_show_entities_menu(self, event):
         self._always_draw_entities = not self._always_draw_entities
+        self.record_input(InputEvent.VIEW, **self.get_view_state())
         self.update_menu_state()
         self.Viewport.Refresh(False)
 
     def set_show_collision_menu(self, event):
         self._draw_tile_collision = not self._draw_tile_collision
+        self.record_input(InputEvent.VIEW, **self.get_view_state())
         self.update_menu_state()
         self.Viewport.Refresh(False)
 
     def set_show_blockmap_menu(self, event):
         self._draw_blockmap = not self._draw_blockmap
+        self.record_input(InputEvent.VIEW, **self.get_view_state())
         self.update_menu_state()
         self.Viewport.Refresh(False)
 
+    def get_view_state(self):
+        return {
+            'entities': self._always_draw_entities,
+            'collision': self._draw_tile_collision,
+            'blockmap': self._draw_blockmap,
+        }
+
     def update_menu_state(self):
         self.LevelShowEntities.Check(self._always_draw_entities)
         self.LevelShowCollision.Check(self._draw_tile_collision)
@@ -363,6 +413,22 @@ class FrameMain(FrameMainBase):
         about = DialogAbout()
         about.ShowModal()
 
+    def diagnostics(self, event):
+        lines = ['Opening the game directory:']
+        if self._load_trace:
+            lines.extend(self._load_trace.get_lines())
+        else:
+            lines.append('No game directory has been opened yet.')
+
+        lines.extend(['', 'Viewport frames:'])
+        if self._frame_stats:
+            lines.append(self._frame_stats.get_summary())
+        else:
+            lines.append('Frame statistics are collected while the F12 overlay is shown.')
+
+        dialog = DialogDiagnostics(self, lines)
+        dialog.ShowModal()
+
     def level_choice(self, event):
         index = self.LevelSelect.GetSelection()
         data = self.LevelSelect.GetClientData(index)
@@ -370,13 +436,22 @@ class FrameMain(FrameMainBase):
 
     def goto_start(self, event):
         self.center_on_start()
+        if self._camera:
+            self.record_input(InputEvent.PAN, camera=[self._camera.x, self._camera.y])
         self.Viewport.Refresh(False)
 
     def select_level(self, world, level):
+        start = time.perf_counter()
+        self.record_input(InputEvent.LEVEL, world=world, level=level)
+        if self._level:
+            self._edit_mode.end_drag()
+
         self._world = self._worlds[world]
         self._level = self._world.levels[level]
 
-        self._presenter = Presenter.from_window(self.Viewport.GetHandle(), config.SCALE)
+        # The viewport keeps the same presenter for all levels, only the camera changes.
+        if not self._presenter:
+            self._presenter = Presenter.from_window(self.Viewport.GetHandle(), config.SCALE)
 
         if self._level.camera:
             self._camera = self._level.camera
@@ -401,6 +476,8 @@ class FrameMain(FrameMainBase):
         self.Layout()
         self.Viewport.Refresh(False)
 
+        logger.info('Selected level "%s" in %.1f ms.', self._level.name, (time.perf_counter() - start) * 1000)
+
     def center_on_start(self):
         if not self._world:
             return
@@ -409,59 +486,64 @@ class FrameMain(FrameMainBase):
         y = (self._level.camera_tile_y * Tilemap.TILE_SIZE) + 96 - self._camera.height / 2
         self._camera.move_absolute(x, y)
 
-    def undo_add(self):
-
-        # If the undo stack has reached it's maximum size, prune off the first item.
-        if len(self._level.undo) == config.MAX_UNDO:
-            self._level.undo = self._level.undo[1:]
-            self._level.undo_index -= 1
-
-        # Prune the stack up to and including the current item.
-        self._level.undo = self._level.undo[0:self._level.undo_index + 1]
-
-        self._level.undo.append(self.undo_store_item())
-        self._level.undo_index += 1
+    def undo_add(self, data=None):
+        self._level.undo_push(self.undo_store_item(data), config.MAX_UNDO)
 
     def undo_do_undo(self):
         if not self._world:
             return
-        if self._level.undo_index == -1:
-            return
 
-        undo_item = self._level.undo[self._level.undo_index]
-        self._level.undo_index -= 1
-        self.undo_restore_item(undo_item)
+        undo_item = self._level.undo_pop()
+        if undo_item is not None:
+            self.undo_restore_item(undo_item)
 
     def undo_restore_item(self, item):
         editmode = self._edit_modes[item['editmode']]
         editmode.undo_restore_item(item['data'])
 
-    def undo_store_item(self):
+    def undo_store_item(self, data=None):
         value_index = list(self._edit_modes.values()).index(self._edit_mode)
         edit_mode_key = list(self._edit_modes.keys())[value_index]
 
+        # Edit modes can pass their own undo data, for example a compact change set of an operation that was already
+        # performed. Otherwise the edit mode stores a snapshot of the current state.
+        if data is None:
+            data = self._edit_mode.undo_store_item()
+
         return {
             'editmode': edit_mode_key,
-            'data': self._edit_mode.undo_store_item()
+            'data': data
         }
 
     def undo(self, event):
         if not self._world:
             return
 
+        self.record_input(InputEvent.UNDO)
+
+        # Undo a drag that is still in progress as a whole, instead of what came before it.
+        self._edit_mode.end_drag()
         self.undo_do_undo()
 
     def save(self, event):
         if not self._world:
             return
 
-        self._world.save()
+        self.save_world()
         self.update_title()
 
+    def save_world(self):
+        levels_not_saved = self._world.save()
+        if levels_not_saved:
+            wx.MessageBox('{} level(s) could not be saved.'.format(levels_not_saved), 'Levels not saved', wx.ICON_INFORMATION | wx.OK)
+
     def close_menu(self, event):
         self.Close(False)
 
     def close(self, event):
+        if self._input_recorder:
+            self.stop_input_recording()
+
         if not self._world:
             event.Skip()
             return
@@ -473,7 +555,7 @@ class FrameMain(FrameMainBase):
         if modified:
             result = wx.MessageBox('Do you want to save your changes?', 'Unsaved changes', wx.YES_NO | wx.CANCEL | wx.ICON_EXCLAMATION)
             if result == wx.YES:
-                self._world.save()
+                self.save_world()
             elif result == wx.CANCEL:
                 return
 
@@ -489,14 +571,69 @@ class FrameMain(FrameMainBase):
     def refresh_viewport(self):
         self.Viewport.Refresh(False)
 
-    def set_viewport_cursor(self, stock_cursor):
-        self.Viewport.SetCursor(wx.Cursor(stock_cursor))
+    def set_viewport_cursor(self, cursor):
+        self.Viewport.SetCursor(wx.Cursor(FrameMain.VIEWPORT_CURSORS[cursor]))
+
+    def get_key_state(self, key):
+        return wx.GetKeyState(key)
 
     def selection_tile(self, event):
-        self._edit_modes[EditMode.TILES].set_selection(event.selection)
+        selection = event.selection
+        if selection:
+            self.record_input(InputEvent.TILE_SELECTION, tiles=selection.tiles, width=selection.width, height=selection.height)
+        self._edit_modes[EditMode.TILES].set_selection(selection)
 
     def selection_entity(self, event):
-        self._edit_modes[EditMode.ENTITIES].set_template(event.template)
+        template = event.template
+        self.record_input(InputEvent.ENTITY_TEMPLATE, entity_type=template.type, entity_subtype=template.subtype)
+        self._edit_modes[EditMode.ENTITIES].set_template(template)
+
+    def record_input(self, event_type, **fields):
+        if not self._input_recorder:
+            return
+
+        keys = [key for key in (Key.SHIFT, Key.CONTROL, Key.ALT) if self.get_key_state(key)]
+        self._input_recorder.record(event_type, keys=keys, **fields)
+
+    def toggle_input_recording(self, event):
+        if self._input_recorder:
+            self.stop_input_recording()
+            return
+
+        if not self._world:
+            self.HelpRecordInput.Check(False)
+            return
+
+        dialog = wx.FileDialog(self, 'Record input to', '', 'input.jsonl', 'Input sessions (*.jsonl)|*.jsonl',
+                               wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if dialog.ShowModal() != wx.ID_OK:
+            self.HelpRecordInput.Check(False)
+            return
+
+        # The session starts from the current level, edit mode and camera, with the current level state hash so that a
+        # replay can tell whether it starts from the same level contents.
+        edit_mode = list(self._edit_modes.keys())[list(self._edit_modes.values()).index(self._edit_mode)]
+        self._input_recorder = InputRecorder(dialog.GetPath())
+        self._input_recorder.record(
+            InputEvent.START,
+            version=InputRecorder.VERSION,
+            world=self._worlds.index(self._world),
+            level=self._world.levels.index(self._level),
+            mode=edit_mode,
+            view=self.get_view_state(),
+            camera=[self._camera.x, self._camera.y],
+            viewport=[self._presenter.surface.width, self._presenter.surface.height],
+            state=self._level.get_state_hash()
+        )
+        self.HelpRecordInput.Check(True)
+
+    def stop_input_recording(self):
+        self._input_recorder.record(InputEvent.END, state=self._level.get_state_hash())
+        self._input_recorder.close()
+        self.Status.SetStatusText('Recorded {} input events to "{}".'.format(self._input_recorder.count, self._input_recorder.filename), 0)
+
+        self._input_recorder = None
+        self.HelpRecordInput.Check(False)
 
     def set_level_modified(self, is_modified):
         self._level.modified = is_modified
@@ -0,0 +1,109 @@
+# Copyright (c) 2016, Dennis Meuwissen
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+# ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import time
+from typing import Dict, List, Optional, TextIO
+
+
+# Types of events in an input session. A session starts with a START event that describes the level, edit mode, view and
+# camera it was recorded in, and ends with an END event that holds the resulting level state hash.
+class InputEvent:
+    START: str = 'start'
+    END: str = 'end'
+    MODE: str = 'mode'
+    LEVEL: str = 'level'
+    MOUSE_MOVE: str = 'mouse_move'
+    MOUSE_LEFT_DOWN: str = 'mouse_left_down'
+    MOUSE_LEFT_UP: str = 'mouse_left_up'
+    MOUSE_LEAVE: str = 'mouse_leave'
+    PAN: str = 'pan'
+    RESIZE: str = 'resize'
+    KEY_CHAR: str = 'key_char'
+    TILE_SELECTION: str = 'tile_selection'
+    ENTITY_TEMPLATE: str = 'entity_template'
+    UNDO: str = 'undo'
+    VIEW: str = 'view'
+
+
+# Writes edit mode input events to a file, one JSON object per line. Mouse positions are stored in level coordinates,
+# and every event stores the modifier keys that were held down, so that it can be replayed without a window.
+class InputRecorder:
+
+    VERSION: int = 1
+
+    def __init__(self, filename: str):
+        self._filename: str = filename
+        self._file: Optional[TextIO] = open(filename, 'w')
+        self._start: float = time.perf_counter()
+        self._count: int = 0
+
+    def record(self, event_type: str, **fields):
+        if not self._file:
+            return
+
+        event = {
+            'type': event_type,
+            't': round(time.perf_counter() - self._start, 4),
+        }
+        event.update(fields)
+
+        self._file.write(json.dumps(event))
+        self._file.write('\n')
+        self._count += 1
+
+    def close(self):
+        if not self._file:
+            return
+
+        self._file.close()
+        self._file = None
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+def read_input_session(filename: str) -> List[Dict]:
+    events = []
+    with open(filename, 'r') as fp:
+        for line_number, line in enumerate(fp):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                raise Exception('Invalid input event on line {} of "{}".'.format(line_number + 1, filename))
+
+    if not events or events[0].get('type') != InputEvent.START:
+        raise Exception('"{}" is not an input session recording.'.format(filename))
+    if events[0].get('version') != InputRecorder.VERSION:
+        raise Exception('Unsupported input session version {} in "{}".'.format(events[0].get('version'), filename))
+
+    return events
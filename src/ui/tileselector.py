@@ -28,13 +28,12 @@ import wx
 import wx.lib.newevent
 
 from renderlib.presenter import Presenter
-from renderlib.surface import BlendOp
+from renderlib.surface import BlendOp, Surface
 
+from turrican2.camera import Camera
 from turrican2.tilemap import Tilemap
 from turrican2.tileset import TileSet
 
-from ui.camera import Camera
-
 import config
 
 
@@ -68,6 +67,10 @@ class TileSelector(wx.Panel):
 
         self._show_collision: bool = False
 
+        # The whole tileset pre-rendered in the current layout, with and without collision.
+        self._sheet: Optional[Surface] = None
+        self._sheet_collision: Optional[Surface] = None
+
         self.Viewport.Bind(wx.EVT_PAINT, self.paint)
         self.Viewport.Bind(wx.EVT_SIZE, self.resize)
         self.Viewport.Bind(wx.EVT_MOUSEWHEEL, self.mouse_wheel)
@@ -88,12 +91,15 @@ class TileSelector(wx.Panel):
 
         surface = self._presenter.surface
 
-        tiles_width = int(math.floor(surface.width / float(Tilemap.TILE_SIZE)))
+        tiles_width = max(int(math.floor(surface.width / float(Tilemap.TILE_SIZE))), 1)
         tiles_height = int(math.ceil(len(self._tileset.tiles) / float(tiles_width)))
 
         tiles = list(range(0, len(self._tileset.tiles)))
         self._tilemap = Tilemap(tiles, tiles_width, tiles_height)
 
+        self._sheet = None
+        self._sheet_collision = None
+
         self._camera.set_max(tiles_width * Tilemap.TILE_SIZE, tiles_height * Tilemap.TILE_SIZE)
         self.Scrollbar.SetScrollbar(wx.VERTICAL, 0, surface.height, tiles_height, True)
 
@@ -106,7 +112,12 @@ class TileSelector(wx.Panel):
         self._camera.set_size(surface.width, surface.height)
 
         if self._tileset:
-            tiles_width = int(math.floor(surface.width / float(Tilemap.TILE_SIZE)))
+            tiles_width = max(int(math.floor(surface.width / float(Tilemap.TILE_SIZE))), 1)
+
+            # The tile layout depends on the viewport width.
+            if tiles_width != self._tilemap.width:
+                self.populate_tiles()
+
             tiles_height = int(math.ceil((len(self._tileset.tiles) / tiles_width) * Tilemap.TILE_SIZE))
 
             diff = int(tiles_height - surface.height)
@@ -124,7 +135,7 @@ class TileSelector(wx.Panel):
         surface.clear()
 
         self._camera.move_absolute(0, self.Scrollbar.GetThumbPosition())
-        self._tilemap.render(surface, self._camera, self._tileset, self._show_collision)
+        surface.blit(self.get_sheet(), -self._camera.x, -self._camera.y)
 
         if self._select_start:
             x1 = self._select_start[0] * Tilemap.TILE_SIZE
@@ -148,6 +159,25 @@ class TileSelector(wx.Panel):
 
         self._presenter.present()
 
+    def get_sheet(self) -> Surface:
+        if self._show_collision:
+            if self._sheet_collision is None:
+                self._sheet_collision = self.render_sheet(True)
+            return self._sheet_collision
+
+        if self._sheet is None:
+            self._sheet = self.render_sheet(False)
+        return self._sheet
+
+    def render_sheet(self, collision: bool) -> Surface:
+        width = self._tilemap.width * Tilemap.TILE_SIZE
+        height = self._tilemap.height * Tilemap.TILE_SIZE
+
+        sheet = Surface.empty(width, height)
+        self._tilemap.render_all(sheet, self._tileset, 0, 0, collision)
+
+        return sheet
+
     def mouse_wheel(self, event: wx.MouseEvent):
         if not self._tileset:
             return